@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Benchmark JSON highlighting: the cached tokenizer against Rich's Syntax lexer.
+
+Prints the time to highlight one screen of log lines (and the visible part
+of one very long line) with each approach:
+
+  tokenizer, cold   first draw: tokenize every line, style the visible slice
+  tokenizer, cached a redraw: tokens come from the line cache
+  rich Syntax       what the pager would spend lexing each line with Pygments
+"""
+
+import json
+import sys
+import time
+sys.path.insert(0, '.')
+
+from rich.syntax import Syntax
+
+from smart_pager.json_cache import classify_line
+from smart_pager.pager import SmartPager
+
+SCREEN_ROWS = 50
+WIDTH = 200
+REPEAT = 20
+
+
+def _lines():
+    lines = []
+    for i in range(SCREEN_ROWS):
+        record = {"ts": f"2024-05-26T12:00:{i % 60:02d}Z", "level": "info", "n": i,
+                  "ok": i % 2 == 0, "ctx": {"user": f"u{i}", "latency_ms": i * 1.5,
+                                            "tags": ["a", "b", None]}}
+        lines.append("INFO " + json.dumps(record))
+    return lines
+
+
+def _time(func) -> float:
+    """Milliseconds per call, best of REPEAT."""
+    best = float('inf')
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def bench(name, lines, column=0):
+    colorize = SmartPager._colorize_json
+    infos = [classify_line(line) for line in lines]
+
+    def cold():
+        for line in lines:
+            info = classify_line(line)
+            colorize(None, info, column, column + WIDTH)
+
+    def cached():
+        for info in infos:
+            colorize(None, info, column, column + WIDTH)
+
+    def syntax():
+        for line in lines:
+            Syntax(line, "json").highlight(line)
+
+    cached()  # Tokenize once so the cached run only styles
+    print(f"{name}:")
+    print(f"  tokenizer, cold    {_time(cold):8.2f} ms")
+    print(f"  tokenizer, cached  {_time(cached):8.2f} ms")
+    print(f"  rich Syntax        {_time(syntax):8.2f} ms")
+
+
+if __name__ == '__main__':
+    bench(f"{SCREEN_ROWS} lines on screen", _lines())
+    long_line = json.dumps({"items": [{"id": i, "name": f"item {i}", "on": True}
+                                      for i in range(5000)]})
+    print(f"\n(one {len(long_line) // 1024} KB line)")
+    bench("visible slice of one long line", [long_line], column=len(long_line) // 2)
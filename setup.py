@@ -32,6 +32,9 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    extras_require={
+        "zstd": ["zstandard"],
+    },
     entry_points={
         "console_scripts": [
             "smart-pager=smart_pager.main:main",
@@ -0,0 +1,111 @@
+"""On-disk cache for indexes of large files."""
+
+import hashlib
+import json
+import os
+from array import array
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+CACHE_VERSION = 3
+# Bytes hashed at the start of the file and at the end of the cached part
+FINGERPRINT_SIZE = 64 * 1024
+
+
+def cache_dir() -> Path:
+    """$XDG_CACHE_HOME/smart-pager, defaulting to ~/.cache/smart-pager."""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(Path.home(), '.cache')
+    return Path(base) / 'smart-pager'
+
+
+def _fingerprint(f, start: int, end: int) -> str:
+    f.seek(start)
+    return hashlib.sha1(f.read(end - start)).hexdigest()
+
+
+def file_key(filename: str) -> dict:
+    """Identity of a file's current contents.
+
+    inode, size and mtime catch most changes; hashes of the first bytes and
+    of the bytes just before the end tell a file that only had data
+    appended from one that was rewritten.
+    """
+    with open(filename, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        size = stat.st_size
+        return {
+            'inode': stat.st_ino,
+            'size': size,
+            'mtime_ns': stat.st_mtime_ns,
+            'head': _fingerprint(f, 0, min(size, FINGERPRINT_SIZE)),
+            'tail': _fingerprint(f, max(0, size - FINGERPRINT_SIZE), size),
+        }
+
+
+def _compare(filename: str, key: dict) -> Optional[bool]:
+    """False if filename still matches key, True if it has only grown since, else None."""
+    with open(filename, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        size = key['size']
+        if stat.st_ino != key['inode'] or stat.st_size < size:
+            return None
+        if stat.st_size == size and stat.st_mtime_ns == key['mtime_ns']:
+            return False
+        if stat.st_size == size:
+            return None  # Rewritten in place
+        head = _fingerprint(f, 0, min(size, FINGERPRINT_SIZE))
+        tail = _fingerprint(f, max(0, size - FINGERPRINT_SIZE), size)
+    if (head, tail) != (key['head'], key['tail']):
+        return None
+    return True
+
+
+def cache_path(filename: str, kind: str) -> Path:
+    """Cache file holding one kind of index for filename."""
+    name = hashlib.sha1(os.path.abspath(filename).encode()).hexdigest()[:20]
+    return cache_dir() / f"{name}.{kind}"
+
+
+def save(filename: str, kind: str, header: dict, arrays: Dict[str, array]):
+    """Store header and arrays for filename's current contents. Failures are ignored."""
+    layout = [[name, values.typecode, len(values)] for name, values in arrays.items()]
+    path = cache_path(filename, kind)
+    temp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        meta = {'version': CACHE_VERSION, 'key': file_key(filename),
+                'header': header, 'arrays': layout}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(temp, 'wb') as f:
+            f.write(json.dumps(meta).encode() + b'\n')
+            for values in arrays.values():
+                values.tofile(f)
+        os.replace(temp, path)  # Readers never see a partial file
+    except OSError:
+        try:
+            os.unlink(temp)
+        except OSError:
+            pass
+
+
+def load(filename: str, kind: str) -> Optional[Tuple[dict, Dict[str, array], bool]]:
+    """(header, arrays, grown) saved for filename, or None if missing or out of date.
+
+    grown is True when the file has had data appended since it was saved;
+    the cached data then describes the start of the file.
+    """
+    try:
+        with open(cache_path(filename, kind), 'rb') as f:
+            meta = json.loads(f.readline())
+            if meta.get('version') != CACHE_VERSION:
+                return None
+            grown = _compare(filename, meta['key'])
+            if grown is None:
+                return None
+            arrays = {}
+            for name, typecode, count in meta['arrays']:
+                values = array(typecode)
+                values.fromfile(f, count)
+                arrays[name] = values
+    except (OSError, ValueError, EOFError, KeyError, TypeError):
+        return None
+    return meta['header'], arrays, grown
@@ -0,0 +1,91 @@
+"""Terminal-cell arithmetic for clipping wide lines to the visible columns."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Tuple
+
+from rich.cells import cell_len, get_character_cell_size
+
+# Columns between tab stops, as Rich expands them
+TAB_SIZE = 8
+
+
+def cell_slice(text: str, column: int, width: int) -> Tuple[int, int, int]:
+    """Character range of text that fills cells [column, column + width).
+
+    Returns (start, end, pad). A double-width character cut by the left
+    edge is left out and pad (0 or 1) blank cells stand in for its visible
+    half; one cut by the right edge is left out. ASCII text, where every
+    character is one cell, is sliced without measuring anything, so the
+    cost depends on width rather than on the length of the line.
+    """
+    if text.isascii():
+        return min(column, len(text)), min(column + width, len(text)), 0
+    index = 0
+    count = len(text)
+    cells = 0
+    while index < count and cells < column:
+        cells += get_character_cell_size(text[index])
+        index += 1
+    start = index
+    pad = cells - column
+    cells = pad
+    while index < count:
+        size = get_character_cell_size(text[index])
+        if cells + size > width:
+            break
+        cells += size
+        index += 1
+    return start, index, pad
+
+
+def cell_width(text: str) -> int:
+    """Cells text takes on screen."""
+    return len(text) if text.isascii() else cell_len(text)
+
+
+def expand_tabs(text: str) -> str:
+    """text with its tabs expanded to spaces.
+
+    A tab measures as no cells but Rich widens it to the next tab stop
+    after the row is cut, so rows must be expanded before they are sliced.
+    """
+    return text.expandtabs(TAB_SIZE) if '\t' in text else text
+
+
+class TabStops:
+    """A line with its tabs expanded, and where each character landed.
+
+    Keeps only the position of each tab and the spaces added up to it, so
+    offsets into the original line (e.g. of JSON tokens) can be moved to
+    the expanded text, and back, by bisection.
+    """
+
+    def __init__(self, line: str):
+        self.text = line.expandtabs(TAB_SIZE)
+        self._tabs = array('Q')  # Offset of each tab in the line
+        self._columns = array('Q')  # Offset it starts at in text
+        self._added = array('Q')  # Spaces added by it and the tabs before it
+        added = 0
+        pos = line.find('\t')
+        while pos >= 0:
+            column = pos + added
+            self._tabs.append(pos)
+            self._columns.append(column)
+            added += TAB_SIZE - column % TAB_SIZE - 1
+            self._added.append(added)
+            pos = line.find('\t', pos + 1)
+
+    def expanded(self, offset: int) -> int:
+        """Offset in text of the line's character at offset."""
+        k = bisect_left(self._tabs, offset)
+        return offset + (self._added[k - 1] if k else 0)
+
+    def original(self, column: int) -> int:
+        """Offset in the line of the character drawn at column of text."""
+        k = bisect_right(self._columns, column) - 1
+        if k < 0:
+            return column
+        if column - self._columns[k] <= self._added[k] - (self._added[k - 1] if k else 0):
+            return self._tabs[k]  # Inside the tab's spaces
+        return column - self._added[k]
@@ -0,0 +1,115 @@
+"""Projection of JSON lines onto a few fields, drawn as aligned columns."""
+
+from collections import OrderedDict
+from typing import Callable, Iterable, List, Tuple
+
+from .cells import cell_slice, cell_width
+from .field_index import MISSING, field_value, value_key
+from .json_cache import LineInfo
+
+# Cells a column may grow to; longer values are cut with "…" (the last column never is)
+MAX_COLUMN_WIDTH = 40
+# Lines around the screen measured for the starting column widths
+WIDTH_WINDOW = 256
+# Blank cells between columns
+COLUMN_GAP = 2
+
+# Control characters that would break a row, shown escaped as in JSON
+_ESCAPES = str.maketrans({'\n': '\\n', '\r': '\\r', '\t': '\\t'})
+
+
+def parse_columns(argument: str) -> List[str]:
+    """Field paths from 'ts,level,msg' (spaces around names are ignored)."""
+    fields = [field.strip() for field in argument.split(',')]
+    if not all(fields):
+        raise ValueError(f"expected comma-separated fields, got {argument!r}")
+    return fields
+
+
+class Projection:
+    """The values of chosen fields for each line, with column widths to lay them out.
+
+    Each line's cells are extracted once and kept in a bounded LRU.
+    Widths start from a window of lines around the screen and only ever
+    grow (up to MAX_COLUMN_WIDTH) as wider values scroll into view, so
+    nothing is measured beyond the rows drawn and columns don't shift
+    back and forth while scrolling.
+    """
+
+    def __init__(self, fields: List[str], depth: int = 0, capacity: int = 4096):
+        self.fields = fields
+        self.depth = depth  # Levels of JSON-in-a-string a path may go through
+        self.capacity = capacity
+        self._paths = [field.split('.') for field in fields]
+        self._cells: "OrderedDict[int, List[str]]" = OrderedDict()
+        self.widths = [0] * len(fields)
+
+    @property
+    def description(self) -> str:
+        return ",".join(self.fields)
+
+    def cells(self, line_num: int, info: LineInfo) -> List[str]:
+        """Text of each field for a JSON line ('' where it is missing)."""
+        cells = self._cells.get(line_num)
+        if cells is not None:
+            self._cells.move_to_end(line_num)
+            return cells
+        cells = []
+        for path in self._paths:
+            value = field_value(info.values, path, self.depth)
+            cells.append('' if value is MISSING else value_key(value).translate(_ESCAPES))
+        self._cells[line_num] = cells
+        if len(self._cells) > self.capacity:
+            self._cells.popitem(last=False)
+        return cells
+
+    def measure(self, rows: Iterable[List[str]]):
+        """Widen the columns to fit rows of cells."""
+        widths = self.widths
+        for cells in rows:
+            for i, cell in enumerate(cells):
+                size = cell_width(cell)
+                if size > widths[i]:
+                    widths[i] = min(size, MAX_COLUMN_WIDTH)
+
+    def format(self, cells: List[str]) -> Tuple[str, List[Tuple[int, int]]]:
+        """(row text, (start, end) of each cell in it) with the cells padded to their widths."""
+        parts = []
+        spans = []
+        pos = 0
+        last = len(cells) - 1
+        for i, cell in enumerate(cells):
+            if i < last:
+                width = self.widths[i]
+                size = cell_width(cell)
+                if size > width:
+                    _, end, _ = cell_slice(cell, 0, max(0, width - 1))
+                    cell = cell[:end] + "…"
+                    size = cell_width(cell)
+                padding = " " * (width - size + COLUMN_GAP)
+            else:
+                padding = ""
+            spans.append((pos, pos + len(cell)))
+            parts.append(cell + padding)
+            pos += len(cell) + len(padding)
+        return "".join(parts), spans
+
+    def measure_window(self, view, position: int, line_info: Callable[[int], LineInfo]):
+        """Set starting widths from the JSON lines in a window of the view around position."""
+        first = max(0, position - WIDTH_WINDOW // 2)
+        stop = min(len(view), first + WIDTH_WINDOW)
+        rows = []
+        for pos in range(first, stop):
+            line_num = view[pos]
+            info = line_info(line_num)
+            if info.is_json:
+                rows.append(self.cells(line_num, info))
+        self.measure(rows)
+
+    def discard(self, line_num: int):
+        """Forget one line's cells (e.g. a partial last line that has grown)."""
+        self._cells.pop(line_num, None)
+
+    def clear(self):
+        self._cells.clear()
+
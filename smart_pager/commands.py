@@ -0,0 +1,141 @@
+"""Key bindings: turn batches of key events into pager actions."""
+
+import re
+from typing import Iterable
+
+# SGR mouse report: ESC [ < button ; column ; row (M = press, m = release)
+_MOUSE = re.compile(r'\x1b\[<(\d+);(\d+);(\d+)([Mm])')
+
+QUIT_KEYS = ('q', 'Q', '\x03')  # q or Ctrl+C
+PROMPT_KEYS = ('/', '?', ':')  # Keys that open the command line
+BACKSPACE_KEYS = ('\x7f', '\x08')
+HSCROLL_STEP = 8  # Columns scrolled by h and l
+
+
+class KeyDispatcher:
+    """Apply vim-style keys to a SmartPager, including counts and 'gg'."""
+
+    def __init__(self, pager):
+        self.pager = pager
+        self.count = ''  # Digits typed before a motion, e.g. the 50 in 50j
+        self.pending = None  # First key of a two-key command
+        self.quit = False
+
+    def _take_count(self) -> int:
+        count = int(self.count) if self.count else 1
+        self.count = ''
+        return count
+
+    def feed(self, keys: Iterable[str]) -> bool:
+        """Apply a batch of keys. Returns True if the display needs a refresh."""
+        changed = False
+        for key in keys:
+            if self.quit:
+                break
+            changed = self.handle(key) or changed
+        return changed
+
+    def handle(self, key: str) -> bool:
+        """Apply one key. Returns True if the display needs a refresh."""
+        pager = self.pager
+
+        if pager.prompt is not None:
+            return self._edit_prompt(key)
+
+        if self.pending == 'g':
+            self.pending = None
+            if key == 'g':
+                self.count = ''
+                pager.move_to_top()
+                return True
+            # Anything else cancels the prefix and is handled normally
+        elif self.pending == 'z':
+            self.pending = None
+            if key in ('h', 'l'):
+                # zh/zl scroll half a screen, like zH/zL in vim
+                half = max(1, pager.content_width // 2) * self._take_count()
+                pager.scroll_right(half if key == 'l' else -half)
+                return True
+
+        if key in QUIT_KEYS:
+            self.quit = True
+            return False
+        if key.isdigit() and (key != '0' or self.count):
+            self.count += key
+            return False
+
+        mouse = _MOUSE.fullmatch(key)
+        if mouse:
+            self.count = ''
+            button, column, row, action = mouse.groups()
+            if button == '0' and action == 'M':  # Left button press
+                pager.click_to_line(int(row) - 1, int(column) - 1)
+                return True
+            return False
+
+        if key == 'j' or key == '\x1b[B':  # j or down arrow
+            pager.move_down(self._take_count())
+        elif key == 'k' or key == '\x1b[A':  # k or up arrow
+            pager.move_up(self._take_count())
+        elif key == 'h' or key == '\x1b[D':  # h or left arrow
+            pager.scroll_right(-HSCROLL_STEP * self._take_count())
+        elif key == 'l' or key == '\x1b[C':  # l or right arrow
+            pager.scroll_right(HSCROLL_STEP * self._take_count())
+        elif key in ('g', 'z'):
+            self.pending = key
+            return False
+        elif key == '%':
+            if not self.count:
+                return False
+            pager.jump_to_percent(self._take_count())
+        elif key == 'G':
+            if self.count:
+                pager.jump_to_line(self._take_count() - 1)  # 123G goes to line 123
+            else:
+                pager.move_to_bottom()
+        elif key == 'F':
+            self.count = ''
+            pager.toggle_follow()
+        elif key == 'M':
+            self.count = ''
+            pager.toggle_minimap()
+        elif key in PROMPT_KEYS:
+            self.count = ''
+            pager.message = None
+            pager.prompt = key
+        elif key == 'n':
+            self.count = ''
+            pager.next_match()
+        elif key == 'N':
+            self.count = ''
+            pager.next_match(reverse=True)
+        elif key == '\x1b':  # Escape stops a running search
+            self.count = ''
+            pager.cancel_search()
+        elif key == '\x04':  # Ctrl+D
+            pager.page_down(self._take_count())
+        elif key == '\x15':  # Ctrl+U
+            pager.page_up(self._take_count())
+        elif key in ['\n', '\r', ' ']:  # Enter or Space
+            self.count = ''
+            pager.toggle_expansion()
+        else:
+            self.count = ''
+            return False
+        return True
+
+    def _edit_prompt(self, key: str) -> bool:
+        """Apply a key typed at the command line."""
+        pager = self.pager
+        if key in ('\r', '\n'):
+            pager.execute_prompt()
+        elif key in ('\x1b', '\x03'):  # Escape or Ctrl+C abandons the command
+            pager.prompt = None
+        elif key in BACKSPACE_KEYS:
+            # Deleting the prompt character itself closes the command line
+            pager.prompt = pager.prompt[:-1] or None
+        elif len(key) == 1 and key.isprintable():
+            pager.prompt += key
+        else:
+            return False
+        return True
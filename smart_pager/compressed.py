@@ -0,0 +1,230 @@
+"""Random access to gzip and zstd compressed logs."""
+
+import os
+import threading
+import zlib
+from bisect import bisect_right
+from typing import Iterator, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for .zst files
+    zstandard = None
+
+GZIP = 'gzip'
+ZSTD = 'zstd'
+MAGIC = {
+    GZIP: b'\x1f\x8b',
+    ZSTD: b'\x28\xb5\x2f\xfd',
+}
+
+# Decompressed bytes between saved decompressor states
+CHECKPOINT_INTERVAL = 8 * 1024 * 1024
+# Compressed bytes fed to the decompressor at a time
+READ_SIZE = 64 * 1024
+# Decompressed bytes kept around the last read, so nearby lines are free
+WINDOW_SIZE = 1024 * 1024
+
+
+def detect_compression(filename: str) -> Optional[str]:
+    """GZIP or ZSTD if the file starts with that format's magic bytes, else None."""
+    with open(filename, 'rb') as f:
+        return compression_of(f.read(4))
+
+
+def compression_of(header: bytes) -> Optional[str]:
+    """Compression format indicated by the first bytes of some data."""
+    for compression, magic in MAGIC.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def _decompressor(compression: str):
+    """Fresh decompressor for one gzip member or zstd frame."""
+    if compression == GZIP:
+        return zlib.decompressobj(zlib.MAX_WBITS | 16)
+    if zstandard is None:
+        raise RuntimeError("reading zstd files requires the zstandard package")
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+class StreamDecoder:
+    """Incremental decompression of data that can only be read once (a pipe).
+
+    Concatenated gzip members or zstd frames are decoded one after another;
+    zero padding and anything else trailing the last one is ignored.
+    """
+
+    def __init__(self, compression: str):
+        self.compression = compression
+        self._decompressor = None
+        self._done = False
+
+    def feed(self, data: bytes) -> bytes:
+        """Decompress the next piece of input."""
+        output = []
+        while data and not self._done:
+            if self._decompressor is None:
+                data = data.lstrip(b'\0')
+                magic = MAGIC[self.compression]
+                if not data:
+                    break
+                if not magic.startswith(data[:len(magic)]):
+                    self._done = True
+                    break
+                self._decompressor = _decompressor(self.compression)
+            output.append(self._decompressor.decompress(data))
+            if self._decompressor.eof:
+                data = self._decompressor.unused_data
+                self._decompressor = None
+            else:
+                data = b''
+        return b''.join(output)
+
+
+class DecompressedData:
+    """Byte-sliceable view of a compressed file's decompressed contents.
+
+    Reads resume from the nearest checkpoint: (decompressed offset,
+    compressed offset, decompressor state). Every gzip member and zstd frame
+    starts with a stateless checkpoint; inside a gzip member a copy of the
+    decompressor is saved every CHECKPOINT_INTERVAL bytes as they are first
+    decoded. zstd decompressors can't be copied, so a zstd file with one
+    large frame is always decoded from the start of the frame.
+
+    The decoder of the last read is kept, paused where its window ends, so
+    a read that continues forward (e.g. sequential read_lines calls) picks
+    up from there instead of decoding again from the checkpoint.
+    """
+
+    def __init__(self, filename: str, compression: str):
+        self.compression = compression
+        _decompressor(compression)  # Fail early if the format is unsupported
+        self._fd = os.open(filename, os.O_RDONLY)
+        self._lock = threading.Lock()
+        self._offsets = [0]  # Decompressed offset of each checkpoint
+        self._checkpoints = [(0, 0, None)]
+        self._window_start = 0
+        self._window = b''
+        self._decoder = None  # decode() generator paused at the end of the window
+
+    def close(self):
+        self._decoder = None
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def member_starts(self) -> Tuple[list, list]:
+        """Decompressed and compressed offsets of the stateless checkpoints."""
+        with self._lock:
+            pairs = [(out, pos) for out, pos, state in self._checkpoints if state is None]
+        return [out for out, _ in pairs], [pos for _, pos in pairs]
+
+    def add_member_starts(self, outs, positions):
+        """Restore stateless checkpoints saved by a previous run."""
+        for out, pos in zip(outs, positions):
+            self._add_checkpoint(out, pos, None)
+
+    def _add_checkpoint(self, out: int, pos: int, state):
+        with self._lock:
+            i = bisect_right(self._offsets, out)
+            if self._offsets[i - 1] == out:
+                return
+            self._offsets.insert(i, out)
+            self._checkpoints.insert(i, (out, pos, state))
+
+    def _maybe_checkpoint(self, out: int, pos: int, decompressor):
+        """Save the decompressor state if the previous checkpoint is far behind."""
+        if not hasattr(decompressor, 'copy'):
+            return
+        with self._lock:
+            previous = self._offsets[bisect_right(self._offsets, out) - 1]
+        if out - previous >= CHECKPOINT_INTERVAL:
+            self._add_checkpoint(out, pos, decompressor.copy())
+
+    def _next_member(self, pos: int) -> Optional[int]:
+        """Offset of the member or frame at or after pos, skipping zero padding."""
+        while True:
+            data = os.pread(self._fd, READ_SIZE, pos)
+            stripped = data.lstrip(b'\0')
+            if not stripped:
+                if len(data) < READ_SIZE:
+                    return None
+                pos += len(data)
+                continue
+            pos += len(data) - len(stripped)
+            if len(stripped) < 4 and len(data) == READ_SIZE:
+                stripped = os.pread(self._fd, 4, pos)
+            return pos if compression_of(stripped) == self.compression else None
+
+    def decode(self, index: int = 0) -> Iterator[Tuple[int, bytes]]:
+        """Yield (offset, data) pieces from checkpoint index to the end."""
+        with self._lock:
+            out, pos, state = self._checkpoints[index]
+        while True:  # One member or frame per iteration
+            decompressor = state.copy() if state is not None else _decompressor(self.compression)
+            state = None
+            while not decompressor.eof:
+                chunk = os.pread(self._fd, READ_SIZE, pos)
+                if not chunk:
+                    return  # Truncated: everything decodable has been yielded
+                pos += len(chunk)
+                data = decompressor.decompress(chunk)
+                if data:
+                    yield out, data
+                    out += len(data)
+                if not decompressor.eof:
+                    self._maybe_checkpoint(out, pos, decompressor)
+            pos = self._next_member(pos - len(decompressor.unused_data))
+            if pos is None:
+                return
+            self._add_checkpoint(out, pos, None)
+
+    def read(self, start: int, stop: int) -> bytes:
+        """Decompressed bytes in [start, stop)."""
+        with self._lock:
+            window_start, window = self._window_start, self._window
+            window_end = window_start + len(window)
+            if window_start <= start and stop <= window_end:
+                return window[start - window_start:stop - window_start]
+            index = bisect_right(self._offsets, start) - 1
+            checkpoint = self._offsets[index]
+            # Taken while in use: a generator can't be advanced by two threads
+            decoder, self._decoder = self._decoder, None
+
+        # Keep some context before and after the requested range
+        keep_from = max(checkpoint, start - WINDOW_SIZE // 2)
+        keep_to = max(stop, start + WINDOW_SIZE // 2)
+        pieces = []
+        first = None
+        if decoder is not None and window_start <= start and checkpoint <= window_end:
+            # Reading on: continue from the end of the window
+            if keep_from < window_end:
+                first = max(keep_from, window_start)
+                pieces.append(window[first - window_start:])
+        else:
+            decoder = self.decode(index)
+        for offset, data in decoder:
+            end = offset + len(data)
+            if end <= keep_from:
+                continue
+            if first is None:
+                first = offset
+            pieces.append(data)
+            if end >= keep_to:
+                break
+        else:
+            decoder = None  # Reached the end
+        if first is None:
+            return b''
+        window = b''.join(pieces)
+        trim = max(0, keep_from - first)
+        window, first = window[trim:], first + trim
+        with self._lock:
+            self._window_start, self._window = first, window
+            self._decoder = decoder
+        return window[start - first:stop - first]
+
+    def __getitem__(self, key: slice) -> bytes:
+        return self.read(key.start, key.stop)
@@ -0,0 +1,165 @@
+"""Asyncio event loop driving the pager."""
+
+import asyncio
+import signal
+from typing import Callable, List, Optional
+
+from .commands import KeyDispatcher
+from .follow import POLL_INTERVAL
+
+# Minimum time between frames; events in between are coalesced
+FRAME_TIME = 1 / 60
+
+
+class PagerApp:
+    """Runs a pager on asyncio, waking only for input, resizes and timers.
+
+    Every event marks the display dirty; frames are drawn at most once per
+    FRAME_TIME however many events arrive in between.
+    """
+
+    def __init__(self, pager, input_handler, draw: Callable[[], None],
+                 on_error: Optional[Callable[[Exception], None]] = None):
+        self.pager = pager
+        self.input_handler = input_handler
+        self.draw = draw
+        self.on_error = on_error
+        self.dispatcher = KeyDispatcher(pager)
+        self._timers: List[tuple] = []
+        self._watcher = None
+        self._watching = False
+        self._watch_fd = None
+        self._poll_handle = None
+        self._loop = None
+        self._done = None
+        self._draw_handle = None
+        self._last_draw = 0.0
+
+    def add_timer(self, interval: float, callback: Callable[[], bool]):
+        """Call callback every interval seconds; a True result triggers a redraw."""
+        self._timers.append((interval, callback))
+
+    def watch_file(self, watcher):
+        """Feed file change notifications to the pager's follow mode.
+
+        The file is only watched (or polled) while the pager is following it.
+        """
+        self._watcher = watcher
+
+    def _update_watch(self):
+        """Start or stop watching the file to match follow mode."""
+        if self._watcher is None or self.pager.following == self._watching:
+            return
+        if self.pager.following:
+            self._start_watching()
+        else:
+            self._stop_watching()
+
+    def _start_watching(self):
+        self._watching = True
+        self._watcher.start()
+        self._watch_fd = self._watcher.fileno()
+        if self._watch_fd is not None:
+            self._loop.add_reader(self._watch_fd, self._on_file_event)
+        else:
+            self._poll_handle = self._loop.call_later(POLL_INTERVAL, self._poll)
+
+    def _stop_watching(self):
+        self._watching = False
+        if self._watch_fd is not None:
+            self._loop.remove_reader(self._watch_fd)
+            self._watch_fd = None
+        if self._poll_handle is not None:
+            self._poll_handle.cancel()
+            self._poll_handle = None
+        self._watcher.close()
+
+    def request_redraw(self):
+        """Schedule a frame, no sooner than FRAME_TIME after the previous one."""
+        if self._draw_handle is None:
+            when = max(self._loop.time(), self._last_draw + FRAME_TIME)
+            self._draw_handle = self._loop.call_at(when, self._redraw)
+
+    def notify(self):
+        """Thread-safe wake-up for background workers (e.g. the line indexer)."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._on_progress)
+
+    def _guard(self, callback: Callable[[], None]):
+        try:
+            callback()
+        except Exception as e:
+            if self.on_error is None:
+                raise
+            self.on_error(e)
+            self.request_redraw()
+
+    def _redraw(self):
+        self._draw_handle = None
+        self._last_draw = self._loop.time()
+        self._guard(self.draw)
+
+    def _on_input(self):
+        def handle():
+            keys = self.input_handler.read_keys(timeout=0)
+            if self.dispatcher.feed(keys):
+                self.request_redraw()
+            self._update_watch()  # Follow mode may have been toggled
+            # A closed input can never deliver 'q', so treat it as quitting
+            if (self.dispatcher.quit or self.input_handler.eof) and not self._done.done():
+                self._done.set_result(None)
+        self._guard(handle)
+
+    def _on_resize(self):
+        # Redraw right away; the renderer picks up the new size
+        if self._draw_handle is not None:
+            self._draw_handle.cancel()
+            self._draw_handle = None
+        self._redraw()
+
+    def _on_file_event(self):
+        def handle():
+            if self._watcher.changed() and self.pager.check_file():
+                self.request_redraw()
+        self._guard(handle)
+
+    def _poll(self):
+        """Check the file for changes when inotify is unavailable."""
+        self._poll_handle = self._loop.call_later(POLL_INTERVAL, self._poll)
+        self._guard(lambda: self.pager.check_file() and self.request_redraw())
+
+    def _on_progress(self):
+        if self.pager.update():
+            self.request_redraw()
+
+    def _schedule_timer(self, interval: float, callback: Callable[[], bool]):
+        def tick():
+            if not self._done.done():
+                self._guard(lambda: callback() and self.request_redraw())
+                self._loop.call_later(interval, tick)
+        self._loop.call_later(interval, tick)
+
+    async def run(self):
+        """Draw the first frame and process events until the user quits."""
+        self._loop = asyncio.get_running_loop()
+        self._done = self._loop.create_future()
+        fd = self.input_handler.fileno()
+        self._loop.add_reader(fd, self._on_input)
+        self._loop.add_signal_handler(signal.SIGWINCH, self._on_resize)
+        self.pager.add_listener(self.notify)
+        self._update_watch()
+        for interval, callback in self._timers:
+            self._schedule_timer(interval, callback)
+        try:
+            # Catch up with progress made before the listener was attached
+            self.pager.update()
+            self._redraw()
+            await self._done
+        finally:
+            self.pager.remove_listener(self.notify)
+            self._loop.remove_signal_handler(signal.SIGWINCH)
+            self._loop.remove_reader(fd)
+            if self._watching:
+                self._stop_watching()
+            if self._draw_handle is not None:
+                self._draw_handle.cancel()
@@ -0,0 +1,159 @@
+"""Expanded JSON as a tree whose nodes are only built when opened and formatted when drawn."""
+
+import json
+from itertools import islice
+from typing import Any, Iterator, List, Optional
+
+from .json_scan import EmbeddedDict, EmbeddedList
+
+# Children of a container shown when it is opened; the rest wait behind a
+# "… N more" node that shows the next batch
+CHILD_LIMIT = 100
+
+
+def _count(n: int, word: str) -> str:
+    return f"{n:,} {word}" if n == 1 else f"{n:,} {word}s"
+
+
+class Node:
+    """One row of the tree: a value under its key, or a "… N more" placeholder.
+
+    size is the number of rows the node takes (itself plus everything
+    shown under it) so a row can be found without walking closed or
+    skipped subtrees.
+    """
+
+    __slots__ = ('label', 'value', 'depth', 'parent', 'children', 'is_open', 'size')
+
+    def __init__(self, label: Optional[str], value: Any, depth: int,
+                 parent: Optional['Node']):
+        self.label = label  # "key: " or "[i] "; None for a "… N more" node
+        self.value = value  # For a "… N more" node, how many children it stands for
+        self.depth = depth
+        self.parent = parent
+        self.children: Optional[List[Node]] = None  # Built the first time it is opened
+        self.is_open = False
+        self.size = 1
+
+    @property
+    def is_more(self) -> bool:
+        return self.label is None
+
+    @property
+    def can_open(self) -> bool:
+        return not self.is_more and isinstance(self.value, (dict, list)) and bool(self.value)
+
+    def text(self) -> str:
+        """The row as shown: indentation, open/closed marker, key and value or summary."""
+        indent = "  " * self.depth
+        if self.is_more:
+            return f"{indent}  … {self.value:,} more"
+        value = self.value
+        if self.can_open:
+            marker = "▾ " if self.is_open else "▸ "
+            if isinstance(value, dict):
+                summary = "{" + _count(len(value), "key") + "}"
+            else:
+                summary = "[" + _count(len(value), "item") + "]"
+            if isinstance(value, (EmbeddedDict, EmbeddedList)):
+                summary = f'"{summary}"'  # Decoded from JSON text in a string
+            return indent + marker + self.label + summary
+        return indent + "  " + self.label + json.dumps(value, ensure_ascii=False)
+
+
+class Expansion:
+    """Collapsible tree of one line's JSON values, addressed by row.
+
+    Each value starts with its top level open. Opening a node builds at
+    most CHILD_LIMIT child nodes, and rows are formatted only when drawn,
+    so a multi-megabyte payload costs no more than the part being looked at.
+    """
+
+    def __init__(self, values: List[Any]):
+        self.roots = [Node("", value, 0, None) for value in values]
+        for root in self.roots:
+            self.open(root)
+
+    def __len__(self) -> int:
+        return sum(root.size for root in self.roots)
+
+    def nodes(self, start: int = 0) -> Iterator[Node]:
+        """Nodes in row order from row start on."""
+        return self._walk(self.roots, start)
+
+    def _walk(self, nodes: List[Node], skip: int) -> Iterator[Node]:
+        for node in nodes:
+            if skip >= node.size:
+                skip -= node.size
+                continue
+            if skip == 0:
+                yield node
+            else:
+                skip -= 1
+            if node.is_open:
+                yield from self._walk(node.children, skip)
+            skip = 0
+
+    def node(self, index: int) -> Node:
+        return next(self.nodes(index))
+
+    def row(self, index: int) -> str:
+        """Text of one row."""
+        return self.node(index).text()
+
+    def rows(self, start: int = 0) -> Iterator[str]:
+        """Text of each row from row start on."""
+        return (node.text() for node in self.nodes(start))
+
+    def toggle(self, index: int):
+        """Open or close the node at a row; on a "… N more" row, show the next batch."""
+        node = self.node(index)
+        if node.is_more:
+            self._show_more(node)
+        elif node.is_open:
+            self.close(node)
+        else:
+            self.open(node)
+
+    def open(self, node: Node):
+        if not node.can_open or node.is_open:
+            return
+        if node.children is None:
+            node.children = []
+            self._add_children(node)
+        node.is_open = True
+        self._resize(node, sum(child.size for child in node.children))
+
+    def close(self, node: Node):
+        if node.is_open:
+            node.is_open = False
+            self._resize(node, 1 - node.size)
+
+    def _add_children(self, node: Node):
+        """Build the next CHILD_LIMIT children of node, then a "… N more" node if any are left."""
+        value = node.value
+        shown = len(node.children)
+        depth = node.depth + 1
+        if isinstance(value, dict):
+            for key, child in islice(value.items(), shown, shown + CHILD_LIMIT):
+                node.children.append(Node(f"{key}: ", child, depth, node))
+        else:
+            for i in range(shown, min(len(value), shown + CHILD_LIMIT)):
+                node.children.append(Node(f"[{i}] ", value[i], depth, node))
+        remaining = len(value) - len(node.children)
+        if remaining:
+            node.children.append(Node(None, remaining, depth, node))
+
+    def _show_more(self, more: Node):
+        parent = more.parent
+        parent.children.pop()
+        before = len(parent.children)
+        self._add_children(parent)
+        added = sum(child.size for child in parent.children[before:])
+        self._resize(parent, added - 1)
+
+    def _resize(self, node: Node, delta: int):
+        """Add delta rows to node and every node above it."""
+        while node is not None:
+            node.size += delta
+            node = node.parent
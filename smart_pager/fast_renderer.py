@@ -0,0 +1,158 @@
+"""Renderer that writes pre-styled ANSI rows directly, bypassing Rich's layout."""
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from rich.color import ColorSystem
+from rich.console import COLOR_SYSTEMS
+from rich.style import Style
+from rich.text import Text
+
+from .cells import cell_slice, cell_width
+from .pager import MINIMAP_WIDTH
+from .screen import Screen
+
+# Rounded box pieces, as drawn by Rich's box.ROUNDED
+TOP_LEFT, TOP_RIGHT, BOTTOM_LEFT, BOTTOM_RIGHT = "╭", "╮", "╰", "╯"
+HORIZONTAL, VERTICAL = "─", "│"
+
+
+def _fit(text: str, width: int) -> str:
+    """text cut or padded with spaces to exactly width cells."""
+    _, end, _ = cell_slice(text, 0, width)
+    text = text[:end]
+    return text + " " * (width - cell_width(text))
+
+
+def top_border(title: str, width: int) -> str:
+    """Top edge of a box width cells wide with a title at the left, like a Rich Panel."""
+    inner = width - 2
+    label = f" {title} "
+    if cell_width(label) > inner - 2:
+        label = _fit(label, max(0, inner - 2))
+    rule = HORIZONTAL + label
+    return TOP_LEFT + rule + HORIZONTAL * (inner - cell_width(rule)) + TOP_RIGHT
+
+
+def bottom_border(width: int) -> str:
+    return BOTTOM_LEFT + HORIZONTAL * (width - 2) + BOTTOM_RIGHT
+
+
+class FastRenderer:
+    """Draws the pager's frame as ANSI rows written with one os.write.
+
+    The rows' styled text comes from the same pager methods the Rich
+    renderer uses (content rows, minimap, status line), so both look the
+    same; only the boxes, padding and style escapes are produced here.
+    Combined styles are cached by the styles they combine, and the frame
+    is diffed against the previous one and encoded into one reused buffer.
+    """
+
+    def __init__(self, pager, fd: int, color_system: Optional[str] = "truecolor"):
+        self.pager = pager
+        self.fd = fd
+        self.color_system: Optional[ColorSystem] = COLOR_SYSTEMS.get(color_system)
+        self.screen = Screen()
+        self._buffer = bytearray()
+        self._styles: Dict[tuple, Style] = {}
+
+    def _style(self, key: tuple) -> Style:
+        style = self._styles.get(key)
+        if style is None:
+            style = self._styles[key] = Style.combine(
+                [Style()] + [Style.parse(s) if isinstance(s, str) else s for s in key if s])
+        return style
+
+    def ansi(self, text: Text) -> str:
+        """text as a string with SGR escapes, its spans layered as Rich layers them."""
+        plain = text.plain
+        if not text.spans:
+            if not text.style or self.color_system is None:
+                return plain
+            return self._style((text.style,)).render(plain, color_system=self.color_system)
+        if self.color_system is None:
+            return plain
+        # Sweep the span edges; at equal offsets ends come before starts
+        edges = sorted([(span.start, 1, i) for i, span in enumerate(text.spans)]
+                       + [(span.end, 0, i) for i, span in enumerate(text.spans)])
+        spans = text.spans
+        active = []
+        out = []
+        pos = 0
+        for offset, starting, i in edges:
+            if offset > pos:
+                style = self._style((text.style,) + tuple(spans[k].style for k in sorted(active)))
+                out.append(style.render(plain[pos:offset], color_system=self.color_system))
+                pos = offset
+            if starting:
+                active.append(i)
+            else:
+                active.remove(i)
+        if pos < len(plain):
+            out.append(self._style((text.style,)).render(plain[pos:],
+                                                         color_system=self.color_system))
+        return "".join(out)
+
+    def _padded(self, text: Text, width: int) -> str:
+        """text (already clipped to width) as ANSI, padded to width cells."""
+        return self.ansi(text) + " " * max(0, width - cell_width(text.plain))
+
+    def _status(self, width: int) -> str:
+        """The status line cut at the last word that fits, as a one-row Rich Layout does."""
+        status = self.pager._render_status()
+        plain = status.plain
+        _, end, _ = cell_slice(plain, 0, width)
+        if end < len(plain):
+            cut = plain.rfind(" ", 0, end + 1)
+            status = status[:min(cut + 1, end) if cut > 0 else end]
+        return self._padded(status, width)
+
+    def rows(self, size: Tuple[int, int]) -> List[str]:
+        """The frame for a terminal of size (width, height), one string per row."""
+        pager = self.pager
+        width, height = size
+        content = [self._padded(row, pager.content_width) for row in pager._render_rows()]
+        sidebar = None
+        if pager.show_minimap:
+            sidebar = [self._padded(row, MINIMAP_WIDTH - 4)
+                       for row in pager._render_minimap().split("\n")]
+        main_width = width - MINIMAP_WIDTH if sidebar is not None else width
+        inner = main_width - 4
+        blank = " " * inner
+
+        rows = []
+        for i in range(height - 1):
+            if i == 0:
+                row = top_border(pager.title, main_width)
+                if sidebar is not None:
+                    row += top_border(pager.minimap_title, MINIMAP_WIDTH)
+            elif i == height - 2:
+                row = bottom_border(main_width)
+                if sidebar is not None:
+                    row += bottom_border(MINIMAP_WIDTH)
+            else:
+                line = content[i - 1] if i - 1 < len(content) else blank
+                row = f"{VERTICAL} {line} {VERTICAL}"
+                if sidebar is not None:
+                    side = sidebar[i - 1] if i - 1 < len(sidebar) else " " * (MINIMAP_WIDTH - 4)
+                    row += f"{VERTICAL} {side} {VERTICAL}"
+            rows.append(row)
+        rows.append(self._status(width))
+        return rows
+
+    def draw(self, size: Tuple[int, int]):
+        """Write the rows that changed since the last frame with a single write."""
+        output = self.screen.diff(self.rows(size), size, self.pager.content_region())
+        if not output:
+            return
+        buffer = self._buffer
+        buffer.clear()
+        buffer += output.encode()
+        written = 0
+        with memoryview(buffer) as view:
+            while written < len(view):  # Loops only on a partial write
+                written += os.write(self.fd, view[written:])
+
+    def invalidate(self):
+        """Repaint everything on the next draw."""
+        self.screen.invalidate()
@@ -0,0 +1,260 @@
+"""Lazy JSON field indexes and the filtered views built on them."""
+
+import json
+import threading
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .json_cache import classify_line
+from .json_scan import decode_embedded
+from .search import SEARCH_CHUNK, line_ranges
+
+# Distinct values recorded per field before it is treated as unindexable
+# (request ids, timestamps); only explicitly wanted values are kept after that
+MAX_FIELD_VALUES = 10000
+
+# What field_value returns for a path a line doesn't have (None is a JSON value)
+MISSING = object()
+
+
+def parse_condition(condition: str) -> Tuple[str, str]:
+    """Split 'field=value' (field may be a dotted path, value may be quoted)."""
+    field, sep, value = condition.partition('=')
+    field = field.strip()
+    value = value.strip()
+    if not sep or not field:
+        raise ValueError(f"expected field=value, got {condition!r}")
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+        value = value[1:-1]
+    return field, value
+
+
+def value_key(value: Any) -> str:
+    """Text a JSON value is filed under: strings as-is, anything else as compact JSON."""
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+def field_value(values: List[Any], path: List[str], depth: int = 0) -> Any:
+    """Value at a dotted path in the first of a line's JSON values that has it.
+
+    With depth, the path may continue into JSON held in string values
+    (msg.inner in {"msg": "{\\"inner\\": 1}"}), through up to depth such strings.
+    Returns MISSING if no value has the path.
+    """
+    for value in values:
+        budget = depth
+        for key in path:
+            if isinstance(value, str) and budget > 0:
+                value = decode_embedded(value)
+                budget -= 1
+            if not isinstance(value, dict) or key not in value:
+                value = MISSING
+                break
+            value = value[key]
+        if value is not MISSING:
+            return value
+    return MISSING
+
+
+class FieldIndex:
+    """Posting lists for one JSON field: value -> sorted numbers of the lines having it.
+
+    Lines are scanned on a worker thread in order, so each list only grows
+    at the end and views over it stay valid while it fills. Once a field
+    has more than MAX_FIELD_VALUES distinct values it overflows: only the
+    values already wanted keep being recorded, and callers scan for any
+    other value with a FieldIndex restricted to it (only=value).
+    """
+
+    def __init__(self, index, field: str, only: Optional[str] = None,
+                 on_progress: Optional[Callable[[], None]] = None, depth: int = 0):
+        self.index = index
+        self.field = field
+        self.on_progress = on_progress
+        self.depth = depth  # Levels of JSON-in-a-string the path may go through
+        self._path = field.split('.')
+        # Lines without the key's name anywhere can't have the field; inside
+        # a string the key's quotes are escaped, so look for the bare name.
+        # A non-ASCII name may be written as UTF-8 or as \u escapes, and
+        # escapes are escaped again inside a string, so there look for neither.
+        key = self._path[-1]
+        needles = {json.dumps(key, ensure_ascii=False), json.dumps(key)}
+        if depth:
+            needles = {needle[1:-1] for needle in needles} if key.isascii() else {''}
+        self._needles = tuple(needle.encode() for needle in needles)
+        self._lock = threading.Lock()
+        self.postings: Dict[str, array] = {}
+        self._wanted = set()  # Values a view is filtering on
+        self.overflowed = False
+        if only is not None:
+            self.want(only)
+            self.overflowed = True  # Record nothing else
+        self.scanned = 0  # Lines [0, scanned) have been examined
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Scan in the background; resumes where it stopped if the file has grown."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.index.complete and self.scanned >= len(self.index):
+            self.done = True
+            return
+        self.done = False
+        self._thread = threading.Thread(target=self._run, name="field-index", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout: float = None):
+        """Wait for the scan to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def snapshot(self) -> Tuple[int, Dict[str, array]]:
+        """(scanned, postings) as of now, for saving."""
+        with self._lock:
+            return self.scanned, {value: array('Q', lines)
+                                  for value, lines in self.postings.items()}
+
+    def restore(self, scanned: int, postings: Dict[str, array]):
+        """Start from saved postings covering lines [0, scanned)."""
+        with self._lock:
+            for lines in postings.values():
+                while lines and lines[-1] >= scanned:
+                    lines.pop()
+            self.postings = postings
+            self.scanned = scanned
+
+    def rewind(self, line: int):
+        """Forget lines from line on, so the next start() scans them again.
+
+        For a last line that may still have been being written when it was scanned.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._cancel.set()
+            self._thread.join()
+            self._cancel = threading.Event()
+        with self._lock:
+            if self.scanned <= line:
+                return
+            for lines in self.postings.values():
+                while lines and lines[-1] >= line:
+                    lines.pop()
+            self.scanned = line
+            self.done = False
+
+    def want(self, value: str) -> Optional[array]:
+        """The (growing) list of lines with value, or None if the field overflowed first."""
+        with self._lock:
+            lines = self.postings.get(value)
+            if lines is None:
+                if self.overflowed:
+                    return None
+                lines = self.postings[value] = array('Q')
+            self._wanted.add(value)
+            return lines
+
+    def _has_key(self, data: bytes) -> bool:
+        """Whether data might hold the field: its key's name appears somewhere."""
+        return any(needle in data for needle in self._needles)
+
+    def _match_range(self, first: int, stop: int) -> Dict[str, List[int]]:
+        """Lines in [first, stop) grouped by their value of the field."""
+        found: Dict[str, List[int]] = {}
+        data = self.index.read_lines(first, stop)
+        if not self._has_key(data):
+            return found
+        for line, raw in zip(range(first, stop), data.split(b'\n')):
+            if not self._has_key(raw):
+                continue
+            info = classify_line(raw.decode('utf-8', errors='replace').rstrip('\r'))
+            if not info.is_json:
+                continue
+            value = field_value(info.values, self._path, self.depth)
+            if value is not MISSING:
+                found.setdefault(value_key(value), []).append(line)
+        return found
+
+    def _record(self, found: Dict[str, List[int]], stop: int):
+        with self._lock:
+            for key, lines in found.items():
+                postings = self.postings.get(key)
+                if postings is None:
+                    if self.overflowed:
+                        continue
+                    if len(self.postings) >= MAX_FIELD_VALUES:
+                        # Keep only the values someone is already filtering on
+                        self.overflowed = True
+                        self.postings = {k: self.postings[k] for k in self._wanted}
+                        continue
+                    postings = self.postings[key] = array('Q')
+                postings.extend(lines)
+            self.scanned = stop
+
+    def _run(self):
+        for first, stop in line_ranges(self.index, self.scanned, None, SEARCH_CHUNK,
+                                       self._cancel):
+            self._record(self._match_range(first, stop), stop)
+            if self.on_progress is not None:
+                self.on_progress()
+        if not self._cancel.is_set():
+            self.done = True
+        if self.on_progress is not None:
+            self.on_progress()
+
+
+class AllLines:
+    """The unfiltered view: position i is line i."""
+
+    done = True
+
+    def __init__(self, lines):
+        self.lines = lines
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, pos: int) -> int:
+        count = len(self.lines)
+        if pos < 0:
+            pos += count
+        if not 0 <= pos < count:
+            raise IndexError("view position out of range")
+        return pos
+
+    def position(self, line: int) -> int:
+        return line
+
+
+class FilterView:
+    """The lines whose field has a given value, filling in as its index is built."""
+
+    def __init__(self, field: str, value: str, source: FieldIndex, lines: array):
+        self.field = field
+        self.value = value
+        self.source = source
+        self.lines = lines
+
+    @property
+    def done(self) -> bool:
+        return self.source.done
+
+    @property
+    def description(self) -> str:
+        return f"{self.field}={self.value}"
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def __getitem__(self, pos: int) -> int:
+        return self.lines[pos]
+
+    def position(self, line: int) -> int:
+        """Position of line, or of the first line after it if it isn't in the view."""
+        return bisect_left(self.lines, line)
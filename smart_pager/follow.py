@@ -0,0 +1,99 @@
+"""Watch a file for changes while following it."""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from typing import Optional
+
+# How often to stat the file when inotify is unavailable
+POLL_INTERVAL = 0.25
+
+# inotify constants from <sys/inotify.h>
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_DIR_EVENTS = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM |
+               _IN_MOVED_TO | _IN_CREATE | _IN_DELETE)
+_EVENT_HEADER = struct.Struct('iIII')  # wd, mask, cookie, name length
+
+
+def _load_inotify():
+    """libc with inotify support, or None."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        libc.inotify_init1  # Raises AttributeError if missing
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class FileWatcher:
+    """Reports changes to one file, via inotify where available.
+
+    The parent directory is watched rather than the file itself, so a
+    rotated log (renamed away and recreated) keeps being noticed. Nothing
+    is watched until start(), and close() stops watching until the next
+    start(). Without inotify, fileno() is None and callers poll every
+    POLL_INTERVAL seconds.
+    """
+
+    def __init__(self, filename: str):
+        self.name = os.path.basename(filename).encode()
+        self.directory = os.path.dirname(os.path.abspath(filename)).encode()
+        self._fd = None
+
+    def start(self):
+        """Begin watching (does nothing if already watching or inotify is unavailable)."""
+        if self._fd is not None:
+            return
+        libc = _load_inotify()
+        if libc is None:
+            return
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if fd < 0:
+            return
+        if libc.inotify_add_watch(fd, self.directory, _DIR_EVENTS) < 0:
+            os.close(fd)
+            return
+        self._fd = fd
+
+    def fileno(self) -> Optional[int]:
+        """inotify descriptor to wait on, or None if polling is needed."""
+        return self._fd
+
+    def changed(self) -> bool:
+        """Consume pending events. Returns True if any concerned the file."""
+        if self._fd is None:
+            return True  # Polling: always worth a stat
+        changed = False
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            pos = 0
+            while pos < len(data):
+                _, _, _, length = _EVENT_HEADER.unpack_from(data, pos)
+                pos += _EVENT_HEADER.size
+                name = data[pos:pos + length].rstrip(b'\0')
+                pos += length
+                if name == self.name:
+                    changed = True
+        return changed
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
@@ -1,52 +1,124 @@
 """Input handling utilities."""
 
+import codecs
+import os
+import re
 import sys
 import select
 import termios
 import tty
+from typing import List, Optional, Tuple
+
+# Longest time to wait for the rest of an escape sequence
+ESCAPE_TIMEOUT = 0.05
+READ_SIZE = 4096
+
+# CSI (ESC [ params final), SS3 (ESC O x) or any other ESC-prefixed char
+_ESCAPE = re.compile(r'\x1b(?:\[[0-?]*[ -/]*[@-~]|O.|[^\[O])', re.DOTALL)
+# Prefixes that may still grow into a complete escape sequence
+_PARTIAL_ESCAPE = re.compile(r'\x1b(?:\[[0-?]*[ -/]*|O)?\Z')
+
+
+def parse_keys(text: str) -> Tuple[List[str], str]:
+    """Split raw terminal input into key events.
+
+    Returns (keys, rest) where rest is a trailing, possibly incomplete
+    escape sequence that should be retried once more input arrives.
+    """
+    keys = []
+    pos = 0
+    while pos < len(text):
+        if text[pos] == '\x1b':
+            match = _ESCAPE.match(text, pos)
+            if match is None:
+                if _PARTIAL_ESCAPE.match(text, pos):
+                    return keys, text[pos:]
+                keys.append('\x1b')
+                pos += 1
+                continue
+            keys.append(match.group())
+            pos = match.end()
+        else:
+            keys.append(text[pos])
+            pos += 1
+    return keys, ''
 
 
 class InputHandler:
     """Handle terminal input in a cross-platform way."""
-    
+
     def __init__(self):
         self.old_settings = None
-        
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending: List[str] = []
+        self._tty = None  # /dev/tty when stdin is a pipe carrying data
+        self.eof = False  # Input was closed
+
     def __enter__(self):
         """Enter raw mode."""
-        if sys.stdin.isatty():
-            self.old_settings = termios.tcgetattr(sys.stdin.fileno())
-            tty.setraw(sys.stdin.fileno())
+        if not sys.stdin.isatty():
+            # Keys come from the controlling terminal while stdin is piped
+            try:
+                self._tty = open('/dev/tty', 'rb', buffering=0)
+            except OSError:
+                self._tty = None
+        fd = self.fileno()
+        if os.isatty(fd):
+            self.old_settings = termios.tcgetattr(fd)
+            tty.setraw(fd)
         return self
-        
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Exit raw mode."""
         if self.old_settings:
-            termios.tcsetattr(sys.stdin.fileno(), termios.TCSADRAIN, self.old_settings)
-    
+            termios.tcsetattr(self.fileno(), termios.TCSADRAIN, self.old_settings)
+        if self._tty is not None:
+            self._tty.close()
+            self._tty = None
+
+    def fileno(self) -> int:
+        if self._tty is not None:
+            return self._tty.fileno()
+        return sys.stdin.fileno()
+
+    def _ready(self, timeout: Optional[float]) -> bool:
+        ready, _, _ = select.select([self.fileno()], [], [], timeout)
+        return bool(ready)
+
+    def _drain(self) -> str:
+        """Read every byte that is currently available."""
+        chunks = []
+        while True:
+            data = os.read(self.fileno(), READ_SIZE)
+            if not data:
+                self.eof = True
+                break
+            chunks.append(data)
+            if len(data) < READ_SIZE or not self._ready(0):
+                break
+        return self._decoder.decode(b''.join(chunks))
+
+    def read_keys(self, timeout: Optional[float] = None) -> List[str]:
+        """Return all pending key events at once, waiting up to timeout for the first."""
+        if self._pending:
+            keys, self._pending = self._pending, []
+            return keys
+        if not self._ready(timeout):
+            return []
+
+        keys, rest = parse_keys(self._drain())
+        # Give a split escape sequence a moment to arrive in full
+        while rest and self._ready(ESCAPE_TIMEOUT):
+            more, rest = parse_keys(rest + self._drain())
+            keys.extend(more)
+        if rest:
+            keys.extend(rest)  # A lone ESC (or a truncated sequence) as plain keys
+        return keys
+
     def get_key(self, timeout=None):
         """Get a key with optional timeout."""
-        if timeout is not None:
-            ready, _, _ = select.select([sys.stdin], [], [], timeout)
-            if not ready:
+        if not self._pending:
+            self._pending = self.read_keys(timeout)
+            if not self._pending:
                 return None
-        
-        key = sys.stdin.read(1)
-        
-        # Handle escape sequences
-        if key == '\x1b':
-            # Try to read more characters for escape sequences
-            try:
-                if timeout is not None:
-                    ready, _, _ = select.select([sys.stdin], [], [], 0.1)
-                    if ready:
-                        key += sys.stdin.read(1)
-                        ready, _, _ = select.select([sys.stdin], [], [], 0.1)
-                        if ready:
-                            key += sys.stdin.read(1)
-                else:
-                    key += sys.stdin.read(2)
-            except:
-                pass
-        
-        return key
+        return self._pending.pop(0)
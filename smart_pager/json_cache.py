@@ -0,0 +1,220 @@
+"""Per-line JSON classification cache."""
+
+import sys
+from collections import OrderedDict
+from array import array
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .json_scan import decode_nested, decode_spans, tokenize
+from .line_meta import UNKNOWN, LineMeta
+
+# Line kinds
+PLAIN = 0
+JSON = 1
+INVALID = 2  # Looks like JSON but does not parse
+
+# Decoded values of spans up to this many characters are kept from the
+# classification pass; bigger ones are decoded again whenever needed and
+# never kept, so the cache holds no more for them than their text and tokens
+KEEP_PARSED_CHARS = 16 * 1024
+
+# Bytes of line text the cache may hold, whatever the number of lines
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+_UNPARSED = object()
+
+
+class LineInfo:
+    """Classification of a single line: kind, JSON spans and lazily parsed values."""
+
+    __slots__ = ('kind', 'spans', 'text', '_values', '_nested', '_tokens')
+
+    def __init__(self, kind: int, spans: List[Tuple[int, int]], text: str,
+                 values: Any = _UNPARSED):
+        self.kind = kind
+        self.spans = spans  # (start, end) of each JSON part within text
+        self.text = text
+        self._values = values
+        self._nested = None  # (depth, values) from nested_values()
+        self._tokens = None  # From tokens
+
+    @property
+    def is_json(self) -> bool:
+        return self.kind == JSON
+
+    @property
+    def looks_like_json(self) -> bool:
+        return self.kind == INVALID
+
+    @property
+    def span(self) -> Optional[Tuple[int, int]]:
+        """The first JSON span, if any."""
+        return self.spans[0] if self.spans else None
+
+    @property
+    def json_text(self) -> Optional[str]:
+        """The first JSON portion of the line, if any."""
+        if not self.spans:
+            return None
+        start, end = self.spans[0]
+        return self.text[start:end]
+
+    @property
+    def values(self) -> List[Any]:
+        """Parsed value of every JSON span, decoded on first access.
+
+        Kept only for lines whose JSON is at most KEEP_PARSED_CHARS long.
+        """
+        if self._values is _UNPARSED:
+            if not self.is_json:
+                self._values = []
+                return self._values
+            valid, _ = decode_spans(self.text)
+            values = [value for _, _, value in valid]
+            if not self._keeps_parsed():
+                return values
+            self._values = values
+        return self._values
+
+    def _keeps_parsed(self) -> bool:
+        return sum(end - start for start, end in self.spans) <= KEEP_PARSED_CHARS
+
+    def nested_values(self, depth: int) -> List[Any]:
+        """values with JSON held in string values decoded, depth levels deep.
+
+        Memoized like values, so the recursive decode is done once per
+        cached line unless the line is too long to keep its values.
+        """
+        if depth <= 0:
+            return self.values
+        if self._nested is None or self._nested[0] != depth:
+            nested = [decode_nested(value, depth) for value in self.values]
+            if not self._keeps_parsed():
+                return nested
+            self._nested = (depth, nested)
+        return self._nested[1]
+
+    @property
+    def tokens(self) -> Tuple[array, array, bytearray]:
+        """(starts, ends, kinds) of the tokens in every JSON span, in order.
+
+        Found on first access and kept while the line stays cached, so
+        redrawing a line doesn't tokenize it again.
+        """
+        if self._tokens is None:
+            tokens = (array('I'), array('I'), bytearray())
+            for start, end in self.spans if self.is_json else ():
+                tokenize(self.text, start, end, tokens)
+            self._tokens = tokens
+        return self._tokens
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held by the line's text and memoized tokens."""
+        size = sys.getsizeof(self.text)
+        if self._tokens is not None:
+            starts, ends, kinds = self._tokens
+            size += (len(starts) + len(ends)) * starts.itemsize + len(kinds)
+        return size
+
+    @property
+    def parsed(self) -> Any:
+        """Parsed value of the first JSON span (None unless valid)."""
+        values = self.values
+        return values[0] if values else None
+
+
+def classify_line(line: str) -> LineInfo:
+    """Classify a line as valid JSON, invalid JSON-looking text or plain text."""
+    valid, broken = decode_spans(line)
+    if valid:
+        spans = [(start, end) for start, end, _ in valid]
+        values = _UNPARSED
+        if sum(end - start for start, end in spans) <= KEEP_PARSED_CHARS:
+            values = [value for _, _, value in valid]
+        return LineInfo(JSON, spans, line, values)
+
+    # Broken brackets only count as JSON-looking if they contain quotes
+    for start, end in broken:
+        part = line[start:end]
+        if '"' in part or "'" in part:
+            return LineInfo(INVALID, [(start, end)], line)
+    return LineInfo(PLAIN, [], line)
+
+
+class JsonCache:
+    """Bounded LRU of LineInfo keyed by line number.
+
+    Bounded both by line count and by the bytes the lines hold, so a few
+    huge lines can't pin gigabytes of text; the line being fetched is
+    always kept, even if it alone is over budget. Tokens are memoized
+    after a line is fetched, so a line is measured again when it is next
+    fetched or the next line is added. Parsed values aren't counted: they
+    are only kept for lines short enough that their text dominates.
+
+    The kind and first span of every line ever classified are also kept
+    in a LineMeta, beyond the LRU's reach; lines known to be plain are
+    never scanned again.
+    """
+
+    def __init__(self, capacity: int = 4096, max_bytes: int = MAX_CACHE_BYTES):
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[int, LineInfo]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}  # Bytes each entry was counted as
+        self.nbytes = 0
+        self.meta = LineMeta()
+        self.classified = 0  # Lines whose kind was recorded (to spot unsaved work)
+
+    def get(self, line_num: int, load_line: Callable[[int], str]) -> LineInfo:
+        """Return the classification for a line, classifying it on a miss."""
+        info = self._entries.get(line_num)
+        if info is not None:
+            self._entries.move_to_end(line_num)
+            self._measure(line_num, info)
+            return info
+        if self._entries:
+            # The last line fetched has likely been drawn (and tokenized) since
+            last = next(reversed(self._entries))
+            self._measure(last, self._entries[last])
+        if self.meta.kind(line_num) == PLAIN:
+            info = LineInfo(PLAIN, [], load_line(line_num))
+        else:
+            info = classify_line(load_line(line_num))
+            self.meta.record(line_num, info.kind)
+            self.classified += 1
+        self._entries[line_num] = info
+        self._sizes[line_num] = 0
+        self._measure(line_num, info)
+        return info
+
+    def _measure(self, line_num: int, info: LineInfo):
+        """Count a cached line at its current size, evicting others if that's over budget."""
+        size = info.nbytes
+        self.nbytes += size - self._sizes[line_num]
+        self._sizes[line_num] = size
+        self._evict()
+
+    def _evict(self):
+        """Drop least recently used lines until within capacity and budget."""
+        entries = self._entries
+        while len(entries) > 1 and (len(entries) > self.capacity
+                                    or self.nbytes > self.max_bytes):
+            line_num, _ = entries.popitem(last=False)
+            self.nbytes -= self._sizes.pop(line_num)
+
+    def discard(self, line_num: int):
+        """Forget one line (e.g. a partial last line that has grown)."""
+        if self._entries.pop(line_num, None) is not None:
+            self.nbytes -= self._sizes.pop(line_num)
+        self.meta.forget(line_num)
+
+    def clear(self):
+        """Forget all classifications (e.g. after the file changed)."""
+        self._entries.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+        self.meta.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,172 @@
+"""Single-pass JSON span detection for log lines."""
+
+import json
+import re
+from array import array
+from typing import Any, List, Tuple
+
+# Characters that matter to bracket matching
+_STRUCTURAL = re.compile(r'[{}\[\]"]')
+# A complete JSON string starting at a quote, escapes included
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"')
+_CLOSER = {'{': '}', '[': ']'}
+
+_decoder = json.JSONDecoder()
+
+
+def find_json_spans(line: str) -> List[Tuple[int, int, bool]]:
+    """Find every top-level bracketed span in a line.
+
+    Returns (start, end, balanced) tuples in order. Brackets inside JSON
+    strings are ignored; an unbalanced span (mismatched closer or end of
+    line reached while open) is still reported so callers can flag it as
+    broken JSON.
+    """
+    spans = []
+    stack = []
+    span_start = 0
+    pos = 0
+    while True:
+        match = _STRUCTURAL.search(line, pos)
+        if match is None:
+            break
+        char = match.group()
+        index = match.start()
+        pos = index + 1
+
+        if char == '"':
+            # Quotes only matter inside a span; outside they are prose
+            if stack:
+                string = _STRING.match(line, index)
+                if string is None:
+                    break  # Unterminated string runs to the end of the line
+                pos = string.end()
+        elif char in _CLOSER:
+            if not stack:
+                span_start = index
+            stack.append(_CLOSER[char])
+        elif stack:
+            if char == stack[-1]:
+                stack.pop()
+                if not stack:
+                    spans.append((span_start, pos, True))
+            else:
+                spans.append((span_start, pos, False))
+                stack.clear()
+
+    if stack:
+        spans.append((span_start, len(line), False))
+    return spans
+
+
+def decode_spans(line: str) -> Tuple[List[Tuple[int, int, Any]], List[Tuple[int, int]]]:
+    """Decode the candidate spans of a line, each at most once.
+
+    Returns (valid, broken): valid holds (start, end, value) for spans that
+    decode exactly; broken holds (start, end) for candidates that failed.
+    """
+    valid = []
+    broken = []
+    for start, end, balanced in find_json_spans(line):
+        if balanced:
+            try:
+                value, stop = _decoder.raw_decode(line, start)
+            except ValueError:
+                pass
+            else:
+                if stop == end:
+                    valid.append((start, end, value))
+                    continue
+        broken.append((start, end))
+    return valid, broken
+
+
+# Token kinds from tokenize(); punctuation and whitespace aren't reported
+KEY, STRING, NUMBER, LITERAL = range(4)
+# One alternative per token kind, in group order: a string (a key if a colon
+# follows), a number, a literal, punctuation
+_TOKEN = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*")(\s*:)?'
+                    r'|(-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)'
+                    r'|(true|false|null)'
+                    r'|[{}\[\],:]')
+# Token kind for each group the regex can end on (its lastindex)
+_GROUP_KINDS = {1: STRING, 2: KEY, 3: NUMBER, 4: LITERAL}
+
+
+def tokenize(text: str, start: int = 0, end: int = None,
+             tokens: Tuple[array, array, bytearray] = None) -> Tuple[array, array, bytearray]:
+    """(starts, ends, kinds) of the keys, strings, numbers and literals in text[start:end].
+
+    One regex pass over JSON already known to be valid; tokens are
+    appended to tokens if given, so several spans can share one set of
+    arrays, kept in order for bisection.
+    """
+    starts, ends, kinds = tokens if tokens is not None else (array('I'), array('I'), bytearray())
+    end = len(text) if end is None else end
+    for match in _TOKEN.finditer(text, start, end):
+        kind = _GROUP_KINDS.get(match.lastindex)
+        if kind is None:
+            continue  # Punctuation
+        starts.append(match.start())
+        ends.append(match.end(1) if kind == KEY else match.end())
+        kinds.append(kind)
+    return starts, ends, kinds
+
+
+# Levels of JSON held in string values decoded by default: '{"msg": "{\"a\": 1}"}'
+# needs one, a string inside that inner object would need two
+NESTED_DEPTH = 2
+
+# A string that may hold a JSON object or array
+_EMBEDDED = re.compile(r'\s*[{\[]')
+
+
+class EmbeddedDict(dict):
+    """An object decoded from JSON text held in a string value."""
+
+
+class EmbeddedList(list):
+    """An array decoded from JSON text held in a string value."""
+
+
+def decode_embedded(text: str) -> Any:
+    """The object or array a string value holds as JSON text, or None."""
+    if not _EMBEDDED.match(text) or text.rstrip()[-1:] not in ('}', ']'):
+        return None
+    try:
+        value = json.loads(text)
+    except ValueError:
+        return None
+    if isinstance(value, dict):
+        return EmbeddedDict(value)
+    if isinstance(value, list):
+        return EmbeddedList(value)
+    return None
+
+
+def decode_nested(value: Any, depth: int = NESTED_DEPTH) -> Any:
+    """value with JSON held in strings decoded, up to depth levels of strings deep.
+
+    Decoded containers are EmbeddedDict/EmbeddedList so they can be told
+    apart from the original structure. Containers with nothing to decode
+    are returned as they are rather than copied.
+    """
+    if isinstance(value, str):
+        if depth <= 0:
+            return value
+        embedded = decode_embedded(value)
+        return value if embedded is None else decode_nested(embedded, depth - 1)
+    if isinstance(value, dict):
+        items = value.items()
+    elif isinstance(value, list):
+        items = enumerate(value)
+    else:
+        return value
+    copy = None
+    for key, child in items:
+        decoded = decode_nested(child, depth)
+        if decoded is not child:
+            if copy is None:
+                copy = type(value)(value)
+            copy[key] = decoded
+    return value if copy is None else copy
@@ -0,0 +1,381 @@
+"""Memory-mapped line index for large files."""
+
+import mmap
+import os
+import threading
+from array import array
+from itertools import accumulate, islice
+from typing import Callable, Iterator, List, Union
+
+from . import cache
+from .compressed import DecompressedData, StreamDecoder, compression_of
+
+# Bytes scanned per indexing step
+CHUNK_SIZE = 4 * 1024 * 1024
+# Smaller first step so the first screen is available almost immediately
+FIRST_CHUNK_SIZE = 256 * 1024
+
+# Bytes requested per read from a pipe
+READ_SIZE = 64 * 1024
+
+# Results of LineIndex.refresh()
+UNCHANGED = 0
+GROWN = 1  # Data was appended
+RESET = 2  # File was truncated or replaced (rotation); line numbers restart
+
+
+class LineIndex:
+    """Sequence of decoded lines backed by an mmap and a line-start offset array.
+
+    Only the offsets are kept in memory (8 bytes per line); line text is
+    decoded from the mapping on demand, so memory use does not depend on
+    file size.
+    """
+
+    streaming = False  # Data arrives from a pipe rather than a file
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._file = open(filename, 'rb')
+        self._init_threading()
+        self._reset()
+
+    def _init_threading(self):
+        self._lock = threading.RLock()
+        self._progress = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._listeners: List[Callable[[], None]] = []
+
+    def _map_file(self):
+        """(Re)map the open file at its current size."""
+        self.size = os.fstat(self._file.fileno()).st_size
+        # mmap refuses zero-length files; an empty bytes object behaves the same
+        if self.size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b''
+
+    def _reset(self):
+        """Map the file and forget every indexed line."""
+        self._map_file()
+        # starts[i] is the byte offset of line i; the last entry is the start
+        # of the line currently being scanned (or EOF)
+        self.starts = array('Q', [0])
+        self.indexed_bytes = 0
+        self.complete = False
+
+    def close(self):
+        """Stop background indexing and release the mapping and file handle."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+            self._thread = None
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._map = b''
+        self._file.close()
+
+    def _at_eof(self) -> bool:
+        """Whether the data read so far is all there is."""
+        return True
+
+    def index_chunk(self, chunk_size: int = CHUNK_SIZE) -> bool:
+        """Index the next chunk of data. Returns False once everything available is indexed."""
+        with self._lock:
+            start = self.indexed_bytes
+            stop = min(start + chunk_size, self.size)
+            if start >= stop:
+                self.complete = self._at_eof()
+                return False
+
+            self._index_data(self._map[start:stop], start)
+            self.indexed_bytes = stop
+            if stop >= self.size:
+                self.complete = self._at_eof()
+                return False
+            return True
+
+    def _index_data(self, data: bytes, start: int):
+        """Record the line starts within data, which begins at byte offset start."""
+        parts = data.split(b'\n')
+        # Each newline starts a new line right after it
+        self.starts.extend(islice(
+            accumulate(map((1).__add__, map(len, parts[:-1])), initial=start),
+            1, None))
+
+    def build(self, chunk_size: int = CHUNK_SIZE):
+        """Index the whole file."""
+        while self.index_chunk(chunk_size):
+            pass
+
+    def restore(self, starts: array, indexed_bytes: int):
+        """Resume from a saved index whose starts cover the first indexed_bytes bytes."""
+        with self._lock:
+            if indexed_bytes > self.size or not starts:
+                return
+            self.starts = starts
+            self.indexed_bytes = indexed_bytes
+            self.complete = False  # build() or start() confirms the rest
+
+    def add_listener(self, callback: Callable[[], None]):
+        """Call callback (from the indexing thread) whenever more lines are known."""
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[], None]):
+        """Stop notifying callback."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def start(self):
+        """Index the file in a background thread."""
+        self._thread = threading.Thread(target=self._run, name="line-index", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        """Background indexing loop."""
+        chunk_size = FIRST_CHUNK_SIZE
+        while not self._stop.is_set():
+            with self._lock:
+                more = self.index_chunk(chunk_size)
+                if not more:
+                    # From here on refresh() indexes appended data itself
+                    self._thread = None
+            chunk_size = CHUNK_SIZE
+            self._notify()
+            if not more:
+                break
+
+    def _notify(self):
+        """Wake waiters and listeners after progress."""
+        with self._progress:
+            self._progress.notify_all()
+        for callback in list(self._listeners):
+            callback()
+
+    def refresh(self) -> int:
+        """Pick up changes on disk: appended data, truncation or rotation.
+
+        Returns UNCHANGED, GROWN or RESET. Appended bytes are indexed
+        incrementally; after a reset the index is rebuilt from scratch.
+        """
+        try:
+            stat = os.stat(self.filename)
+        except FileNotFoundError:
+            return UNCHANGED  # Rotated away; the new file isn't there yet
+
+        with self._lock:
+            current = os.fstat(self._file.fileno())
+            if (stat.st_dev, stat.st_ino) != (current.st_dev, current.st_ino):
+                self._file.close()
+                self._file = open(self.filename, 'rb')
+                self._reset()
+                result = RESET
+            elif current.st_size < self.size:
+                self._reset()
+                result = RESET
+            elif current.st_size > self.size:
+                self._map_file()
+                self.complete = False
+                result = GROWN
+            else:
+                return UNCHANGED
+            background = self._thread is not None
+
+        # The background thread, if still running, picks up the new size
+        if not background:
+            self.build()
+        return result
+
+    def wait_for_lines(self, count: int, timeout: float = None) -> bool:
+        """Wait until at least count lines are known or indexing is done."""
+        with self._progress:
+            return self._progress.wait_for(
+                lambda: self.complete or len(self) >= count, timeout)
+
+    def line_span(self, line_num: int) -> tuple:
+        """Byte range (start, end) of a line, excluding the newline."""
+        start = self.starts[line_num]
+        if line_num + 1 < len(self.starts):
+            return start, self.starts[line_num + 1] - 1
+        return start, self.size
+
+    def line_bytes(self, line_num: int) -> bytes:
+        """Raw bytes of a line."""
+        start, end = self.line_span(line_num)
+        return self._map[start:end]
+
+    def byte_range(self, first: int, stop: int) -> tuple:
+        """Byte range (start, end) of lines first to stop - 1, newlines included."""
+        end = self.starts[stop] if stop < len(self.starts) else self.size
+        return self.starts[first], end
+
+    def read_lines(self, first: int, stop: int) -> bytes:
+        """Raw bytes of lines first to stop - 1, newlines included."""
+        start, end = self.byte_range(first, stop)
+        return self._map[start:end]
+
+    def __len__(self) -> int:
+        count = len(self.starts) - 1
+        # Trailing line without a newline only counts once scanning is done
+        if self.complete and self.starts[-1] < self.size:
+            count += 1
+        return count
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(key, slice):
+            return [self[i] for i in range(*key.indices(len(self)))]
+        count = len(self)
+        if key < 0:
+            key += count
+        if not 0 <= key < count:
+            raise IndexError("line index out of range")
+        return self.line_bytes(key).decode('utf-8', errors='replace').rstrip('\r\n')
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+
+class StreamIndex(LineIndex):
+    """Line index over data read incrementally from a pipe (e.g. stdin).
+
+    A pipe can't be mapped or re-read, so the data is kept in a growing
+    bytearray; lines become visible as soon as their newline arrives.
+    Compressed input (gzip or zstd) is decompressed as it is read.
+    """
+
+    streaming = True
+
+    def __init__(self, fd: int, name: str = "<stdin>"):
+        self.filename = name
+        self._fd = fd
+        self._eof = False
+        self._decoder = None  # Set if the stream turns out to be compressed
+        self._init_threading()
+        self._map = bytearray()
+        self.size = 0
+        self.starts = array('Q', [0])
+        self.indexed_bytes = 0
+        self.complete = False
+
+    def _at_eof(self) -> bool:
+        return self._eof
+
+    def close(self):
+        """Stop reading; a reader blocked on the pipe is left to exit with the process."""
+        self._stop.set()
+
+    def build(self, chunk_size: int = CHUNK_SIZE):
+        """Read and index the whole stream."""
+        self._run()
+
+    def _run(self):
+        """Reader loop: append each read to the buffer and index it."""
+        while not self._stop.is_set():
+            try:
+                data = os.read(self._fd, READ_SIZE)
+            except OSError:
+                data = b''
+            if data and not self.size and self._decoder is None:
+                compression = compression_of(data)
+                if compression is not None:
+                    self._decoder = StreamDecoder(compression)
+            decoded = self._decoder.feed(data) if self._decoder is not None else data
+            with self._lock:
+                if decoded:
+                    self._map += decoded
+                    self.size = len(self._map)
+                if not data:
+                    self._eof = True
+                while self.index_chunk():
+                    pass
+            self._notify()
+            if not data:
+                break
+
+    def refresh(self) -> int:
+        return UNCHANGED
+
+
+class CompressedIndex(LineIndex):
+    """Line index over a gzip or zstd file.
+
+    Offsets refer to the decompressed data, which is scanned once in order
+    and read back through DecompressedData's checkpoints, so jumping deep
+    into the file doesn't decompress it from the beginning. With use_cache
+    the finished index is saved to disk and reused while the file is
+    unchanged.
+    """
+
+    def __init__(self, filename: str, compression: str, use_cache: bool = False):
+        self.filename = filename
+        self.use_cache = use_cache
+        self._init_threading()
+        self._map = DecompressedData(filename, compression)
+        self.size = 0
+        self.starts = array('Q', [0])
+        self.indexed_bytes = 0
+        self.complete = False
+        if use_cache:
+            self._load_cache()
+
+    def close(self):
+        """Stop background indexing and close the file."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join()
+            self._thread = None
+        self._map.close()
+
+    def build(self, chunk_size: int = CHUNK_SIZE):
+        """Decompress and index the whole file."""
+        self._run()
+
+    def _run(self):
+        """Scan the decompressed data once, recording line starts and checkpoints."""
+        if not self.complete:
+            notify_at = FIRST_CHUNK_SIZE
+            for offset, data in self._map.decode():
+                if self._stop.is_set():
+                    return
+                with self._lock:
+                    self._index_data(data, offset)
+                    self.size = self.indexed_bytes = offset + len(data)
+                if self.size >= notify_at:
+                    self._notify()
+                    notify_at = self.size + CHUNK_SIZE
+            if self.use_cache:
+                self._save_cache()
+        with self._lock:
+            self.complete = True
+            self._thread = None
+        self._notify()
+
+    def _load_cache(self):
+        cached = cache.load(self.filename, 'zindex')
+        if cached is None:
+            return
+        header, arrays, grown = cached
+        if grown:
+            return  # Compressed files are rewritten, not appended to
+        self._map.add_member_starts(arrays['member_out'], arrays['member_in'])
+        self.starts = arrays['starts']
+        self.size = self.indexed_bytes = header['size']
+        self.complete = True
+
+    def _save_cache(self):
+        outs, positions = self._map.member_starts()
+        cache.save(self.filename, 'zindex', {'size': self.size}, {
+            'starts': self.starts,
+            'member_out': array('Q', outs),
+            'member_in': array('Q', positions),
+        })
+
+    def refresh(self) -> int:
+        return UNCHANGED
@@ -0,0 +1,68 @@
+"""Columnar per-line metadata: a byte per line instead of an object per line."""
+
+import sys
+from array import array
+from typing import Dict, Iterable
+
+# Kind of a line that hasn't been classified (the kinds themselves are in json_cache)
+UNKNOWN = 255
+
+
+class LineMeta:
+    """Classification results for every line, one byte per line.
+
+    kinds[n] is line n's kind (UNKNOWN until classified). Byte offsets and
+    lengths are not repeated here: the line index already holds them, so
+    the only per-line cost of classification is this byte (the line index
+    adds 8 for its offset). The column grows as higher lines are recorded.
+    """
+
+    def __init__(self):
+        self.kinds = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def _grow(self, count: int):
+        """Extend the column to cover count lines."""
+        missing = count - len(self.kinds)
+        if missing > 0:
+            self.kinds.extend(bytes([UNKNOWN]) * missing)
+
+    def record(self, line_num: int, kind: int):
+        """Store a line's kind."""
+        self._grow(line_num + 1)
+        self.kinds[line_num] = kind
+
+    def set_kinds(self, kinds: Iterable[int]):
+        """Take the kinds of all lines at once (e.g. from a parallel scan)."""
+        kinds = bytearray(kinds)
+        self._grow(len(kinds))
+        self.kinds[:len(kinds)] = kinds
+
+    def kind(self, line_num: int) -> int:
+        """Line's kind, or UNKNOWN if it hasn't been classified."""
+        if line_num < len(self.kinds):
+            return self.kinds[line_num]
+        return UNKNOWN
+
+    def forget(self, line_num: int):
+        """Mark one line as not classified."""
+        if line_num < len(self.kinds):
+            self.kinds[line_num] = UNKNOWN
+
+    def clear(self):
+        """Forget every line."""
+        self.__init__()
+
+    def columns(self) -> Dict[str, array]:
+        """A copy of the column, for saving."""
+        return {'kinds': array('B', self.kinds)}
+
+    def restore(self, columns: Dict[str, array]):
+        """Take the column saved by columns()."""
+        self.kinds = bytearray(columns['kinds'])
+
+    def nbytes(self) -> int:
+        """Memory held by the column, allocation slack included."""
+        return sys.getsizeof(self.kinds)
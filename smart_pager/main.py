@@ -1,96 +1,156 @@
 """Main entry point for Smart Pager."""
 
+import argparse
+import asyncio
+import os
 import sys
 from pathlib import Path
-import os
 
 from rich.console import Console
 
+from .compressed import detect_compression
+from .json_cache import INVALID, JSON, PLAIN
+from .json_scan import NESTED_DEPTH
 from .pager import SmartPager
+from .parallel import ParallelEngine
+from .event_loop import PagerApp
+from .fast_renderer import FastRenderer
+from .follow import FileWatcher
 from .input_handler import InputHandler
+from .screen import (CLEAR_SCREEN, Screen, enter_terminal, leave_terminal, move_to,
+                     render_rows, write_control)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="smart-pager",
+        description="A vim-like pager with JSON highlighting and expansion")
+    parser.add_argument("filename", nargs="?",
+                        help="log file to view, or - to read stdin (the default when piped)")
+    parser.add_argument("-f", "--follow", action="store_true",
+                        help="follow data appended to the file, like tail -f (toggle with F)")
+    parser.add_argument("--cache", action="store_true",
+                        help="save indexes under $XDG_CACHE_HOME/smart-pager and reuse them")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for searching big files (default: one per core)")
+    parser.add_argument("--nested-depth", type=int, default=NESTED_DEPTH, metavar="N",
+                        help="levels of JSON inside string values to decode when expanding "
+                             f"and filtering (default: {NESTED_DEPTH}, 0 to turn off)")
+    parser.add_argument("--minimap", action="store_true",
+                        help="show a sidebar of line density and errors over time (toggle with M)")
+    parser.add_argument("--renderer", choices=("rich", "fast"), default="rich",
+                        help="rich draws with Rich layouts; fast writes styled rows straight "
+                             "to the terminal (default: rich)")
+    parser.add_argument("--summary", action="store_true",
+                        help="print how many lines are JSON, invalid JSON and plain, then exit")
+    parser.add_argument("--stats", action="store_true",
+                        help="index and classify every line, print memory used per line, then exit")
+    args = parser.parse_args(argv)
+    if args.filename is None:
+        if sys.stdin.isatty():
+            parser.error("a filename is required unless input is piped")
+        args.filename = '-'
+    if args.summary and (args.filename == '-' or os.path.isfile(args.filename)
+                         and detect_compression(args.filename)):
+        parser.error("--summary needs an uncompressed file")
+    return args
+
+
+def print_summary(filename: str, jobs: int):
+    """Classify every line of filename on all cores and print the counts."""
+    engine = ParallelEngine(jobs)
+    try:
+        kinds = engine.classify(filename)
+    finally:
+        engine.close()
+    print(f"{len(kinds):,} lines: {kinds.count(JSON):,} JSON, "
+          f"{kinds.count(INVALID):,} invalid JSON, {kinds.count(PLAIN):,} plain")
+
+
+def print_stats(filename: str, jobs: int):
+    """Index and classify every line, then print what the per-line state costs."""
+    pager = SmartPager(filename, jobs=jobs)
+    try:
+        pager.classify_all()
+        stats = pager.memory_stats()
+    finally:
+        pager.close()
+    count = max(stats['lines'], 1)
+    print(f"{stats['lines']:,} lines")
+    for name in ('offsets', 'metadata'):
+        print(f"  {name}: {stats[name]:,} bytes ({stats[name] / count:.1f} per line)")
+    total = stats['offsets'] + stats['metadata']
+    print(f"  {total * 1_000_000 / count / 2**20:.1f} MB per million lines")
 
 
 def main():
     """Main entry point."""
-    if len(sys.argv) != 2:
-        console = Console()
-        console.print("Usage: python -m smart_pager <filename>", style="red")
-        console.print("   or: python smart_pager <filename>", style="red")
-        sys.exit(1)
-    
-    filename = sys.argv[1]
+    args = parse_args()
+    filename = args.filename
     
-    if not Path(filename).exists():
+    if filename != '-' and not Path(filename).exists():
         console = Console()
         console.print(f"File not found: {filename}", style="red")
         sys.exit(1)
+
+    if args.summary:
+        print_summary(filename, args.jobs)
+        return
+    if args.stats:
+        print_stats(filename, args.jobs)
+        return
     
     # Create pager and console
-    pager = SmartPager(filename)
+    pager = SmartPager(filename, background=True, use_cache=args.cache, jobs=args.jobs,
+                       nested_depth=args.nested_depth, minimap=args.minimap)
+    if args.follow:
+        pager.toggle_follow()
+    watcher = FileWatcher(filename) if filename != '-' else None
     console = Console()
+    if args.renderer == "fast":
+        renderer = FastRenderer(pager, console.file.fileno(), console.color_system)
+        screen = renderer.screen
+    else:
+        renderer = None
+        screen = Screen(console.file)
     
     try:
-        # Enter alternate screen
-        console.print("\x1b[?1049h", end="")
+        # Written raw and flushed: the fast renderer writes to the descriptor directly
+        enter_terminal(console.file)
         
         def refresh_display():
-            """Refresh the display."""
-            # Clear screen and move to top-left
-            console.print("\x1b[2J\x1b[H", end="")
-            console.print(pager.render())
+            """Refresh the display, sending only rows that changed."""
+            size = console.size
+            if renderer is not None:
+                renderer.draw((size.width, size.height))
+                return
+            screen.draw(render_rows(console, pager.render()), (size.width, size.height),
+                        pager.content_region())
         
-        # Initial display
-        refresh_display()
+        def show_error(e):
+            """Show an error and continue."""
+            write_control(console.file, CLEAR_SCREEN + move_to(1))
+            console.print(f"[red]Error: {e}[/red]")
+            screen.invalidate()
         
         with InputHandler() as input_handler:
-            while True:
-                try:
-                    key = input_handler.get_key(timeout=0.1)
-                    
-                    if key is None:
-                        continue
-                        
-                    # Handle vim-like navigation
-                    if key.lower() == 'q' or key == '\x03':  # q or Ctrl+C
-                        break
-                    elif key == 'j' or key == '\x1b[B':  # j or down arrow
-                        pager.move_down()
-                        refresh_display()
-                    elif key == 'k' or key == '\x1b[A':  # k or up arrow  
-                        pager.move_up()
-                        refresh_display()
-                    elif key == 'g':
-                        # Handle 'gg' for top - wait for second 'g'
-                        next_key = input_handler.get_key(timeout=0.5)
-                        if next_key == 'g':
-                            pager.move_to_top()
-                            refresh_display()
-                    elif key.upper() == 'G':
-                        pager.move_to_bottom()
-                        refresh_display()
-                    elif key == '\x04':  # Ctrl+D
-                        pager.page_down()
-                        refresh_display()
-                    elif key == '\x15':  # Ctrl+U
-                        pager.page_up()
-                        refresh_display()
-                    elif key in ['\n', '\r', ' ']:  # Enter or Space
-                        pager.toggle_expansion()
-                        refresh_display()
-                        
-                except KeyboardInterrupt:
-                    break
-                except Exception as e:
-                    # Show error and continue
-                    console.print("\x1b[2J\x1b[H", end="")
-                    console.print(f"[red]Error: {e}[/red]")
-                    refresh_display()
+            app = PagerApp(pager, input_handler, refresh_display, show_error)
+            if watcher is not None:
+                app.watch_file(watcher)
+            try:
+                asyncio.run(app.run())
+            except KeyboardInterrupt:
+                pass
                     
     except Exception as e:
         console.print(f"Fatal error: {e}", style="red")
     finally:
-        # Always restore normal screen
-        console.print("\x1b[?1049l", end="")
+        # Always restore the cursor and normal screen
+        leave_terminal(console.file)
+        if watcher is not None:
+            watcher.close()
+        pager.close()
 
 
 if __name__ == "__main__":
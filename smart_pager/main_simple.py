@@ -1,89 +1,68 @@
 """Simplified main entry point for debugging."""
 
+import asyncio
+import shutil
 import sys
 from pathlib import Path
 
 from .pager import SmartPager
 from .simple_renderer import SimpleRenderer
+from .event_loop import PagerApp
+from .follow import FileWatcher
 from .input_handler import InputHandler
+from .main import parse_args
+from .screen import CLEAR_SCREEN, Screen, enter_terminal, leave_terminal, move_to, write_control
 
 
 def main():
     """Simplified main entry point."""
-    if len(sys.argv) != 2:
-        print("Usage: python -m smart_pager.main_simple <filename>")
-        sys.exit(1)
-    
-    filename = sys.argv[1]
+    args = parse_args()
+    filename = args.filename
     
-    if not Path(filename).exists():
+    if filename != '-' and not Path(filename).exists():
         print(f"File not found: {filename}")
         sys.exit(1)
     
     # Create pager and renderer
-    pager = SmartPager(filename)
+    pager = SmartPager(filename, background=True, use_cache=args.cache, jobs=args.jobs,
+                       nested_depth=args.nested_depth)
+    if args.follow:
+        pager.toggle_follow()
+    watcher = FileWatcher(filename) if filename != '-' else None
     renderer = SimpleRenderer(pager)
+    screen = Screen()
     
     try:
-        # Enter alternate screen
-        print("\x1b[?1049h", end="")
+        enter_terminal(sys.stdout)
         
         def refresh_display():
-            """Refresh the display."""
-            print("\x1b[2J\x1b[H", end="")  # Clear and home
-            print(renderer.render_simple())
+            """Refresh the display, sending only rows that changed."""
+            size = shutil.get_terminal_size()
+            screen.draw(renderer.render_simple().split("\n"), (size.columns, size.lines))
         
-        # Initial display
-        refresh_display()
+        def show_error(e):
+            """Show an error and continue."""
+            write_control(sys.stdout, CLEAR_SCREEN + move_to(1))
+            print(f"Error: {e}")
+            screen.invalidate()
         
         with InputHandler() as input_handler:
-            while True:
-                try:
-                    key = input_handler.get_key(timeout=0.1)
-                    
-                    if key is None:
-                        continue
-                        
-                    # Handle vim-like navigation
-                    if key.lower() == 'q' or key == '\x03':  # q or Ctrl+C
-                        break
-                    elif key == 'j' or key == '\x1b[B':  # j or down arrow
-                        pager.move_down()
-                        refresh_display()
-                    elif key == 'k' or key == '\x1b[A':  # k or up arrow  
-                        pager.move_up()
-                        refresh_display()
-                    elif key == 'g':
-                        # Handle 'gg' for top - wait for second 'g'
-                        next_key = input_handler.get_key(timeout=0.5)
-                        if next_key == 'g':
-                            pager.move_to_top()
-                            refresh_display()
-                    elif key.upper() == 'G':
-                        pager.move_to_bottom()
-                        refresh_display()
-                    elif key == '\x04':  # Ctrl+D
-                        pager.page_down()
-                        refresh_display()
-                    elif key == '\x15':  # Ctrl+U
-                        pager.page_up()
-                        refresh_display()
-                    elif key in ['\n', '\r', ' ']:  # Enter or Space
-                        pager.toggle_expansion()
-                        refresh_display()
-                        
-                except KeyboardInterrupt:
-                    break
-                except Exception as e:
-                    print(f"\x1b[2J\x1b[H", end="")
-                    print(f"Error: {e}")
-                    refresh_display()
+            app = PagerApp(pager, input_handler, refresh_display, show_error)
+            if watcher is not None:
+                app.watch_file(watcher)
+            try:
+                asyncio.run(app.run())
+            except KeyboardInterrupt:
+                pass
                     
     except Exception as e:
         print(f"Fatal error: {e}")
     finally:
-        # Always restore normal screen
-        print("\x1b[?1049l", end="")
+        # Always restore the cursor and normal screen
+        leave_terminal(sys.stdout)
+        if watcher is not None:
+            watcher.close()
+        pager.close()
 
 
 if __name__ == "__main__":
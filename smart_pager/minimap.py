@@ -0,0 +1,212 @@
+"""Line density and error rate over time, sampled in the background for the minimap sidebar."""
+
+import math
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .json_cache import LineInfo, classify_line
+from .search import SEARCH_CHUNK, line_ranges
+from .timestamps import epoch, line_timestamp
+
+# Samples kept; past this every other one is dropped and lines are sampled half as often
+MAX_SAMPLES = 100000
+
+# Fields holding a line's log level, and the levels that count as errors
+LEVEL_FIELDS = ('level', 'severity', 'lvl', 'loglevel', 'log.level')
+ERROR_LEVELS = {'error', 'err', 'fatal', 'critical', 'crit', 'panic', 'alert',
+                'emerg', 'emergency'}
+# Numeric levels from this up are errors (pino and bunyan: 50 error, 60 fatal)
+ERROR_LEVEL_NUMBER = 50
+# An error word in a line that isn't JSON (e.g. a plain "ERROR ..." log line)
+_PLAIN_ERROR = re.compile(r'\b(ERROR|FATAL|CRITICAL|PANIC)\b')
+
+
+def is_error(info: LineInfo) -> bool:
+    """Whether a line reports an error: by its level field, or an ERROR word if it isn't JSON."""
+    if not info.is_json:
+        return _PLAIN_ERROR.search(info.text) is not None
+    for value in info.values:
+        if not isinstance(value, dict):
+            continue
+        for field in LEVEL_FIELDS:
+            level = value.get(field)
+            if isinstance(level, str):
+                return level.lower() in ERROR_LEVELS
+            if isinstance(level, (int, float)) and not isinstance(level, bool):
+                return level >= ERROR_LEVEL_NUMBER
+    return False
+
+
+class Minimap:
+    """Samples of (line, time, error) taken on a worker thread, summarised into buckets.
+
+    Lines are read once, in order. Every line is sampled until MAX_SAMPLES
+    are held; after that every other sample is dropped and only every
+    other line is sampled from then on, so a huge file costs a bounded
+    number of parsed lines and a fixed amount of memory. Each sample
+    stands for stride lines.
+    """
+
+    def __init__(self, index, on_progress: Optional[Callable[[], None]] = None):
+        self.index = index
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+        self.lines = array('Q')  # Line number of each sample (multiples of stride)
+        # Each sample's time in epoch seconds, kept non-decreasing so buckets can be
+        # found by bisection; undated lines take the time before them (-inf at first)
+        self.times = array('d')
+        self.errors = array('Q', [0])  # errors[i]: error samples among the first i
+        self.stride = 1
+        self.dated = False  # Some line had a timestamp
+        self.scanned = 0  # Lines [0, scanned) have been sampled
+        self.done = False
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Sample in the background; resumes where it stopped if the file has grown."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.index.complete and self.scanned >= len(self.index):
+            self.done = True
+            return
+        self.done = False
+        self._thread = threading.Thread(target=self._run, name="minimap", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def wait(self, timeout: float = None):
+        """Wait for sampling to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def rewind(self, line: int):
+        """Drop the samples from line on, so the next start() samples them again.
+
+        For a last line that may still have been being written when it was sampled.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            self._cancel.set()
+            self._thread.join()
+            self._cancel = threading.Event()
+        with self._lock:
+            if self.scanned <= line:
+                return
+            keep = bisect_left(self.lines, line)
+            del self.lines[keep:]
+            del self.times[keep:]
+            del self.errors[keep + 1:]
+            self.dated = keep > 0 and self.times[-1] > -math.inf
+            self.scanned = line
+            self.done = False
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    def snapshot(self) -> Tuple[dict, Dict[str, array]]:
+        """(header, arrays) as of now, for saving."""
+        with self._lock:
+            header = {'scanned': self.scanned, 'stride': self.stride}
+            return header, {'lines': array('Q', self.lines), 'times': array('d', self.times),
+                            'errors': array('Q', self.errors)}
+
+    def restore(self, header: dict, arrays: Dict[str, array]):
+        """Start from samples saved by snapshot() covering lines [0, header['scanned'])."""
+        lines, times, errors = arrays['lines'], arrays['times'], arrays['errors']
+        if not len(lines) == len(times) == len(errors) - 1:
+            return
+        scanned = header['scanned']
+        keep = bisect_left(lines, scanned)
+        with self._lock:
+            self.lines = lines[:keep]
+            self.times = times[:keep]
+            self.errors = errors[:keep + 1]
+            self.stride = header['stride']
+            self.dated = keep > 0 and self.times[-1] > -math.inf
+            self.scanned = scanned
+
+    def _sample(self, text: str) -> Tuple[Optional[float], bool]:
+        info = classify_line(text)
+        moment = line_timestamp(info.values) if info.is_json else None
+        return (None if moment is None else epoch(moment)), is_error(info)
+
+    def _sample_range(self, first: int, stop: int) -> List[Tuple[int, Optional[float], bool]]:
+        """(line, time, error) for the lines in [first, stop) that are multiples of stride."""
+        stride = self.stride
+        if stride == 1:
+            data = self.index.read_lines(first, stop)
+            texts = data.decode('utf-8', errors='replace').split('\n')
+            return [(line, *self._sample(text.rstrip('\r')))
+                    for line, text in zip(range(first, stop), texts)]
+        # Sparse: read only the sampled lines
+        return [(line, *self._sample(self.index[line]))
+                for line in range(first + (-first) % stride, stop, stride)]
+
+    def _record(self, samples: List[Tuple[int, Optional[float], bool]], stop: int):
+        with self._lock:
+            last = self.times[-1] if self.times else -math.inf
+            for line, moment, error in samples:
+                if line % self.stride:
+                    continue  # The stride grew since the range was sampled
+                if moment is not None:
+                    self.dated = True
+                    last = max(last, moment)
+                self.lines.append(line)
+                self.times.append(last)
+                self.errors.append(self.errors[-1] + error)
+                if len(self.lines) > MAX_SAMPLES:
+                    self._thin()
+            self.scanned = stop
+
+    def _thin(self):
+        """Double the stride, keeping only the samples on its multiples."""
+        self.stride *= 2
+        lines, times, errors = array('Q'), array('d'), array('Q', [0])
+        for i, line in enumerate(self.lines):
+            if line % self.stride == 0:
+                lines.append(line)
+                times.append(self.times[i])
+                errors.append(errors[-1] + self.errors[i + 1] - self.errors[i])
+        self.lines, self.times, self.errors = lines, times, errors
+
+    def _run(self):
+        for first, stop in line_ranges(self.index, self.scanned, None, SEARCH_CHUNK,
+                                       self._cancel):
+            self._record(self._sample_range(first, stop), stop)
+            if self.on_progress is not None:
+                self.on_progress()
+        if not self._cancel.is_set():
+            self.done = True
+        if self.on_progress is not None:
+            self.on_progress()
+
+    def buckets(self, count: int) -> List[Tuple[int, int, int]]:
+        """(first line, lines, error lines) for count equal slices of time.
+
+        Without any timestamps the slices are of the sampled lines instead.
+        Counts are estimates once lines are sampled (stride > 1). An empty
+        bucket's first line is that of the next sample, so jumping to it
+        lands just after the gap.
+        """
+        with self._lock:
+            total = len(self.lines)
+            if not total or count <= 0:
+                return []
+            if self.dated:
+                keys = self.times
+                low = keys[bisect_right(keys, -math.inf)]
+                high = keys[-1]
+            else:
+                keys = self.lines
+                low, high = keys[0], keys[-1] + 1
+            starts = [0] + [bisect_left(keys, low + (high - low) * k / count)
+                            for k in range(1, count)] + [total]
+            stride = self.stride
+            return [(self.lines[min(start, total - 1)], (stop - start) * stride,
+                     (self.errors[stop] - self.errors[start]) * stride)
+                    for start, stop in zip(starts, starts[1:])]
@@ -1,125 +1,443 @@
 """Core pager functionality."""
 
-import json
 import sys
-import re
+from array import array
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 from rich.console import Console
-from rich.syntax import Syntax
 from rich.text import Text
 from rich.panel import Panel
 from rich.layout import Layout
 from rich import box
 
+from . import cache
+from .json_cache import JSON, UNKNOWN, JsonCache, LineInfo, classify_line
+from .json_scan import KEY, LITERAL, NESTED_DEPTH, NUMBER, STRING
+from .cells import TabStops, cell_slice, cell_width, expand_tabs
+from .columns import Projection, parse_columns
+from .compressed import detect_compression
+from .expansion import Expansion
+from .line_index import GROWN, RESET, CompressedIndex, LineIndex, StreamIndex
+from .field_index import AllLines, FieldIndex, FilterView, parse_condition
+from .minimap import Minimap
+from .parallel import PARALLEL_MIN_SIZE, ParallelEngine
+from .search import Search
+from .timestamps import (TIME_PROBE_LINES, find_time, line_timestamp, looks_like_time,
+                         nearest_timestamp, parse_target)
+
+# Characters beyond the visible slice searched for matches that cross its edges
+SEARCH_MARGIN = 1024
+# Columns taken by the minimap sidebar, borders included
+MINIMAP_WIDTH = 14
+# Bar characters for eighths of a cell
+_BAR_EIGHTHS = " ▏▎▍▌▋▊▉"
+# Styles of JSON tokens by kind; punctuation keeps the span's base style
+TOKEN_STYLES = {KEY: "bright_blue", STRING: "bright_green", NUMBER: "bright_cyan",
+                LITERAL: "bright_magenta"}
+JSON_STYLE = "white"
+# Styles of the columns in projection mode, repeating after the last
+COLUMN_STYLES = ("bright_cyan", "yellow", "white", "green", "magenta", "bright_blue")
+
 
 class SmartPager:
     """A vim-like pager with JSON highlighting capabilities."""
     
-    def __init__(self, filename: str):
+    def __init__(self, filename: str, background: bool = False, use_cache: bool = False,
+                 jobs: int = 1, nested_depth: int = NESTED_DEPTH, minimap: bool = False):
         self.filename = filename
+        self.background = background  # Index in a thread instead of blocking
+        self.use_cache = use_cache  # Reuse indexes saved on disk by a previous run
+        # Worker processes for whole-file operations on big files
+        self.engine = ParallelEngine(jobs) if jobs > 1 else None
         self.console = Console()
         self.lines = []
         self.current_line = 0
         self.scroll_offset = 0
-        self.expanded_line = None  # Track which line is expanded
+        self.scroll_row = 0  # Top row on screen, within the line at scroll_offset
+        self.column = 0  # Cells scrolled off the left edge of every row
+        self.expanded: Set[int] = set()  # Lines shown with their JSON expanded
+        self._expansions: Dict[int, Optional[Expansion]] = {}  # Trees of expanded lines
+        self.json_cache = JsonCache()  # Shared by rendering, status and expansion
+        self._follow_end = False  # 'G' pressed while the index is still growing
+        self.following = False  # tail -f mode: pick up data appended to the file
+        self._seen_index_state = None
+        self.prompt = None  # Text being typed after '/' or '?', including that key
+        self.search_state: Optional[Search] = None
+        self.search_forward = True
+        self._search_jump = None  # (line, forward) waiting for search results
+        self._listeners = []
+        self.filter: Optional[FilterView] = None  # Only lines with field=value are shown
+        self.projection: Optional[Projection] = None  # JSON lines shown as columns of fields
+        self.field_indexes: Dict[str, FieldIndex] = {}
+        self._value_scans: Dict[Tuple[str, str], FieldIndex] = {}  # For overflowed fields
+        self.message = None  # Feedback from the last command, shown in the status line
+        # Levels of JSON held in string values decoded for expansion and filters
+        self.nested_depth = nested_depth
+        self.minimap: Optional[Minimap] = None  # Density and errors over time, for the sidebar
+        self.show_minimap = minimap
         
-        # Load file first
-        self._load_file()
-        
-        # Calculate terminal height after loading
+        # Terminal height first so background loading knows how much to wait for
         self._update_terminal_size()
         
+        self._load_file()
+        if self.show_minimap:
+            self._start_minimap()
+        
+    @property
+    def current_line(self) -> int:
+        """Line the cursor is on (a real line number, whatever the view)."""
+        return self._current_line
+
+    @current_line.setter
+    def current_line(self, line: int):
+        self._current_line = line
+        self.cursor_row = 0  # On the line itself rather than its expanded JSON
+
+    @property
+    def expanded_line(self) -> Optional[int]:
+        """The current line if it is expanded (for callers of the one-line API)."""
+        return self.current_line if self.current_line in self.expanded else None
+
+    @expanded_line.setter
+    def expanded_line(self, line: Optional[int]):
+        self.expanded = set() if line is None else {line}
+        self._expansions = {n: tree for n, tree in self._expansions.items() if n == line}
+
     def _update_terminal_size(self):
         """Update terminal size calculations."""
         console_size = self.console.size
         # More conservative calculation: leave room for panel borders + status + buffer
         self.terminal_height = max(5, console_size.height - 6)
+        # Cells inside the panel's borders and padding
+        sidebar = MINIMAP_WIDTH if self.show_minimap else 0
+        self.content_width = max(10, console_size.width - 4 - sidebar)
         
     def _load_file(self):
-        """Load file content into memory."""
+        """Map the file and build its line index."""
         try:
-            with open(self.filename, 'r', encoding='utf-8') as f:
-                self.lines = [line.rstrip('\n\r') for line in f.readlines()]
+            if self.filename == '-':
+                self.lines = StreamIndex(sys.stdin.fileno())
+            else:
+                compression = detect_compression(self.filename)
+                if compression is not None:
+                    self.lines = CompressedIndex(self.filename, compression, self.use_cache)
+                else:
+                    self.lines = LineIndex(self.filename)
+            if self.use_cache:
+                self._load_cache()
+            if self.background:
+                # Return as soon as the first screen is known
+                self.lines.start()
+                self.lines.wait_for_lines(self.terminal_height, timeout=0.1)
+            else:
+                self.lines.build()
         except Exception as e:
             self.console.print(f"Error reading file: {e}", style="red")
             sys.exit(1)
+
+    @property
+    def display_name(self) -> str:
+        """Name shown in the title bar."""
+        return "<stdin>" if self.filename == '-' else Path(self.filename).name
+
+    @property
+    def indexing(self) -> bool:
+        """True while the line index is still being built."""
+        return isinstance(self.lines, LineIndex) and not self.lines.complete
+
+    @property
+    def view(self):
+        """The lines being shown, in order: the filter, or every line."""
+        return self.filter if self.filter is not None else AllLines(self.lines)
+
+    def update(self) -> bool:
+        """Catch up with background indexing. Returns True if a redraw is needed."""
+        search = self.search_state
+        view = self.view
+        minimap = self.minimap if self.show_minimap else None
+        state = (len(self.lines), self.indexing, len(view), view.done,
+                 search and (len(search), search.done, self._search_jump),
+                 minimap and (minimap.scanned, minimap.done))
+        if state == self._seen_index_state:
+            return False
+        self._seen_index_state = state
+        self._resolve_search_jump()
+        if self._follow_end and len(view):
+            self.current_line = view[-1]
+        elif self.filter is not None:
+            self._snap_to_view()
+        if not self.indexing and view.done:
+            self._follow_end = False
+        return True
+
+    def toggle_follow(self):
+        """Toggle follow mode; turning it on jumps to the end like tail -f."""
+        self.following = not self.following
+        if self.following:
+            self.check_file()
+            self.move_to_bottom()
+
+    def check_file(self) -> bool:
+        """Pick up appended, truncated or rotated data. Returns True if lines changed."""
+        if not self.following or not isinstance(self.lines, LineIndex):
+            return False
+        count = len(self.lines)
+        view = self.view
+        at_bottom = not len(view) or self.current_line >= view[-1]
+        result = self.lines.refresh()
+        if result == RESET:
+            self.json_cache.clear()
+            if self.projection is not None:
+                self.projection.clear()
+            self.cancel_search()
+            self.search_state = None
+            self._drop_field_indexes()
+            self.filter = None
+            if self.minimap is not None:
+                self.minimap.cancel()
+                self.minimap = None
+                if self.show_minimap:
+                    self._start_minimap()
+            self.expanded.clear()
+            self._expansions.clear()
+            self.current_line = min(self.current_line, max(0, len(self.lines) - 1))
+            self.scroll_offset = self.scroll_row = 0
+        elif result == GROWN:
+            # The old last line may have been partial and grown since
+            if count:
+                self.json_cache.discard(count - 1)
+                if self.projection is not None:
+                    self.projection.discard(count - 1)
+                self._expansions.pop(count - 1, None)
+            for source in self._field_sources():
+                if count:
+                    source.rewind(count - 1)
+                source.start()  # Carry on into the appended lines
+            if self.search_state is not None and count:
+                self.search_state.rescan_from(count - 1)
+            if self.minimap is not None and self.show_minimap:
+                if count:
+                    self.minimap.rewind(count - 1)
+                self.minimap.start()
+        else:
+            return False
+        view = self.view
+        if at_bottom and len(view):
+            self.current_line = view[-1]
+        return True
+
+    def add_listener(self, callback):
+        """Call callback from a worker thread when lines or search results change."""
+        self._listeners.append(callback)
+        if isinstance(self.lines, LineIndex):
+            self.lines.add_listener(callback)
+
+    def remove_listener(self, callback):
+        """Stop notifying callback."""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+        if isinstance(self.lines, LineIndex):
+            self.lines.remove_listener(callback)
+
+    def _notify_listeners(self):
+        for callback in list(self._listeners):
+            callback()
+
+    def _load_cache(self):
+        """Pick up the line index, line kinds, field indexes and minimap saved by an earlier run.
+
+        If the file has grown since, indexing carries on from the end of
+        what was saved.
+        """
+        self._saved_cache_state = None
+        self._restored_bytes = 0
+        if self.lines.streaming:
+            return
+        if type(self.lines) is LineIndex:
+            cached = cache.load(self.filename, 'lines')
+            if cached is not None:
+                header, arrays, _ = cached
+                self.lines.restore(arrays['starts'], header['indexed_bytes'])
+                self._restored_bytes = self.lines.indexed_bytes
+        cached = cache.load(self.filename, 'meta')
+        if cached is None:
+            return
+        header, arrays, grown = cached
+        if grown and type(self.lines) is not LineIndex:
+            return
+        meta = self.json_cache.meta
+        meta.restore(arrays)
+        line_count = header['lines']
+        if grown and line_count > 0:
+            meta.forget(line_count - 1)  # The last line may have been partial
+        for field, saved in header['fields'].items():
+            if saved.get('depth', 0) != self.nested_depth:
+                continue  # Indexed with different nested decoding
+            values = arrays[f'field:{field}']
+            postings = {}
+            pos = 0
+            for value, length in zip(saved['values'], saved['lengths']):
+                postings[value] = values[pos:pos + length]
+                pos += length
+            scanned = min(saved['scanned'], line_count - 1) if grown else saved['scanned']
+            source = FieldIndex(self.lines, field, on_progress=self._notify_listeners,
+                                depth=self.nested_depth)
+            source.restore(max(0, scanned), postings)
+            self.field_indexes[field] = source
+        saved = header.get('minimap')
+        if saved is not None:
+            if grown:
+                saved = dict(saved, scanned=min(saved['scanned'], max(0, line_count - 1)))
+            self.minimap = Minimap(self.lines, on_progress=self._notify_listeners)
+            self.minimap.restore(saved, {name: arrays[f'minimap:{name}']
+                                         for name in ('lines', 'times', 'errors')})
+        self._saved_cache_state = self._cache_state()
+
+    def _cache_state(self) -> tuple:
+        """Summary of what a save would write, to skip saving unchanged data."""
+        return (self.json_cache.classified,
+                tuple((field, source.scanned) for field, source in self.field_indexes.items()),
+                self.minimap and self.minimap.scanned)
+
+    def save_cache(self):
+        """Save the line index, line kinds, field indexes and minimap for the next run."""
+        lines = self.lines
+        if type(lines) is LineIndex:
+            with lines._lock:
+                starts = array('Q', lines.starts)
+                indexed_bytes = lines.indexed_bytes
+            if indexed_bytes and indexed_bytes != self._restored_bytes:
+                cache.save(self.filename, 'lines', {'indexed_bytes': indexed_bytes},
+                           {'starts': starts})
+        elif not isinstance(lines, CompressedIndex):
+            return  # Piped input can't be identified next time
+        if self._cache_state() == self._saved_cache_state:
+            return
+        header = {'lines': len(lines), 'fields': {}}
+        arrays = self.json_cache.meta.columns()
+        for field, source in self.field_indexes.items():
+            if source.overflowed:
+                continue  # Holds only the values filtered on; not worth keeping
+            scanned, postings = source.snapshot()
+            header['fields'][field] = {
+                'scanned': scanned,
+                'depth': source.depth,
+                'values': list(postings),
+                'lengths': [len(posting) for posting in postings.values()],
+            }
+            combined = array('Q')
+            for posting in postings.values():
+                combined.extend(posting)
+            arrays[f'field:{field}'] = combined
+        if self.minimap is not None:
+            header['minimap'], samples = self.minimap.snapshot()
+            for name, values in samples.items():
+                arrays[f'minimap:{name}'] = values
+        cache.save(self.filename, 'meta', header, arrays)
+
+    def close(self):
+        """Stop any search, the worker processes and release the file mapping."""
+        self.cancel_search()
+        if self.use_cache:
+            self.save_cache()
+        self._drop_field_indexes()
+        if self.minimap is not None:
+            self.minimap.cancel()
+        if self.engine is not None:
+            self.engine.close()
+        if isinstance(self.lines, LineIndex):
+            self.lines.close()
     
-    def _extract_json_from_line(self, line: str) -> Optional[str]:
-        """Extract JSON portion from a line that might have other text."""
-        line = line.strip()
-        
-        # Look for JSON starting with { or [
-        json_match = re.search(r'[{\[].*[}\]]', line)
-        if json_match:
-            return json_match.group(0)
-        return None
-    
+    def line_info(self, line_num: int, line: Optional[str] = None) -> LineInfo:
+        """Cached JSON classification of a line (pass the text if already decoded)."""
+        load_line = self.lines.__getitem__ if line is None else (lambda _: line)
+        return self.json_cache.get(line_num, load_line)
+
+    def line_kind(self, line_num: int) -> int:
+        """JSON kind of a line, read from the metadata columns once it is known."""
+        kind = self.json_cache.meta.kind(line_num)
+        if kind == UNKNOWN:
+            kind = self.line_info(line_num).kind
+        return kind
+
+    def classify_all(self):
+        """Record the kind of every line, on the worker processes for big files."""
+        engine = self._parallel_engine()
+        if engine is not None:
+            self.json_cache.meta.set_kinds(engine.classify(self.filename))
+            return
+        for line_num in range(len(self.lines)):
+            self.line_kind(line_num)
+
+    def memory_stats(self) -> Dict[str, int]:
+        """Line count and bytes held by the per-line offset and metadata arrays."""
+        return {
+            'lines': len(self.lines),
+            'offsets': sys.getsizeof(self.lines.starts),
+            'metadata': self.json_cache.meta.nbytes(),
+        }
+
     def _is_json_line(self, line: str) -> Tuple[bool, Optional[dict]]:
         """Check if line contains valid JSON."""
-        # First try the whole line
-        line_stripped = line.strip()
-        if line_stripped.startswith(('{', '[')):
-            try:
-                parsed = json.loads(line_stripped)
-                return True, parsed
-            except (json.JSONDecodeError, ValueError):
-                pass
-        
-        # Try to extract JSON from within the line
-        json_part = self._extract_json_from_line(line)
-        if json_part:
-            try:
-                parsed = json.loads(json_part)
-                return True, parsed
-            except (json.JSONDecodeError, ValueError):
-                pass
-                
-        return False, None
+        info = classify_line(line)
+        return info.is_json, info.parsed
             
     def _looks_like_json(self, line: str) -> bool:
         """Check if line looks like JSON but might be invalid."""
-        # Look for JSON-like patterns anywhere in the line
-        json_part = self._extract_json_from_line(line)
-        if json_part and ('"' in json_part or "'" in json_part):
-            # Try to parse it - if it fails but looks like JSON, return True
-            try:
-                json.loads(json_part)
-                return False  # It's actually valid JSON
-            except (json.JSONDecodeError, ValueError):
-                return True  # Invalid but looks like JSON
-        return False
+        return classify_line(line).looks_like_json
     
-    def _colorize_json(self, line: str) -> Text:
-        """Simple JSON colorization."""
-        text = Text()
-        
-        # Use Rich's JSON syntax highlighting
-        try:
-            # Extract just the JSON part for highlighting
-            json_part = self._extract_json_from_line(line)
-            if json_part and json_part != line.strip():
-                # Line has text before/after JSON - highlight each part
-                before = line[:line.find(json_part)]
-                after = line[line.find(json_part) + len(json_part):]
-                
-                text.append(before, style="dim white")
-                text.append(json_part, style="bright_green")
-                text.append(after, style="dim white")
-            else:
-                # Whole line is JSON
-                text.append(line, style="bright_green")
-        except:
-            text.append(line, style="green")
-        
+    def _colorize_json(self, info: LineInfo, start: int = 0, end: int = None,
+                       tabs: Optional[TabStops] = None) -> Text:
+        """Highlight the JSON tokens among the line's characters [start, end).
+
+        Tokens come from the line's cached tokenization; only those inside
+        the slice are looked at, found by bisection, so a long line costs
+        no more to draw than the part that is visible. Given the line's
+        TabStops, start and end are offsets into its expanded text and
+        token offsets are moved there.
+        """
+        line = info.text if tabs is None else tabs.text
+        end = len(line) if end is None else end
+        # Text around and between the JSON parts stays dim
+        text = Text(line[start:end], style="dim white")
+        if tabs is None:
+            place = int  # Offsets stay as they are
+            first, last = start, end
+        else:
+            place = tabs.expanded
+            first = tabs.original(start)
+            last = tabs.original(end - 1) + 1 if end > start else first
+        for span_start, span_end in info.spans:
+            if span_start < last and span_end > first:
+                text.stylize(JSON_STYLE, max(place(span_start), start) - start,
+                             min(place(span_end), end) - start)
+        starts, ends, kinds = info.tokens
+        for i in range(bisect_right(ends, first), bisect_left(starts, last)):
+            text.stylize(TOKEN_STYLES[kinds[i]], max(place(starts[i]), start) - start,
+                         min(place(ends[i]), end) - start)
         return text
     
+    def _style_columns(self, row: str, spans: List[Tuple[int, int]], start: int,
+                       end: int) -> Text:
+        """Projected row's characters [start, end), each column in its own style."""
+        text = Text(row[start:end])
+        for i, (span_start, span_end) in enumerate(spans):
+            if span_start < end and span_end > start:
+                text.stylize(COLUMN_STYLES[i % len(COLUMN_STYLES)], max(span_start, start) - start,
+                             min(span_end, end) - start)
+        return text
+
     def _format_line(self, line_num: int, line: str) -> Text:
-        """Format a line with appropriate styling."""
-        is_json, parsed_json = self._is_json_line(line)
-        looks_like_json = self._looks_like_json(line)
-        is_current = line_num == self.current_line
+        """Format the visible columns of a line with appropriate styling.
+
+        Only the slice inside the horizontal viewport is styled and handed
+        to Rich, so a 200KB line costs no more than a short one. In
+        projection mode a JSON line is replaced by its columns of fields.
+        """
+        info = self.line_info(line_num, line)
+        is_current = line_num == self.current_line and self.cursor_row == 0
         
         # Create base text
         text = Text()
@@ -128,79 +446,177 @@ class SmartPager:
             text.append("► ", style="bright_yellow")
         else:
             text.append("  ")
-            
-        if is_json:
+        if info.looks_like_json:
+            text.append("⚠ ", style="red")
+
+        columns = None
+        tabs = None
+        if self.projection is not None and info.is_json:
+            line, columns = self.projection.format(self.projection.cells(line_num, info))
+        elif info.is_json and '\t' in line:
+            tabs = TabStops(line)  # Tokens are found by their offsets in the original
+            line = tabs.text
+        else:
+            line = expand_tabs(line)
+
+        start, end, pad = cell_slice(line, self.column, self.content_width - len(text))
+        text.append(" " * pad)
+        if columns is not None:
+            text.append(self._style_columns(line, columns, start, end))
+        elif info.is_json:
             # Colorize JSON
-            colored_json = self._colorize_json(line)
-            text.append(colored_json)
-        elif looks_like_json:
+            text.append(self._colorize_json(info, start, end, tabs))
+        elif info.looks_like_json:
             # Invalid JSON that looks like JSON
-            text.append("⚠ ", style="red")
-            text.append(line, style="dim red")
+            text.append(line[start:end], style="dim red")
         else:
             # Regular line
             if is_current:
-                text.append(line, style="white")
+                text.append(line[start:end], style="white")
             else:
-                text.append(line, style="dim white")
+                text.append(line[start:end], style="dim white")
+
+        if self.search_state is not None:
+            # The slice is always the last thing appended
+            offset = len(text) - end
+            # Matches are looked for a little beyond the edges to catch ones cut by them
+            matches = self.search_state.regex.finditer(
+                line, max(0, start - SEARCH_MARGIN), end + SEARCH_MARGIN)
+            for match in matches:
+                if match.end() > start and match.start() < end and match.end() > match.start():
+                    text.stylize("black on yellow", offset + max(match.start(), start),
+                                 offset + min(match.end(), end))
             
         return text
     
-    def _get_expanded_json(self, line: str) -> Optional[str]:
-        """Get pretty-printed JSON for a line."""
-        is_json, parsed_json = self._is_json_line(line)
-        if not is_json:
-            return None
-            
-        try:
-            pretty_json = json.dumps(parsed_json, indent=2, ensure_ascii=False)
-            return pretty_json
-        except:
-            return None
-    
+    def _format_expansion_row(self, line_num: int, row: int, text: str) -> Text:
+        """Format the visible columns of one row of a line's expanded JSON."""
+        text = expand_tabs(text)
+        start, end, pad = cell_slice(text, self.column, self.content_width - 4)
+        visible = " " * pad + text[start:end]
+        if line_num == self.current_line and row == self.cursor_row:
+            return Text("  ► " + visible, style="bold bright_cyan")
+        return Text("    " + visible, style="bright_cyan")
+
+    def _expansion(self, line_num: int) -> Optional[Expansion]:
+        """Tree of an expanded line's JSON (None unless it is valid JSON).
+
+        The tree, with the nodes opened in it, lives until the line is collapsed.
+        """
+        if line_num not in self._expansions:
+            info = self.line_info(line_num)
+            self._expansions[line_num] = (Expansion(info.nested_values(self.nested_depth))
+                                          if info.is_json else None)
+        return self._expansions[line_num]
+
+    def _row_count(self, line_num: int) -> int:
+        """Rows a line takes: itself plus its JSON if expanded."""
+        if line_num not in self.expanded:
+            return 1
+        expansion = self._expansion(line_num)
+        return 1 + len(expansion) if expansion is not None else 1
+
+    def _step_rows(self, position: int, row: int, count: int) -> Tuple[int, int]:
+        """The (position, row) count rows after (before if negative) a row, clamped to the view."""
+        view = self.view
+        row += count
+        while row < 0 and position > 0:
+            position -= 1
+            row += self._row_count(view[position])
+        while position < len(view) - 1 and row >= self._row_count(view[position]):
+            row -= self._row_count(view[position])
+            position += 1
+        return position, max(0, min(row, self._row_count(view[position]) - 1))
+
+    def _rows_between(self, top: Tuple[int, int], bottom: Tuple[int, int], limit: int) -> int:
+        """Rows from top to bottom inclusive, counted only until they exceed limit."""
+        view = self.view
+        position, row = top
+        end, end_row = bottom
+        count = -row
+        while position < end and count <= limit:
+            count += self._row_count(view[position])
+            position += 1
+        return count + end_row + 1
+
+    def _get_visible_rows(self) -> List[Tuple[int, int, str]]:
+        """(line, row, text) for each row on screen; row 0 is the line, then its JSON."""
+        view = self.view
+        rows = []
+        position, row = self.scroll_offset, self.scroll_row
+        while len(rows) < self.terminal_height and position < len(view):
+            line_num = view[position]
+            if row == 0:
+                rows.append((line_num, 0, self.lines[line_num]))
+                row = 1
+            expansion = self._expansion(line_num) if line_num in self.expanded else None
+            if expansion is not None:
+                # Only the rows that fit are turned into text
+                stop = min(len(expansion) + 1, row + self.terminal_height - len(rows))
+                rows.extend((line_num, r, text)
+                            for r, text in zip(range(row, stop), expansion.rows(row - 1)))
+            position += 1
+            row = 0
+        return rows
+
     def _get_visible_lines(self) -> List[Tuple[int, str]]:
         """Get lines that should be visible on screen."""
-        start = self.scroll_offset
-        end = min(start + self.terminal_height, len(self.lines))
-        return [(i, self.lines[i]) for i in range(start, end)]
+        return [(line_num, text) for line_num, row, text in self._get_visible_rows() if row == 0]
     
     def _update_scroll_offset(self):
-        """Update scroll offset to keep current line visible."""
-        if self.current_line < self.scroll_offset:
-            self.scroll_offset = self.current_line
-        elif self.current_line >= self.scroll_offset + self.terminal_height:
-            self.scroll_offset = self.current_line - self.terminal_height + 1
-            
-        # Keep scroll offset in bounds
-        self.scroll_offset = max(0, min(self.scroll_offset, 
-                                      max(0, len(self.lines) - self.terminal_height)))
+        """Scroll so the cursor's row is on screen, counting the rows of expanded JSON.
+
+        The top of the screen is row scroll_row of the line at view
+        position scroll_offset.
+        """
+        view = self.view
+        height = self.terminal_height
+        if not len(view):
+            self.scroll_offset = self.scroll_row = 0
+            return
+        position = min(view.position(self.current_line), len(view) - 1)
+        cursor = (position, self.cursor_row)
+        top_position = min(self.scroll_offset, len(view) - 1)
+        top = (top_position, min(self.scroll_row, self._row_count(view[top_position]) - 1))
+        if cursor < top:
+            top = cursor
+        elif self._rows_between(top, cursor, height) > height:
+            top = self._step_rows(*cursor, -(height - 1))
+
+        # Keep the screen full at the end of the view
+        last = len(view) - 1
+        lowest = self._step_rows(last, self._row_count(view[last]) - 1, -(height - 1))
+        self.scroll_offset, self.scroll_row = min(top, lowest)
     
-    def _render_content(self) -> Text:
-        """Render just the content without panel wrapper."""
+    def _render_rows(self) -> List[Text]:
+        """Styled text of each content row, shared by every renderer."""
         # Update terminal size in case it changed
         self._update_terminal_size()
         self._update_scroll_offset()
         
+        rows = self._get_visible_rows()
+        if self.projection is not None:
+            # Widen the columns for every row on screen before any is drawn
+            cells = []
+            for line_num, row, text in rows:
+                info = self.line_info(line_num, text) if row == 0 else None
+                if info is not None and info.is_json:
+                    cells.append(self.projection.cells(line_num, info))
+            self.projection.measure(cells)
+
         content_lines = []
-        visible_lines = self._get_visible_lines()
-        
-        for line_num, line in visible_lines:
-            formatted_line = self._format_line(line_num, line)
-            content_lines.append(formatted_line)
-            
-            # Show expanded JSON if this line is expanded
-            if (self.expanded_line == line_num and 
-                line_num == self.current_line):
-                expanded = self._get_expanded_json(line)
-                if expanded:
-                    # Add each line of expanded JSON with indentation
-                    for exp_line in expanded.split("\n"):
-                        indent_line = Text("    " + exp_line, style="bright_cyan")
-                        content_lines.append(indent_line)
-        
+        for line_num, row, text in rows:
+            if row == 0:
+                content_lines.append(self._format_line(line_num, text))
+            else:
+                content_lines.append(self._format_expansion_row(line_num, row, text))
+        return content_lines
+
+    def _render_content(self) -> Text:
+        """Render just the content without panel wrapper."""
         # Join all content with newlines
         content = Text()
-        for i, line in enumerate(content_lines):
+        for i, line in enumerate(self._render_rows()):
             if i > 0:
                 content.append("\n")
             content.append(line)
@@ -209,85 +625,418 @@ class SmartPager:
     
     def _render_status(self) -> Text:
         """Render status line."""
+        if self.prompt is not None:
+            return Text(self.prompt + "█", style="bold")
         status = Text()
         status.append(f"Line {self.current_line + 1}/{len(self.lines)} ", style="dim")
+        if self.column:
+            status.append(f"Col {self.column + 1} ", style="dim")
+        if self.indexing:
+            activity = "reading" if self.lines.streaming else "indexing"
+            status.append(f"{activity}… {len(self.lines):,} lines ", style="yellow")
+        if self.following:
+            status.append("[FOLLOW] ", style="bold magenta")
+        if self.filter is not None:
+            status.append(f"[FILTER {self.filter.description}: {len(self.filter):,} lines] ",
+                          style="bold cyan")
+            if not self.filter.done:
+                status.append("filtering… ", style="yellow")
+        if self.projection is not None:
+            status.append(f"[COLS {self.projection.description}] ", style="bold blue")
+        if self.message:
+            status.append(f"{self.message} ", style="red")
+        search = self.search_state
+        if search is not None:
+            if not (search.done or search.cancelled):
+                status.append(f"searching… {len(search):,} matches ", style="yellow")
+            elif not len(search):
+                status.append(f"Pattern not found: {search.pattern} ", style="red")
+            elif search.is_match(self.current_line):
+                status.append(f"[{search.rank(self.current_line)}/{len(search)}] ", style="yellow")
         
         if self.lines:
-            current_line_text = self.lines[self.current_line]
-            is_json, _ = self._is_json_line(current_line_text)
-            looks_like_json = self._looks_like_json(current_line_text)
+            info = self.line_info(self.current_line)
             
-            if is_json:
-                if self.expanded_line == self.current_line:
+            if info.is_json:
+                if self.current_line in self.expanded and self.cursor_row:
+                    status.append("[JSON - Enter opens/closes node] ", style="green")
+                elif self.current_line in self.expanded:
                     status.append("[JSON - Expanded] ", style="green")
                 else:
                     status.append("[JSON - Press Enter to expand] ", style="cyan")
-            elif looks_like_json:
+            elif info.looks_like_json:
                 status.append("[Invalid JSON] ", style="red")
         
         status.append("Press 'q' to quit, 'j/k' to move, 'gg/G' for top/bottom", style="dim")
         return status
     
-    def move_up(self):
-        """Move cursor up."""
-        if self.current_line > 0:
-            self.current_line -= 1
-            # Collapse any expanded line when moving
-            self.expanded_line = None
+    def _move_to_position(self, position: int):
+        """Put the cursor on the line at a view position, clamped to the view."""
+        view = self.view
+        if len(view):
+            self.current_line = view[max(0, min(len(view) - 1, position))]
+
+    def _move_rows(self, count: int):
+        """Move the cursor count rows down (up if negative), through expanded JSON too."""
+        view = self.view
+        position = view.position(self.current_line)
+        if self._in_view(self.current_line):
+            position, row = self._step_rows(position, self.cursor_row, count)
+        elif count > 0 and position < len(view):
+            # Off-view cursors (before the filter snaps them) sit before position
+            position, row = self._step_rows(position, 0, count - 1)
+        elif count < 0 and position > 0:
+            position, row = self._step_rows(position, 0, count)
+        else:
+            return
+        self.current_line = view[position]
+        self.cursor_row = row
+
+    def move_up(self, count: int = 1):
+        """Move cursor up count rows."""
+        self._follow_end = False
+        self._move_rows(-count)
             
-    def move_down(self):
-        """Move cursor down."""
-        if self.current_line < len(self.lines) - 1:
-            self.current_line += 1
-            # Collapse any expanded line when moving
-            self.expanded_line = None
+    def move_down(self, count: int = 1):
+        """Move cursor down count rows."""
+        self._follow_end = False
+        self._move_rows(count)
     
     def move_to_top(self):
         """Move to first line."""
-        self.current_line = 0
-        self.expanded_line = None
+        self._follow_end = False
+        self._move_to_position(0)
+        if not len(self.view):
+            self.current_line = 0
         
     def move_to_bottom(self):
-        """Move to last line."""
-        if self.lines:
-            self.current_line = len(self.lines) - 1
-        self.expanded_line = None
+        """Move to last line, tracking the end while indexing or filtering continues."""
+        self._follow_end = self.indexing or not self.view.done
+        self._move_to_position(len(self.view) - 1)
     
-    def page_down(self):
-        """Move down half a page."""
-        self.current_line = min(len(self.lines) - 1, 
-                              self.current_line + self.terminal_height // 2)
-        self.expanded_line = None
+    def scroll_right(self, cells: int):
+        """Scroll the view sideways by cells columns (left if negative).
+
+        Stops while the widest row on screen still shows a character.
+        """
+        widest = max((cell_width(expand_tabs(text)) for _, _, text in self._get_visible_rows()),
+                     default=0)
+        self.column = max(0, min(self.column + cells, widest - 1))
+
+    def page_down(self, count: int = 1):
+        """Move down half a page (count times)."""
+        self._follow_end = False
+        self._move_rows(count * (self.terminal_height // 2))
     
-    def page_up(self):
-        """Move up half a page."""
-        self.current_line = max(0, self.current_line - self.terminal_height // 2)
-        self.expanded_line = None
+    def page_up(self, count: int = 1):
+        """Move up half a page (count times)."""
+        self._follow_end = False
+        self._move_rows(-count * (self.terminal_height // 2))
     
     def toggle_expansion(self):
-        """Toggle JSON expansion for current line."""
+        """Expand or collapse the current line's JSON; other lines keep their state.
+
+        On a row of an expanded line's tree, opens or closes that node instead.
+        """
         if not self.lines:
             return
-            
-        current_line_text = self.lines[self.current_line]
-        is_json, _ = self._is_json_line(current_line_text)
-        
-        if is_json:
-            if self.expanded_line == self.current_line:
-                # Collapse
-                self.expanded_line = None
+        line = self.current_line
+        if line in self.expanded and self.cursor_row > 0:
+            self._expansion(line).toggle(self.cursor_row - 1)
+        elif line in self.expanded:
+            self.expanded.discard(line)
+            self._expansions.pop(line, None)
+        elif self.line_kind(line) == JSON:
+            self.expanded.add(line)
+    
+    def execute_prompt(self):
+        """Run the command typed at the prompt."""
+        text, self.prompt = self.prompt, None
+        if text and text[0] in '/?':
+            self.search(text[1:], forward=text[0] == '/')
+        elif text and text[0] == ':':
+            self.run_command(text[1:])
+
+    def run_command(self, command: str):
+        """Run a ':' command."""
+        self.message = None
+        name, _, argument = command.strip().partition(' ')
+        if name == 'filter' and argument.strip():
+            self.set_filter(argument)
+        elif name in ('filter', 'nofilter'):
+            self.clear_filter()
+        elif name == 'cols' and argument.strip():
+            self.set_columns(argument)
+        elif name in ('cols', 'nocols'):
+            self.projection = None
+        elif name.isdigit():
+            self.jump_to_line(int(name) - 1)
+        elif looks_like_time(command.strip()):
+            self.jump_to_time(command.strip())
+        elif name:
+            self.message = f"Unknown command: {name}"
+
+    def jump_to_line(self, line: int):
+        """Put the cursor on a line (0-based), or the first one after it in the view."""
+        self._follow_end = False
+        if not len(self.lines):
+            return
+        line = max(0, min(line, len(self.lines) - 1))
+        self._move_to_position(self.view.position(line))
+
+    def jump_to_percent(self, percent: int):
+        """Put the cursor percent of the way through the view (N% in vim)."""
+        self._follow_end = False
+        view = self.view
+        self._move_to_position((len(view) - 1) * min(percent, 100) // 100)
+
+    def _timestamp_at(self, position: int):
+        """Timestamp of the line at a view position, if its JSON has one."""
+        info = self.line_info(self.view[position])
+        return line_timestamp(info.values) if info.is_json else None
+
+    def jump_to_time(self, text: str):
+        """Jump to the first line at or after a time (14:03:00 or an ISO date/time).
+
+        Timestamps must increase through the file; they are found by binary
+        search, so only a few dozen lines are read however long the file is.
+        A bare time of day is taken on the date of the lines at the cursor.
+        """
+        view = self.view
+        if not len(view):
+            return
+        start = min(view.position(self.current_line), len(view) - 1)
+        near = (nearest_timestamp(start, min(len(view), start + TIME_PROBE_LINES),
+                                  self._timestamp_at)
+                or nearest_timestamp(0, min(len(view), TIME_PROBE_LINES), self._timestamp_at))
+        target = parse_target(text, near[1] if near else None)
+        if target is None:
+            self.message = f"Can't tell what time {text} is"
+            return
+        position = find_time(len(view), self._timestamp_at, target)
+        if position is None:
+            self.message = "No timestamps found"
+            return
+        self._follow_end = False
+        self._move_to_position(position)
+
+    def set_filter(self, condition: str):
+        """Show only the lines whose JSON has field=value (e.g. level=error).
+
+        The field's value index is built in the background the first time
+        and reused by later filters on the same field.
+        """
+        try:
+            field, value = parse_condition(condition)
+        except ValueError as e:
+            self.message = str(e)
+            return
+        source = self.field_indexes.get(field)
+        if source is None:
+            source = self.field_indexes[field] = FieldIndex(
+                self.lines, field, on_progress=self._notify_listeners, depth=self.nested_depth)
+        source.start()  # Also resumes an index restored from the cache
+        lines = source.want(value)
+        if lines is None:
+            # Too many distinct values to index them all: scan for this one
+            source = self._value_scans.get((field, value))
+            if source is None:
+                source = self._value_scans[field, value] = FieldIndex(
+                    self.lines, field, only=value, on_progress=self._notify_listeners,
+                    depth=self.nested_depth)
+                source.start()
+            lines = source.want(value)
+        self.filter = FilterView(field, value, source, lines)
+        self.scroll_offset = self.scroll_row = 0
+        self._follow_end = False
+        self._snap_to_view()
+
+    def set_columns(self, argument: str):
+        """Show JSON lines as aligned columns of some fields (e.g. ts,level,msg).
+
+        Column widths start from the lines around the cursor rather than
+        the whole file.
+        """
+        try:
+            fields = parse_columns(argument)
+        except ValueError as e:
+            self.message = str(e)
+            return
+        self.projection = Projection(fields, self.nested_depth)
+        view = self.view
+        self.projection.measure_window(view, view.position(self.current_line), self.line_info)
+
+    def clear_filter(self):
+        """Show every line again, keeping the cursor where it is."""
+        self.filter = None
+
+    def _snap_to_view(self):
+        """Move the cursor onto the view if the filter hides it."""
+        view = self.view
+        position = view.position(self.current_line)
+        if position < len(view):
+            if view[position] != self.current_line:
+                self.current_line = view[position]
+        elif len(view) and view.done:
+            self.current_line = view[-1]
+
+    def _in_view(self, line: int) -> bool:
+        view = self.view
+        position = view.position(line)
+        return position < len(view) and view[position] == line
+
+    def _field_sources(self) -> List[FieldIndex]:
+        return list(self.field_indexes.values()) + list(self._value_scans.values())
+
+    def _drop_field_indexes(self):
+        for source in self._field_sources():
+            source.cancel()
+        self.field_indexes.clear()
+        self._value_scans.clear()
+
+    def search(self, pattern: str, forward: bool = True):
+        """Start searching for pattern and jump to the next match as soon as it is found.
+
+        An empty pattern repeats the previous search.
+        """
+        if not pattern:
+            if self.search_state is None:
+                return
+            pattern = self.search_state.pattern
+        self.cancel_search()
+        # Backward searches want the lines above the cursor, so scan from the top
+        origin = self.current_line if forward else 0
+        self.search_state = Search(self.lines, pattern, origin, self._notify_listeners,
+                                   self._parallel_engine())
+        self.search_state.start()
+        self.search_forward = forward
+        self._search_jump = (self.current_line, forward)
+        self._resolve_search_jump()
+
+    def next_match(self, reverse: bool = False):
+        """Jump to the next match in the search direction (n), or against it (N)."""
+        if self.search_state is None:
+            return
+        self._search_jump = (self.current_line, self.search_forward != reverse)
+        self._resolve_search_jump()
+
+    def _parallel_engine(self) -> Optional[ParallelEngine]:
+        """The engine, if the file is big enough to be worth splitting across processes."""
+        # Workers map the file themselves, which only works for plain files
+        if (self.engine is not None and type(self.lines) is LineIndex
+                and self.lines.size >= PARALLEL_MIN_SIZE):
+            return self.engine
+        return None
+
+    def cancel_search(self):
+        """Stop a running search, keeping the matches found so far."""
+        if self.search_state is not None:
+            self.search_state.cancel()
+        self._search_jump = None
+
+    def _resolve_search_jump(self):
+        """Make a pending jump once the search has found where it lands."""
+        if self._search_jump is None:
+            return
+        line, forward = self._search_jump
+        search = self.search_state
+        target = line
+        first = None
+        while True:
+            target = search.next_after(target) if forward else search.prev_before(target)
+            if target is None:
+                if search.done or search.cancelled:
+                    self._search_jump = None  # Nothing to jump to
+                return
+            if self._in_view(target):
+                break
+            if target == first:
+                self._search_jump = None  # Every match is filtered out
+                return
+            if first is None:
+                first = target
+        self._search_jump = None
+        self._follow_end = False
+        self.current_line = target
+
+    def toggle_minimap(self):
+        """Show or hide the minimap sidebar, sampling the file the first time it is shown."""
+        self.show_minimap = not self.show_minimap
+        self._update_terminal_size()  # The sidebar takes columns from the content
+        if self.show_minimap:
+            self._start_minimap()
+
+    def _start_minimap(self):
+        if self.minimap is None:
+            self.minimap = Minimap(self.lines, on_progress=self._notify_listeners)
+        self.minimap.start()  # Also resumes one restored from the cache
+
+    def _minimap_buckets(self) -> List[Tuple[int, int, int]]:
+        """The minimap's buckets, one per content row."""
+        return self.minimap.buckets(self.terminal_height) if self.minimap is not None else []
+
+    def jump_to_bucket(self, index: int):
+        """Jump to the first line of a minimap bucket (0 is the top row)."""
+        buckets = self._minimap_buckets()
+        if 0 <= index < len(buckets):
+            self.jump_to_line(buckets[index][0])
+
+    def _render_minimap(self) -> Text:
+        """One bar per content row: lines in that slice of time, coloured by its share of errors.
+
+        The bucket holding the cursor is marked.
+        """
+        buckets = self._minimap_buckets()
+        width = MINIMAP_WIDTH - 5  # Inside borders and padding, after the marker
+        peak = max((lines for _, lines, _ in buckets), default=0)
+        here = bisect_right([first for first, _, _ in buckets], self.current_line) - 1
+        text = Text()
+        for i, (_, lines, errors) in enumerate(buckets):
+            if i:
+                text.append("\n")
+            text.append("►" if i == max(0, here) else " ", style="bright_yellow")
+            # Round up so a bucket with any lines shows something
+            eighths = -(-lines * width * 8 // peak) if peak else 0
+            bar = "█" * (eighths // 8) + (_BAR_EIGHTHS[eighths % 8] if eighths % 8 else "")
+            if not errors:
+                style = "green"
+            elif errors < lines * 0.05:
+                style = "yellow"
             else:
-                # Expand
-                self.expanded_line = self.current_line
+                style = "red"
+            text.append(bar.ljust(width), style=style)
+        return text
+
+    def click_to_line(self, row: int, column: Optional[int] = None):
+        """Move cursor to clicked line, or to the region of a clicked minimap bucket.
+
+        row and column are 0-based screen coordinates.
+        """
+        index = row - 1  # -1 for panel border
+        if (self.show_minimap and column is not None
+                and column >= self.console.size.width - MINIMAP_WIDTH):
+            self.jump_to_bucket(index)
+            return
+        rows = self._get_visible_rows()
+        if 0 <= index < len(rows):
+            self._follow_end = False
+            self.current_line, self.cursor_row, _ = rows[index]
     
-    def click_to_line(self, row: int):
-        """Move cursor to clicked line."""
-        # Convert screen row to line number
-        clicked_line = self.scroll_offset + row - 1  # -1 for panel border
-        if 0 <= clicked_line < len(self.lines):
-            self.current_line = clicked_line
-            self.expanded_line = None
+    def content_region(self) -> Tuple[int, int]:
+        """Screen rows (0-based, inclusive) inside the panel borders."""
+        # Panel spans every row but the status line; row 0 is its top border
+        return 1, self.terminal_height + 3
     
+    @property
+    def title(self) -> str:
+        """Title of the main panel."""
+        return f"Smart Pager - {self.display_name}"
+
+    @property
+    def minimap_title(self) -> str:
+        """Title of the minimap panel, with … while it is still sampling."""
+        return "Map" if self.minimap is not None and self.minimap.done else "Map…"
+
     def render(self):
         """Render the complete interface."""
         layout = Layout()
@@ -296,14 +1045,22 @@ class SmartPager:
         content = self._render_content()
         main_panel = Panel(
             content,
-            title=f"Smart Pager - {Path(self.filename).name}",
+            title=self.title,
             box=box.ROUNDED,
             title_align="left"
             # Remove explicit height - let it size naturally
         )
         
+        main = Layout(name="main")
+        if self.show_minimap:
+            minimap = Panel(self._render_minimap(), title=self.minimap_title, box=box.ROUNDED,
+                            title_align="left")
+            main.split_row(Layout(main_panel, name="content"),
+                           Layout(minimap, name="minimap", size=MINIMAP_WIDTH))
+        else:
+            main.update(main_panel)
         layout.split_column(
-            Layout(main_panel, name="main"),
+            main,
             Layout(self._render_status(), name="status", size=1)
         )
         return layout
@@ -0,0 +1,156 @@
+"""Process-pool engine for whole-file search and classification."""
+
+import mmap
+import multiprocessing
+import os
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from .json_cache import PLAIN, classify_line
+from .search import byte_finder
+
+# Bytes handled by one task; several tasks per worker keep the load even
+TASK_SIZE = 16 * 1024 * 1024
+# Files smaller than this are faster to handle in-process than to farm out
+PARALLEL_MIN_SIZE = 64 * 1024 * 1024
+
+# Per-process mappings, reused across tasks: filename -> (size, mmap)
+_maps = {}
+
+
+def _mapping(filename: str) -> mmap.mmap:
+    """Read-only mapping of filename in this worker, remapped if the file grew."""
+    size = os.stat(filename).st_size
+    cached = _maps.get(filename)
+    if cached is None or cached[0] != size:
+        with open(filename, 'rb') as f:
+            _maps[filename] = (size, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return _maps[filename][1]
+
+
+def _search_range(filename: str, start: int, end: int, pattern: str) -> array:
+    """Byte offsets of matches in [start, end), at most one per line."""
+    data = _mapping(filename)
+    find = byte_finder(pattern)
+    found = array('Q')
+    pos = find(data, start, end)
+    while pos >= 0:
+        found.append(pos)
+        newline = data.find(b'\n', pos, end)
+        if newline < 0:
+            break
+        pos = find(data, newline + 1, end)
+    return found
+
+
+def _classify_range(filename: str, start: int, end: int) -> bytearray:
+    """Kind (PLAIN, JSON or INVALID) of each line in [start, end)."""
+    parts = _mapping(filename)[start:end].split(b'\n')
+    if not parts[-1]:
+        parts.pop()  # Nothing after the final newline
+    kinds = bytearray([PLAIN]) * len(parts)
+    for i, line in enumerate(parts):
+        # Only brackets can start JSON; most plain lines never get decoded
+        if b'{' in line or b'[' in line:
+            kinds[i] = classify_line(line.decode('utf-8', errors='replace').rstrip('\r')).kind
+    return kinds
+
+
+def split_file(filename: str, size: int = TASK_SIZE) -> List[Tuple[int, int]]:
+    """Byte ranges of about size bytes covering the file, each ending after a newline."""
+    with open(filename, 'rb') as f:
+        total = os.fstat(f.fileno()).st_size
+        if not total:
+            return []
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        ranges = []
+        start = 0
+        while start < total:
+            newline = data.find(b'\n', min(start + size, total) - 1)
+            end = total if newline < 0 else newline + 1
+            ranges.append((start, end))
+            start = end
+        return ranges
+    finally:
+        data.close()
+
+
+class ParallelEngine:
+    """Runs whole-file operations over newline-aligned chunks in worker processes.
+
+    Workers map the file themselves, so chunks are never copied between
+    processes; only per-chunk results come back and are merged in order.
+    The pool is started on first use and reused afterwards.
+    """
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.task_size = TASK_SIZE
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = set()  # Futures queued by map() and not yet collected
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that runs indexing threads isn't safe
+            self._executor = ProcessPoolExecutor(
+                self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def map(self, func: Callable, tasks: Iterable[tuple]) -> Iterator:
+        """Yield func(*task) for each task, in order, running several at once.
+
+        Only a few tasks per worker are queued ahead, so closing the
+        iterator early (e.g. a cancelled search) abandons the rest quickly.
+        """
+        pool = self._pool()
+        tasks = iter(tasks)
+        pending = []
+        try:
+            while True:
+                while len(pending) < 2 * self.workers:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    future = pool.submit(func, *task)
+                    pending.append(future)
+                    with self._lock:
+                        self._pending.add(future)
+                if not pending:
+                    return
+                future = pending.pop(0)
+                with self._lock:
+                    self._pending.discard(future)
+                yield future.result()
+        finally:
+            with self._lock:
+                self._pending.difference_update(pending)
+            for future in pending:
+                future.cancel()
+
+    def search(self, filename: str, pattern: str,
+               ranges: Iterable[Tuple[int, int]]) -> Iterator[array]:
+        """Byte offsets of matching lines' matches, one array per range."""
+        return self.map(_search_range, ((filename, start, end, pattern)
+                                        for start, end in ranges))
+
+    def classify(self, filename: str) -> bytearray:
+        """Kind of every line in the file, indexed by line number."""
+        ranges = split_file(filename, self.task_size)
+        kinds = bytearray()
+        for chunk in self.map(_classify_range, ((filename, start, end) for start, end in ranges)):
+            kinds += chunk
+        return kinds
+
+    def close(self):
+        if self._executor is not None:
+            # Cancel queued tasks ourselves: shutdown(cancel_futures=True) needs Python 3.9
+            with self._lock:
+                pending, self._pending = self._pending, set()
+            for future in pending:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,157 @@
+"""Differential terminal output."""
+
+import sys
+from typing import List, Optional, TextIO, Tuple
+
+from rich.console import COLOR_SYSTEMS, Console, RenderableType
+
+CLEAR_SCREEN = "\x1b[2J"
+CLEAR_LINE = "\x1b[2K"
+RESET_SCROLL_REGION = "\x1b[r"
+# Click reporting in SGR format (button;column;row)
+MOUSE_ON = "\x1b[?1000h\x1b[?1006h"
+MOUSE_OFF = "\x1b[?1006l\x1b[?1000l"
+ALT_SCREEN_ON = "\x1b[?1049h"
+ALT_SCREEN_OFF = "\x1b[?1049l"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+
+
+def move_to(row: int, col: int = 1) -> str:
+    """Cursor-addressing escape (1-based)."""
+    return f"\x1b[{row};{col}H"
+
+
+def scroll_region(top: int, bottom: int, delta: int) -> str:
+    """Scroll rows top..bottom (0-based, inclusive) by delta; positive moves content up."""
+    scroll = f"\x1b[{delta}S" if delta > 0 else f"\x1b[{-delta}T"
+    return f"\x1b[{top + 1};{bottom + 1}r" + scroll + RESET_SCROLL_REGION
+
+
+def find_scroll(previous: List[str], rows: List[str], top: int, bottom: int) -> int:
+    """Best vertical shift of previous rows inside a region to reach rows.
+
+    Returns the number of rows the content moved up (negative for down), or
+    0 when scrolling would not save any rewrites.
+    """
+    height = bottom - top + 1
+    if height < 2:
+        return 0
+
+    def matches(delta):
+        return sum(1 for r in range(max(top, top - delta), min(bottom, bottom - delta) + 1)
+                   if rows[r] == previous[r + delta])
+
+    best, best_score = 0, matches(0)
+    for distance in range(1, height):
+        for delta in (distance, -distance):
+            score = matches(delta)
+            if score > best_score:
+                best, best_score = delta, score
+        # A bigger shift can't beat what is already matched
+        if height - distance <= best_score:
+            break
+    return best
+
+
+def render_rows(console: Console, renderable: RenderableType) -> List[str]:
+    """Render a Rich renderable to one ANSI string per screen row."""
+    color_system = COLOR_SYSTEMS.get(console.color_system) if console.color_system else None
+    rows = []
+    for line in console.render_lines(renderable, console.options, pad=True):
+        if color_system is None:
+            rows.append("".join(segment.text for segment in line))
+        else:
+            rows.append("".join(
+                style.render(text, color_system=color_system) if style else text
+                for text, style, control in line if not control))
+    return rows
+
+
+def write_control(file: TextIO, sequence: str):
+    """Send escape sequences exactly as given.
+
+    Console.print would run them through Rich's highlighter, which
+    styles the brackets and numbers and breaks the sequences.
+    """
+    file.write(sequence)
+    file.flush()
+
+
+def enter_terminal(file: TextIO):
+    """Switch to the alternate screen, hide the cursor and report mouse clicks."""
+    write_control(file, ALT_SCREEN_ON + HIDE_CURSOR + MOUSE_ON)
+
+
+def leave_terminal(file: TextIO):
+    """Undo enter_terminal."""
+    write_control(file, MOUSE_OFF + SHOW_CURSOR + ALT_SCREEN_OFF)
+
+
+class Screen:
+    """Remembers the last frame written to the terminal and sends only changed rows."""
+
+    def __init__(self, file: Optional[TextIO] = None):
+        self.file = file or sys.stdout
+        self.rows: List[str] = []
+        self.size: Optional[Tuple[int, int]] = None
+
+    def invalidate(self):
+        """Forget the previous frame so the next draw repaints everything."""
+        self.rows = []
+        self.size = None
+
+    def diff(self, rows: List[str], size: Tuple[int, int],
+             region: Optional[Tuple[int, int]] = None) -> str:
+        """Escape sequences that turn the previous frame into rows.
+
+        region is the (top, bottom) range of rows holding scrolling content;
+        when the new frame is that content shifted by a few lines the
+        terminal scrolls it in place and only the exposed rows are sent.
+        """
+        width, height = size
+        rows = rows[:height]
+        out = []
+        if size != self.size:
+            # Terminal resized (or first frame): repaint from scratch
+            out.append(CLEAR_SCREEN)
+            self.rows = []
+            self.size = size
+
+        previous = self.rows
+        if region is not None and previous:
+            top, bottom = region
+            bottom = min(bottom, len(previous) - 1, len(rows) - 1)
+            delta = find_scroll(previous, rows, top, bottom)
+            if delta:
+                out.append(scroll_region(top, bottom, delta))
+                previous = self._shift(previous, top, bottom, delta)
+
+        for i, row in enumerate(rows):
+            if i >= len(previous) or previous[i] != row:
+                out.append(move_to(i + 1) + CLEAR_LINE + row)
+        # Clear rows the new frame no longer uses
+        for i in range(len(rows), len(previous)):
+            out.append(move_to(i + 1) + CLEAR_LINE)
+
+        self.rows = rows
+        return "".join(out)
+
+    @staticmethod
+    def _shift(rows: List[str], top: int, bottom: int, delta: int) -> List[str]:
+        """What the terminal shows after scrolling rows top..bottom by delta."""
+        region = rows[top:bottom + 1]
+        blank = [""] * min(abs(delta), len(region))
+        if delta > 0:
+            region = region[delta:] + blank
+        else:
+            region = blank + region[:delta]
+        return rows[:top] + region + rows[bottom + 1:]
+
+    def draw(self, rows: List[str], size: Tuple[int, int],
+             region: Optional[Tuple[int, int]] = None):
+        """Write the changed rows of a frame."""
+        output = self.diff(rows, size, region)
+        if output:
+            self.file.write(output)
+            self.file.flush()
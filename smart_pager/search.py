@@ -0,0 +1,239 @@
+"""Search over a line index's raw bytes."""
+
+import re
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterator, List, Optional, Pattern, Tuple
+
+# Bytes searched between checks for cancellation and progress updates
+SEARCH_CHUNK = 1024 * 1024
+_END = float('inf')
+
+
+def compile_pattern(pattern: str) -> Pattern:
+    """Regex for pattern, or for the literal text if it isn't a valid regex."""
+    try:
+        return re.compile(pattern, re.MULTILINE)
+    except re.error:
+        return re.compile(re.escape(pattern), re.MULTILINE)
+
+
+def byte_finder(pattern: str) -> Callable[[bytes, int, int], int]:
+    """Function (data, pos, end) -> offset of the next match in data[pos:end], or -1.
+
+    data may be bytes or an mmap.
+    """
+    if re.escape(pattern) == pattern:
+        needle = pattern.encode()
+        return lambda data, pos, end: data.find(needle, pos, end)  # memchr-fast literal search
+
+    regex = re.compile(compile_pattern(pattern).pattern.encode(), re.MULTILINE)
+
+    def find(data: bytes, pos: int, end: int) -> int:
+        match = regex.search(data, pos, end)
+        return match.start() if match else -1
+    return find
+
+
+def line_ranges(index, first: int, stop: Optional[int], size: int,
+                cancel: threading.Event) -> Iterator[Tuple[int, int]]:
+    """Yield ranges of whole lines, about size bytes each, covering [first, stop).
+
+    With stop None the ranges run to the end of the file, waiting for
+    lines that are still being indexed. Stops early once cancel is set.
+    """
+    starts = index.starts
+    line = first
+    while not cancel.is_set():
+        available = len(index) if stop is None else min(stop, len(index))
+        if line >= available:
+            if stop is not None and line >= stop or index.complete:
+                return
+            index.wait_for_lines(line + 1, timeout=0.1)
+            continue
+        offset = starts[line]
+        last = max(line + 1, bisect_right(starts, offset + size, line, available))
+        last = min(last, available)
+        yield line, last
+        line = last
+
+
+class Search:
+    """Finds the lines matching a pattern on a worker thread.
+
+    Lines are scanned in chunks of raw bytes, starting at origin and
+    wrapping around to the top, so matches near the cursor arrive first.
+    Matching line numbers are kept in two sorted arrays (before and after
+    origin), which together form one sorted sequence for n/N lookups.
+    Given a ParallelEngine, a fully indexed file is searched by its worker
+    processes instead, still in the same order.
+    """
+
+    def __init__(self, index, pattern: str, origin: int = 0,
+                 on_progress: Optional[Callable[[], None]] = None, engine=None):
+        self.index = index
+        self.engine = engine
+        self.pattern = pattern
+        self.regex = compile_pattern(pattern)  # For highlighting decoded lines
+        self._find = byte_finder(pattern)
+        self.origin = min(origin, max(0, len(index) - 1))
+        self.on_progress = on_progress
+        self._lock = threading.Lock()
+        self._head = array('Q')  # Matches before origin
+        self._tail = array('Q')  # Matches from origin on
+        self._head_end = 0  # Lines [0, head_end) have been scanned
+        self._tail_end = self.origin  # Lines [origin, tail_end) have been scanned
+        self._tail_done = False
+        self._cancel = threading.Event()
+        self._thread = None
+        self.done = False
+        self.cancelled = False
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="search", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Stop scanning; the matches found so far are treated as final."""
+        self.cancelled = True
+        self._cancel.set()
+
+    def wait(self, timeout: float = None):
+        """Wait for the scan to finish."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def rescan_from(self, line: int):
+        """Scan again from line to the end of the file, which has grown.
+
+        line is the old last line, which may have been partial when it was
+        scanned. Its matches and any after it are dropped and found again.
+        """
+        if self.cancelled:
+            return
+        if self._thread is not None and self._thread.is_alive():
+            self._cancel.set()
+            self._thread.join()
+            self._cancel = threading.Event()
+        with self._lock:
+            line = max(line, self.origin)
+            while self._tail and self._tail[-1] >= line:
+                self._tail.pop()
+            self._tail_end = min(self._tail_end, line)
+            self._tail_done = False
+            self.done = False
+        self.start()
+
+    def _match_range(self, first: int, stop: int) -> Tuple[int, List[int]]:
+        """(stop, matching lines) for lines [first, stop), searched in this thread."""
+        starts = self.index.starts
+        offset = starts[first]
+        data = self.index.read_lines(first, stop)
+        matches = []
+        pos = self._find(data, 0, len(data))
+        while pos >= 0:
+            match_line = bisect_right(starts, offset + pos, first, stop) - 1
+            matches.append(match_line)
+            if match_line + 1 >= stop:
+                break
+            pos = self._find(data, starts[match_line + 1] - offset, len(data))
+        return stop, matches
+
+    def _match_parallel(self, ranges: List[Tuple[int, int]]) -> Iterator[Tuple[int, List[int]]]:
+        """Like _match_range over every range, with the engine's worker processes."""
+        index = self.index
+        starts = index.starts
+        byte_ranges = [index.byte_range(first, stop) for first, stop in ranges]
+        results = self.engine.search(index.filename, self.pattern, byte_ranges)
+        try:
+            for (first, stop), offsets in zip(ranges, results):
+                yield stop, [bisect_right(starts, offset, first, stop) - 1 for offset in offsets]
+        finally:
+            results.close()
+
+    def _scan(self, first: int, stop: Optional[int], found: array, progress: str) -> bool:
+        """Scan lines [first, stop), or to the end of the file if stop is None.
+
+        Returns False if cancelled. progress names the attribute that
+        records how far the scan has got.
+        """
+        if self.engine is not None and self.index.complete:
+            ranges = list(line_ranges(self.index, first, stop, self.engine.task_size,
+                                      self._cancel))
+            results = self._match_parallel(ranges)
+        else:
+            results = (self._match_range(*lines)
+                       for lines in line_ranges(self.index, first, stop, SEARCH_CHUNK,
+                                                self._cancel))
+        try:
+            for last, matches in results:
+                if self._cancel.is_set():
+                    break
+                with self._lock:
+                    found.extend(matches)
+                    setattr(self, progress, last)
+                if self.on_progress is not None:
+                    self.on_progress()
+        finally:
+            results.close()
+        return not self._cancel.is_set()
+
+    def _run(self):
+        # Resumes where an earlier run stopped (see rescan_from)
+        if self._scan(self._tail_end, None, self._tail, '_tail_end'):
+            self._tail_done = True
+            if self._scan(self._head_end, self.origin, self._head, '_head_end'):
+                self.done = True
+        if self.on_progress is not None:
+            self.on_progress()
+
+    def __len__(self) -> int:
+        return len(self._head) + len(self._tail)
+
+    def _get(self, k: int) -> int:
+        if k < len(self._head):
+            return self._head[k]
+        return self._tail[k - len(self._head)]
+
+    def _covered(self, first, stop) -> bool:
+        """Whether every line in [first, stop) has been scanned."""
+        if first >= stop or self.done or self.cancelled:
+            return True
+        if first >= self.origin:
+            return self._tail_done or stop <= self._tail_end
+        if min(stop, self.origin) > self._head_end:
+            return False
+        return stop <= self.origin or self._covered(self.origin, stop)
+
+    def rank(self, line: int) -> int:
+        """Number of matches at or before line."""
+        return bisect_right(self._head, line) + bisect_right(self._tail, line)
+
+    def is_match(self, line: int) -> bool:
+        k = self.rank(line)
+        return k > 0 and self._get(k - 1) == line
+
+    def next_after(self, line: int) -> Optional[int]:
+        """First match after line, wrapping to the top; None if not known yet or none."""
+        with self._lock:
+            k = self.rank(line)
+            if k < len(self):
+                match = self._get(k)
+                return match if self._covered(line + 1, match) else None
+            if not self._covered(line + 1, _END) or not len(self):
+                return None
+            match = self._get(0)
+            return match if self._covered(0, match) else None
+
+    def prev_before(self, line: int) -> Optional[int]:
+        """Last match before line, wrapping to the bottom; None if not known yet or none."""
+        with self._lock:
+            k = bisect_left(self._head, line) + bisect_left(self._tail, line)
+            if k > 0:
+                match = self._get(k - 1)
+                return match if self._covered(match + 1, line) else None
+            if not self._covered(0, line) or not len(self):
+                return None
+            match = self._get(len(self) - 1)
+            return match if self._covered(match + 1, _END) else None
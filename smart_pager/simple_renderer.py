@@ -3,7 +3,8 @@
 from rich.console import Console
 from rich.text import Text
 from rich.panel import Panel
-from pathlib import Path
+
+from .cells import cell_slice, expand_tabs
 
 
 class SimpleRenderer:
@@ -18,19 +19,23 @@ class SimpleRenderer:
         lines = []
         
         # Title
-        title = f"Smart Pager - {Path(self.pager.filename).name}"
+        title = f"Smart Pager - {self.pager.display_name}"
         lines.append("=" * len(title))
         lines.append(title)
         lines.append("=" * len(title))
         lines.append("")
         
         # Content
-        visible_lines = self.pager._get_visible_lines()
-        
-        for line_num, line in visible_lines:
-            is_json, _ = self.pager._is_json_line(line)
-            looks_like_json = self.pager._looks_like_json(line)
-            is_current = line_num == self.pager.current_line
+        for line_num, row, line in self.pager._get_visible_rows():
+            is_current = (line_num == self.pager.current_line
+                          and row == self.pager.cursor_row)
+            if row:
+                # A row of the line's expanded JSON
+                line = expand_tabs(line)
+                start, end, pad = cell_slice(line, self.pager.column, self.pager.content_width)
+                lines.append(("  ► " if is_current else "    ") + " " * pad + line[start:end])
+                continue
+            info = self.pager.line_info(line_num, line)
             
             # Create line prefix
             if is_current:
@@ -39,45 +44,58 @@ class SimpleRenderer:
                 prefix = "  "
             
             # Add status indicators
-            if is_json:
+            if info.is_json:
                 prefix += "[JSON] "
-            elif looks_like_json:
+            elif info.looks_like_json:
                 prefix += "[!JSON] "
             else:
                 prefix += ""
             
-            # Add the line
-            display_line = prefix + line
+            # Add the visible columns of the line
+            line = expand_tabs(line)
+            start, end, pad = cell_slice(line, self.pager.column, self.pager.content_width)
+            display_line = prefix + " " * pad + line[start:end]
             lines.append(display_line)
-            
-            # Show expanded JSON if this line is expanded
-            if (self.pager.expanded_line == line_num and 
-                line_num == self.pager.current_line):
-                expanded = self.pager._get_expanded_json(line)
-                if expanded:
-                    for exp_line in expanded.split("\n"):
-                        lines.append("    " + exp_line)
         
         # Status line
         lines.append("")
         lines.append("-" * 60)
         
         status_parts = [f"Line {self.pager.current_line + 1}/{len(self.pager.lines)}"]
+        if self.pager.indexing:
+            activity = "reading" if self.pager.lines.streaming else "indexing"
+            status_parts.append(f"{activity}… {len(self.pager.lines):,} lines")
+        if self.pager.following:
+            status_parts.append("FOLLOW")
+        if self.pager.filter is not None:
+            view = self.pager.filter
+            filtering = "" if view.done else ", filtering…"
+            status_parts.append(f"FILTER {view.description}: {len(view):,} lines{filtering}")
+        if self.pager.message:
+            status_parts.append(self.pager.message)
+        search = self.pager.search_state
+        if search is not None:
+            if not (search.done or search.cancelled):
+                status_parts.append(f"searching… {len(search):,} matches")
+            elif not len(search):
+                status_parts.append(f"Pattern not found: {search.pattern}")
+            elif search.is_match(self.pager.current_line):
+                status_parts.append(f"{search.rank(self.pager.current_line)}/{len(search)}")
         
         if self.pager.lines:
-            current_line_text = self.pager.lines[self.pager.current_line]
-            is_json, _ = self.pager._is_json_line(current_line_text)
-            looks_like_json = self.pager._looks_like_json(current_line_text)
+            info = self.pager.line_info(self.pager.current_line)
             
-            if is_json:
-                if self.pager.expanded_line == self.pager.current_line:
+            if info.is_json:
+                if self.pager.current_line in self.pager.expanded:
                     status_parts.append("JSON - Expanded")
                 else:
                     status_parts.append("JSON - Press Enter to expand")
-            elif looks_like_json:
+            elif info.looks_like_json:
                 status_parts.append("Invalid JSON")
         
         status_parts.append("Press 'q' to quit, 'j/k' to move")
+        if self.pager.prompt is not None:
+            status_parts = [self.pager.prompt + "█"]
         lines.append(" | ".join(status_parts))
         
         return "\n".join(lines)
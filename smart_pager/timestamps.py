@@ -0,0 +1,138 @@
+"""Timestamps in JSON log lines, for jumping to a time by binary search."""
+
+import re
+from datetime import datetime, timezone
+from typing import Any, Callable, List, Optional
+
+# Fields looked at, in order, for a line's timestamp
+TIMESTAMP_FIELDS = ('timestamp', 'ts', 'time', '@timestamp', 'datetime', 'date')
+
+# Lines examined from a probe point for one that has a timestamp
+TIME_PROBE_LINES = 256
+
+# Time of day on its own, e.g. 14:03 or 14:03:00.250
+_TIME_OF_DAY = re.compile(r'\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?')
+# What a ':' command that is a time or date looks like
+_TIME_COMMAND = re.compile(r'\d{1,2}:\d{2}\S*|\d{4}-\d{2}-\d{2}([T ]\S+)?')
+
+
+def _from_iso(text: str) -> Optional[datetime]:
+    # fromisoformat only accepts a 'Z' suffix from Python 3.11 on
+    if text.endswith(('Z', 'z')):
+        text = text[:-1] + '+00:00'
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+
+def looks_like_time(text: str) -> bool:
+    return _TIME_COMMAND.fullmatch(text) is not None
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """A JSON value as a time: ISO 8601 text, or epoch seconds/ms/µs/ns."""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        # Pick the unit that puts the value in a plausible range
+        for divisor in (1, 1e3, 1e6, 1e9):
+            if value / divisor < 1e11:
+                try:
+                    return datetime.fromtimestamp(value / divisor, timezone.utc)
+                except (OverflowError, OSError, ValueError):
+                    return None
+        return None
+    if isinstance(value, str) and len(value) >= 10 and value[:4].isdigit():
+        return _from_iso(value)
+    return None
+
+
+def line_timestamp(values: List[Any]) -> Optional[datetime]:
+    """Timestamp of a line from the first of its JSON objects that has one."""
+    for value in values:
+        if isinstance(value, dict):
+            for field in TIMESTAMP_FIELDS:
+                if field in value:
+                    found = parse_timestamp(value[field])
+                    if found is not None:
+                        return found
+    return None
+
+
+def epoch(moment: datetime) -> float:
+    """Seconds since the epoch; naive times are taken as UTC so they compare consistently."""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
+
+
+def parse_target(text: str, reference: Optional[datetime]) -> Optional[datetime]:
+    """The time a jump asks for.
+
+    A bare time of day (14:03:00) is taken on reference's date and in its
+    time zone; a date or full timestamp stands on its own, borrowing
+    reference's time zone if it has none.
+    """
+    text = text.strip()
+    if _TIME_OF_DAY.fullmatch(text):
+        if reference is None:
+            return None
+        hours, minutes, seconds = (text.split(':') + ['0'])[:3]
+        whole, _, fraction = seconds.partition('.')
+        try:
+            return reference.replace(hour=int(hours), minute=int(minutes), second=int(whole),
+                                     microsecond=int((fraction + '000000')[:6]))
+        except ValueError:  # 25:00 and the like
+            return None
+    target = _from_iso(text)
+    if target is None:
+        return None
+    if target.tzinfo is None and reference is not None:
+        target = target.replace(tzinfo=reference.tzinfo)
+    return target
+
+
+def find_time(count: int, timestamp_at: Callable[[int], Optional[datetime]],
+              target: datetime) -> Optional[int]:
+    """First position in [0, count) whose timestamp is at or after target.
+
+    Positions must have non-decreasing timestamps where they have one.
+    Each probe reads forward to the nearest timestamped position (at most
+    TIME_PROBE_LINES), so O(log count) lines are read in all. If every
+    timestamp is earlier, that is the last position; None if no timestamp
+    was found at all.
+    """
+    goal = epoch(target)
+    lo, hi = 0, count
+    best = None
+    dated = False
+    while lo < hi:
+        mid = (lo + hi) // 2
+        found = nearest_timestamp(mid, min(hi, mid + TIME_PROBE_LINES), timestamp_at)
+        if found is None:
+            hi = mid  # Nothing dated here; look earlier
+            continue
+        position, moment = found
+        dated = True
+        if epoch(moment) < goal:
+            lo = position + 1
+        else:
+            best = position
+            hi = mid
+    if best is None and lo < count:
+        found = nearest_timestamp(lo, min(count, lo + TIME_PROBE_LINES), timestamp_at)
+        if found is not None and epoch(found[1]) >= goal:
+            best = found[0]
+    if best is None and dated:
+        best = count - 1
+    return best
+
+
+def nearest_timestamp(start: int, stop: int, timestamp_at: Callable[[int], Optional[datetime]]):
+    """(position, timestamp) of the first position in [start, stop) that has one, or None."""
+    for position in range(start, stop):
+        moment = timestamp_at(position)
+        if moment is not None:
+            return position, moment
+    return None
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Test the on-disk cache of line offsets, line kinds and field indexes."""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from smart_pager import cache
+from smart_pager.json_cache import JSON, PLAIN
+from smart_pager.line_index import LineIndex
+from smart_pager.pager import SmartPager
+
+
+def _write_lines(path, start, stop, mode='w'):
+    with open(path, mode) as f:
+        for i in range(start, stop):
+            if i % 4 == 3:
+                f.write(f'plain line {i}\n')
+            else:
+                f.write(f'{{"n": {i}, "level": "{"error" if i % 4 == 2 else "info"}"}}\n')
+
+
+def _with_cache_home(test):
+    """Run test(path) with XDG_CACHE_HOME pointing at a scratch directory."""
+    saved = os.environ.get('XDG_CACHE_HOME')
+    fd, path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)
+    with tempfile.TemporaryDirectory() as cache_home:
+        os.environ['XDG_CACHE_HOME'] = cache_home
+        try:
+            test(path)
+        finally:
+            if saved is None:
+                del os.environ['XDG_CACHE_HOME']
+            else:
+                os.environ['XDG_CACHE_HOME'] = saved
+            os.unlink(path)
+
+
+def test_file_key():
+    """Unchanged, appended-to and rewritten files are told apart."""
+    def check(path):
+        _write_lines(path, 0, 100)
+        cache.save(path, 'test', {'x': 1}, {})
+        assert cache.load(path, 'test') == ({'x': 1}, {}, False)
+        _write_lines(path, 100, 110, mode='a')
+        assert cache.load(path, 'test')[2] is True
+        _write_lines(path, 50, 160)  # Rewritten: the old head no longer matches
+        assert cache.load(path, 'test') is None
+    _with_cache_home(check)
+    print("✅ Cache keys tell unchanged, grown and rewritten files apart")
+
+
+def test_line_offsets_reused():
+    """A second run restores the offsets and indexes only what was appended."""
+    def check(path):
+        _write_lines(path, 0, 1000)
+        pager = SmartPager(path, use_cache=True)
+        expected = list(pager.lines.starts)
+        pager.close()
+
+        pager = SmartPager(path, use_cache=True)
+        assert list(pager.lines.starts) == expected and len(pager.lines) == 1000
+        pager.close()
+
+        _write_lines(path, 1000, 1200, mode='a')
+        pager = SmartPager(path, use_cache=True)
+        fresh = LineIndex(path)
+        fresh.build()
+        assert list(pager.lines.starts) == list(fresh.starts)
+        assert len(pager.lines) == 1200 and pager.lines[1199].startswith('plain')
+        fresh.close()
+        pager.close()
+    _with_cache_home(check)
+    print("✅ Line offsets are reused and extended after appends")
+
+
+def test_kinds_and_fields_reused():
+    """Line kinds and field postings come back without rescanning."""
+    def check(path):
+        _write_lines(path, 0, 1000)
+        pager = SmartPager(path, use_cache=True)
+        pager._render_content()
+        pager.set_filter('level=error')
+        pager.filter.source.wait(5)
+        classified = pager.json_cache.classified
+        pager.close()
+
+        pager = SmartPager(path, use_cache=True)
+        meta = pager.json_cache.meta
+        assert len(meta) >= classified and meta.kind(0) == JSON and meta.kind(3) == PLAIN
+        source = pager.field_indexes['level']
+        assert source.scanned == 1000 and list(source.postings['error'])[:2] == [2, 6]
+        pager.set_filter('level=error')
+        assert pager.filter.source is source and pager.filter.done
+        assert len(pager.filter) == 250
+        pager.close()
+
+        # After an append the last saved line is checked again, the rest resumes
+        _write_lines(path, 1000, 1100, mode='a')
+        pager = SmartPager(path, use_cache=True)
+        assert pager.json_cache.meta.kind(0) == JSON
+        source = pager.field_indexes['level']
+        assert source.scanned == 999
+        pager.set_filter('level=error')
+        source.wait(5)
+        assert len(pager.filter) == 275 and pager.filter.lines[-1] == 1098
+        pager.close()
+    _with_cache_home(check)
+    print("✅ Line kinds and field indexes are restored and extended")
+
+
+if __name__ == '__main__':
+    test_file_key()
+    test_line_offsets_reused()
+    test_kinds_and_fields_reused()
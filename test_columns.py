@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test projection mode: JSON lines shown as columns of chosen fields."""
+
+import json
+import os
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager.columns import MAX_COLUMN_WIDTH, WIDTH_WINDOW, Projection, parse_columns
+from smart_pager.commands import KeyDispatcher
+from smart_pager.json_cache import classify_line
+
+from testlib import small_pager, temp_log
+
+
+def _log_lines(count=2000):
+    """JSON log lines; one far down the file has a very long level."""
+    for i in range(count):
+        if i == 5:
+            yield 'plain text line'
+            continue
+        level = "x" * 30 if i == count - 10 else ("error" if i % 3 == 0 else "info")
+        yield json.dumps({"ts": f"12:00:{i % 60:02d}", "level": level,
+                          "msg": f"request {i}", "ctx": {"user": f"u{i}"}})
+
+
+def test_format():
+    """Cells are padded to their column and cut with … past its width."""
+    assert parse_columns("ts, level,msg") == ['ts', 'level', 'msg']
+    projection = Projection(['a', 'b', 'c'])
+    rows = [['1', 'xy', 'last'], ['22', '日本', 'z']]
+    projection.measure(rows)
+    assert projection.widths == [2, 4, 4]
+    assert projection.format(rows[0]) == ('1   xy    last', [(0, 1), (4, 6), (10, 14)])
+    assert projection.format(rows[1])[0] == '22  日本  z'
+    assert projection.format(['333', 'b', 'c'])[0] == '3…  b     c'
+
+    projection.measure([['', 'y' * 100, '']])
+    assert projection.widths[1] == MAX_COLUMN_WIDTH
+    print("✅ Columns are padded, capped and truncated")
+
+
+def test_cells_cached():
+    """A line's fields are extracted once; nested paths and missing fields work."""
+    projection = Projection(['level', 'ctx.user', 'nope'])
+    info = classify_line('{"level": "info", "ctx": {"user": "bob"}, "n": "a\\nb"}')
+    cells = projection.cells(7, info)
+    assert cells == ['info', 'bob', '']
+    assert projection.cells(7, info) is cells
+    assert Projection(['n']).cells(0, info) == ['a\\nb']  # Newlines can't break a row
+    print("✅ Field values are cached per line")
+
+
+def test_projection_mode():
+    """:cols shows JSON lines as columns; widths come from nearby lines only."""
+    path = temp_log(_log_lines())
+    try:
+        pager = small_pager(path)
+        dispatcher = KeyDispatcher(pager)
+        dispatcher.feed(list(':cols ts,level,msg\r'))
+        assert pager.projection.fields == ['ts', 'level', 'msg']
+        assert pager.projection.widths == [8, 5, 11]
+        # Only lines in the window were read, not the whole file
+        assert len(pager.json_cache) <= WIDTH_WINDOW
+
+        plain = pager._render_content().plain.split('\n')
+        assert plain[0] == '► 12:00:00  error  request 0'
+        assert plain[1] == '  12:00:01  info   request 1'
+        assert plain[5] == '  plain text line'
+        assert "[COLS ts,level,msg]" in pager._render_status().plain
+
+        # The long level widens its column when it comes on screen
+        pager.move_to_bottom()
+        plain = pager._render_content().plain.split('\n')
+        assert pager.projection.widths[1] == 30
+        assert plain[1] == '  12:00:11  info' + ' ' * 28 + 'request 1991'
+
+        # Searches highlight the text that is shown
+        pager.search('request 1995')
+        pager.search_state.wait(5)
+        spans = [span for span in pager._format_line(1995, pager.lines[1995]).spans
+                 if span.style == 'black on yellow']
+        assert len(spans) == 1
+
+        dispatcher.feed(list(':cols\r'))
+        assert pager.projection is None
+        assert pager._render_content().plain.split('\n')[0].startswith('  {"ts"')
+        dispatcher.feed(list(':cols a,,b\r'))
+        assert pager.projection is None and "comma-separated" in pager.message
+        pager.close()
+        print("✅ :cols renders aligned columns of the chosen fields")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_format()
+    test_cells_cached()
+    test_projection_mode()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Test reading gzip and zstd compressed logs."""
+
+import gzip
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from smart_pager import compressed
+from smart_pager.compressed import DecompressedData, StreamDecoder, detect_compression
+from smart_pager.line_index import CompressedIndex, StreamIndex
+from smart_pager.pager import SmartPager
+
+
+def _lines(start, stop):
+    return [f'{{"n": {i}, "msg": "line {i}"}}' for i in range(start, stop)]
+
+
+def _write(data, suffix):
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.write(fd, data)
+    os.close(fd)
+    return path
+
+
+def test_gzip_members_and_checkpoints():
+    """Multi-member gzip files index fully; deep reads resume from checkpoints."""
+    saved = compressed.CHECKPOINT_INTERVAL, compressed.READ_SIZE
+    compressed.CHECKPOINT_INTERVAL = 64 * 1024
+    compressed.READ_SIZE = 1024
+    text = '\n'.join(_lines(0, 20000)) + '\n'
+    half = len(text) // 2
+    # Two members plus zero padding, as left by some log rotators
+    data = (gzip.compress(text[:half].encode()) + gzip.compress(text[half:].encode())
+            + b'\0' * 100)
+    path = _write(data, '.log.gz')
+    try:
+        assert detect_compression(path) == 'gzip'
+        index = CompressedIndex(path, 'gzip')
+        index.build()
+        assert index.complete and len(index) == 20000
+        assert index[0] == _lines(0, 1)[0]
+        assert index[19999] == _lines(19999, 20000)[0]
+        assert index[12345] == _lines(12345, 12346)[0]
+
+        checkpoints = index._map._checkpoints
+        assert len(checkpoints) > 5
+        assert sum(state is None for _, _, state in checkpoints) == 2  # One per member
+        index.close()
+        print(f"✅ gzip index has {len(checkpoints)} checkpoints over 2 members")
+    finally:
+        compressed.CHECKPOINT_INTERVAL, compressed.READ_SIZE = saved
+        os.unlink(path)
+
+
+def test_decompressed_reads():
+    """Random reads match the original bytes and nearby reads hit the window."""
+    payload = os.urandom(300 * 1024).hex().encode()
+    path = _write(gzip.compress(payload), '.gz')
+    try:
+        view = DecompressedData(path, 'gzip')
+        list(view.decode())
+        for start, stop in [(0, 10), (500000, 500100), (len(payload) - 5, len(payload))]:
+            assert view[start:stop] == payload[start:stop]
+        assert view._window_start <= len(payload) - 5
+        view.close()
+        print("✅ Random reads of decompressed data are exact")
+    finally:
+        os.unlink(path)
+
+
+def test_zstd_frames():
+    """zstd files decode frame by frame when zstandard is installed."""
+    if compressed.zstandard is None:
+        print("⏭️  zstandard not installed; skipping zstd test")
+        return
+    compressor = compressed.zstandard.ZstdCompressor()
+    frames = [compressor.compress(('\n'.join(_lines(i, i + 1000)) + '\n').encode())
+              for i in range(0, 3000, 1000)]
+    path = _write(b''.join(frames), '.log.zst')
+    try:
+        pager = SmartPager(path)
+        assert isinstance(pager.lines, CompressedIndex)
+        assert len(pager.lines) == 3000
+        pager.move_to_bottom()
+        assert pager.line_info(pager.current_line).parsed == {"n": 2999, "msg": "line 2999"}
+        pager.close()
+        print("✅ zstd frames are indexed and read back")
+    finally:
+        os.unlink(path)
+
+
+def test_index_cache():
+    """A cached index is reused without decompressing the file again."""
+    path = _write(gzip.compress(('\n'.join(_lines(0, 500)) + '\n').encode()), '.gz')
+    saved_cache = os.environ.get('XDG_CACHE_HOME')
+    with tempfile.TemporaryDirectory() as cache_home:
+        os.environ['XDG_CACHE_HOME'] = cache_home
+        try:
+            first = CompressedIndex(path, 'gzip', use_cache=True)
+            first.build()
+            first.close()
+            assert os.listdir(os.path.join(cache_home, 'smart-pager'))
+
+            second = CompressedIndex(path, 'gzip', use_cache=True)
+            assert second.complete and len(second) == 500
+            assert list(second.starts) == list(first.starts)
+            assert second[250] == _lines(250, 251)[0]
+            second.close()
+
+            os.utime(path, ns=(0, 0))  # A changed file invalidates the cache
+            third = CompressedIndex(path, 'gzip', use_cache=True)
+            assert not third.complete
+            third.close()
+            print("✅ Compressed index is cached on disk and invalidated on change")
+        finally:
+            if saved_cache is None:
+                del os.environ['XDG_CACHE_HOME']
+            else:
+                os.environ['XDG_CACHE_HOME'] = saved_cache
+            os.unlink(path)
+
+
+def test_compressed_stream():
+    """gzip data piped on stdin is decompressed as it arrives."""
+    data = gzip.compress(b'one\ntwo\n') + gzip.compress(b'three\n')
+    decoder = StreamDecoder('gzip')
+    assert b''.join(decoder.feed(data[i:i + 7]) for i in range(0, len(data), 7)) == \
+        b'one\ntwo\nthree\n'
+
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, data)
+    os.close(write_fd)
+    index = StreamIndex(read_fd)
+    index.build()
+    assert list(index) == ['one', 'two', 'three']
+    os.close(read_fd)
+    print("✅ Piped gzip input is decompressed incrementally")
+def test_sequential_reads_resume():
+    """Reading on past the window continues the last decoder instead of starting over."""
+    payload = os.urandom(2 * 1024 * 1024).hex().encode()  # 4 MB, one checkpoint
+    path = _write(gzip.compress(payload), '.gz')
+    try:
+        view = DecompressedData(path, 'gzip')
+        decoded = []
+        decode = view.decode
+
+        def counting_decode(index=0):
+            for offset, data in decode(index):
+                decoded.append(len(data))
+                yield offset, data
+        view.decode = counting_decode
+
+        step = 1024 * 1024
+        for start in range(0, len(payload), step):
+            assert view[start:start + step] == payload[start:start + step]
+        # Each byte decoded about once, not once per read since the checkpoint
+        assert sum(decoded) < len(payload) + 2 * compressed.WINDOW_SIZE, sum(decoded)
+
+        # Jumping back still reads from a checkpoint
+        assert view[10:20] == payload[10:20]
+        view.close()
+        print(f"✅ Sequential reads decoded {sum(decoded) / len(payload):.2f}x the data")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_gzip_members_and_checkpoints()
+    test_decompressed_reads()
+    test_sequential_reads_resume()
+    test_zstd_frames()
+    test_index_cache()
+    test_compressed_stream()
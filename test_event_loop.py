@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Test the asyncio event loop driver."""
+
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from smart_pager.event_loop import PagerApp
+from smart_pager.input_handler import InputHandler
+from smart_pager.pager import SmartPager
+
+
+def test_event_driven_loop():
+    """Keys, resizes and timers each wake the loop; idle time draws nothing."""
+    pager = SmartPager('examples/complex_logs.txt')
+    read_fd, write_fd = os.pipe()
+    handler = InputHandler()
+    handler.fileno = lambda: read_fd
+    frames = []
+    ticks = []
+
+    app = PagerApp(pager, handler, lambda: frames.append(pager.current_line))
+    app.add_timer(0.01, lambda: ticks.append(1) and False)
+
+    async def script():
+        task = asyncio.ensure_future(app.run())
+        await asyncio.sleep(0.05)
+        assert frames == [0], frames  # First frame only; timers don't redraw
+
+        os.write(write_fd, b'jjjj')
+        await asyncio.sleep(0.05)
+        assert frames[-1] == 4 and len(frames) == 2, frames
+
+        os.kill(os.getpid(), signal.SIGWINCH)
+        await asyncio.sleep(0.05)
+        assert len(frames) == 3, frames
+
+        os.write(write_fd, b'q')
+        await asyncio.wait_for(task, 1)
+
+    try:
+        asyncio.run(script())
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+    assert ticks
+    print(f"✅ Event loop drew {len(frames)} frames for input, resize and startup")
+
+
+def test_file_watched_only_while_following():
+    """The file is watched once F turns follow mode on, and no longer after it is off."""
+    from smart_pager.follow import FileWatcher
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'app.log')
+    with open(path, 'w') as f:
+        f.write('one\ntwo\n')
+    pager = SmartPager(path)
+    pager.lines.wait_for_lines(2)
+    read_fd, write_fd = os.pipe()
+    handler = InputHandler()
+    handler.fileno = lambda: read_fd
+    watcher = FileWatcher(path)
+    app = PagerApp(pager, handler, lambda: None)
+    app.watch_file(watcher)
+
+    async def script():
+        task = asyncio.ensure_future(app.run())
+        await asyncio.sleep(0.05)
+        assert not app._watching and watcher.fileno() is None
+
+        os.write(write_fd, b'F')
+        await asyncio.sleep(0.05)
+        assert app._watching and (watcher.fileno() is not None or app._poll_handle is not None)
+        with open(path, 'a') as f:
+            f.write('three\n')
+        await asyncio.sleep(0.5)  # Long enough for a poll without inotify
+        assert len(pager.lines) == 3 and pager.current_line == 2
+
+        os.write(write_fd, b'F')
+        await asyncio.sleep(0.05)
+        assert not app._watching and watcher.fileno() is None and app._poll_handle is None
+
+        os.write(write_fd, b'q')
+        await asyncio.wait_for(task, 1)
+
+    try:
+        asyncio.run(script())
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+        pager.close()
+        os.unlink(path)
+        os.rmdir(directory)
+    print("✅ File is watched only while following")
+
+
+if __name__ == '__main__':
+    test_event_driven_loop()
+    test_file_watched_only_while_following()
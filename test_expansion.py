@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Test the virtual rows and collapsible tree of expanded JSON."""
+
+import json
+import os
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager.commands import KeyDispatcher
+from smart_pager.expansion import CHILD_LIMIT, Expansion
+from smart_pager.json_scan import decode_nested
+
+from testlib import small_pager, temp_log
+
+
+def _log_lines(big_items=5000):
+    """Ten small JSON lines with one huge payload at line 3."""
+    for i in range(10):
+        if i == 3:
+            yield json.dumps({"items": list(range(big_items))})
+        else:
+            yield json.dumps({"n": i, "msg": f"line {i}"})
+
+
+def test_tree_rows():
+    """Values start with their top level open; nodes open and close by row."""
+    expansion = Expansion([{"a": 1, "b": [2, 3]}, "x"])
+    assert list(expansion.rows()) == ['▾ {2 keys}', '    a: 1', '  ▸ b: [2 items]', '  "x"']
+    expansion.toggle(2)
+    assert list(expansion.rows(2)) == ['  ▾ b: [2 items]', '      [0] 2', '      [1] 3', '  "x"']
+    expansion.toggle(0)
+    assert len(expansion) == 2 and expansion.row(1) == '  "x"'
+    expansion.toggle(0)  # Reopening keeps b open
+    assert len(expansion) == 6
+    print("✅ Tree rows open and close")
+
+
+def test_embedded_json_rows():
+    """JSON decoded from a string value opens like any other node."""
+    expansion = Expansion([decode_nested({"msg": '{"a": [1]}'})])
+    assert expansion.row(1) == '  ▸ msg: "{1 key}"'
+    expansion.toggle(1)
+    assert expansion.row(2) == '    ▸ a: [1 item]'
+    print("✅ JSON inside strings is shown as a tree")
+
+
+def test_large_arrays():
+    """Only CHILD_LIMIT children are built at a time, behind a "… N more" node."""
+    expansion = Expansion([{"items": list(range(5000))}])
+    assert len(expansion) == 2
+    expansion.toggle(1)
+    items = expansion.node(1)
+    assert len(expansion) == 2 + CHILD_LIMIT + 1
+    assert expansion.row(2 + CHILD_LIMIT) == f'      … {5000 - CHILD_LIMIT:,} more'
+    expansion.toggle(2 + CHILD_LIMIT)
+    assert len(items.children) == 2 * CHILD_LIMIT + 1
+    assert expansion.row(2 + CHILD_LIMIT) == f'      [{CHILD_LIMIT}] {CHILD_LIMIT}'
+    assert expansion.row(len(expansion) - 1) == f'      … {5000 - 2 * CHILD_LIMIT:,} more'
+    print("✅ Large arrays show a batch of children and a … more node")
+
+
+def test_lazy_rows():
+    """Only the rows on screen are formatted."""
+    path = temp_log(_log_lines())
+    try:
+        pager = small_pager(path)
+        pager.current_line = 3
+        pager.toggle_expansion()
+        assert pager.expanded_line == 3
+        pager.move_down(2)
+        pager.toggle_expansion()  # Open the 5000 items
+        rows = pager._get_visible_rows()
+        assert len(rows) == 10 and rows[0] == (0, 0, pager.lines[0])
+        assert rows[3][:2] == (3, 0) and rows[4] == (3, 1, '▾ {1 key}')
+        assert pager._row_count(3) == 1 + 2 + CHILD_LIMIT + 1
+
+        plain = pager._render_content().plain.split('\n')
+        assert len(plain) == 10 and plain[4] == '    ▾ {1 key}'
+        assert plain[5] == '  ►   ▾ items: [5,000 items]'
+        pager.close()
+        print("✅ Only the visible rows of a large expansion are produced")
+    finally:
+        os.unlink(path)
+
+
+def test_navigation_through_rows():
+    """j/k walk through expanded rows and scrolling counts them."""
+    path = temp_log(_log_lines(big_items=20))
+    try:
+        pager = small_pager(path)
+        dispatcher = KeyDispatcher(pager)
+        pager.current_line = 3
+        dispatcher.feed(['\r'])
+        assert pager.current_line in pager.expanded and pager._row_count(3) == 3
+
+        dispatcher.feed(['j', 'j', '\r'])  # Open "items"
+        assert (pager.current_line, pager.cursor_row) == (3, 2)
+        assert pager._row_count(3) == 23 and pager.expanded_line == 3
+
+        # Past the last row of the JSON is the next line
+        pager.move_down(pager._row_count(3) - 2)
+        assert (pager.current_line, pager.cursor_row) == (4, 0)
+        pager._render_content()
+        rows = pager._get_visible_rows()
+        assert rows[-1][:2] == (4, 0)  # Cursor row is the bottom row
+        assert (pager.scroll_offset, pager.scroll_row) == (3, pager._row_count(3) - 9)
+
+        # Moving up enters the JSON from its last row
+        dispatcher.feed(['k'])
+        assert (pager.current_line, pager.cursor_row) == (3, pager._row_count(3) - 1)
+
+        # Expansion persists while moving away and back, and several lines can be open
+        dispatcher.feed(['g', 'g', '\r'])
+        assert pager.expanded == {0, 3}
+        pager.move_to_bottom()
+        pager._render_content()
+        assert pager.current_line == 9 and pager.expanded == {0, 3}
+        pager.move_to_top()
+        pager._render_content()
+        assert pager._get_visible_rows()[1][:2] == (0, 1)
+        assert pager._row_count(3) == 23  # Opened nodes stay open
+
+        # Clicking a tree row puts the cursor on it; Enter on the line collapses it
+        pager.click_to_line(3)
+        assert (pager.current_line, pager.cursor_row) == (0, 2)
+        dispatcher.feed(['k', '\r'])  # Close the top-level object
+        assert pager._row_count(0) == 2
+        dispatcher.feed(['k', '\r'])
+        assert pager.expanded == {3} and pager.cursor_row == 0
+        pager.close()
+        print("✅ Cursor moves through tree rows; several lines stay expanded")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_tree_rows()
+    test_embedded_json_rows()
+    test_large_arrays()
+    test_lazy_rows()
+    test_navigation_through_rows()
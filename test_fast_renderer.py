@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test the raw-ANSI renderer against the Rich one."""
+
+import io
+import os
+import sys
+sys.path.insert(0, '.')
+
+from rich.console import Console
+
+from smart_pager.commands import KeyDispatcher
+from smart_pager.fast_renderer import FastRenderer, top_border
+from smart_pager.main import parse_args
+from smart_pager.pager import SmartPager
+from smart_pager.screen import render_rows
+
+SIZE = (90, 20)
+
+
+def _pager(color_system, **options):
+    pager = SmartPager('examples/complex_logs.txt', **options)
+    pager.console = Console(file=io.StringIO(), force_terminal=True, width=SIZE[0],
+                            height=SIZE[1], color_system=color_system)
+    pager._update_terminal_size()
+    return pager
+
+
+def _assert_same_frame(pager, renderer):
+    expected = render_rows(pager.console, pager.render())
+    assert renderer.rows(SIZE) == expected, [
+        (i, row) for i, row in enumerate(renderer.rows(SIZE)) if row != expected[i]]
+
+
+def test_same_frames():
+    """Byte for byte the frames Rich draws, in every mode."""
+    for color_system in (None, "standard", "256", "truecolor"):
+        pager = _pager(color_system, minimap=True)
+        pager.minimap.wait(5)
+        renderer = FastRenderer(pager, 1, color_system)
+        dispatcher = KeyDispatcher(pager)
+        _assert_same_frame(pager, renderer)
+        for keys in (['j', '\r'], list('jjj'), list('/Redis\r'), ['n'], ['M'],
+                     list(':cols timestamp,level,message\r'), list('20l'), ['/', 'R']):
+            dispatcher.feed(keys)
+            if pager.search_state is not None:
+                pager.search_state.wait(5)
+                pager.update()
+            _assert_same_frame(pager, renderer)
+        pager.close()
+    print("✅ Fast renderer draws the same frames as Rich")
+
+
+def test_borders():
+    assert top_border("Map", 14) == "╭─ Map ──────╮"
+    assert top_border("a very long title indeed", 14) == "╭─ a very lo─╮"
+    assert top_border("日本語のタイトル", 14) == "╭─ 日本語の ─╮"
+    print("✅ Box borders match Rich panels")
+
+
+def test_one_write_per_frame():
+    """Each frame is one write of only the rows that changed."""
+    pager = _pager("truecolor")
+    read_fd, write_fd = os.pipe()
+    writes = []
+    real_write = os.write
+
+    def counting_write(fd, data):
+        writes.append(bytes(data))
+        return real_write(fd, data)
+    try:
+        renderer = FastRenderer(pager, write_fd, "truecolor")
+        os.write = counting_write
+        renderer.draw(SIZE)
+        first = len(writes[0])
+        pager.move_down()
+        renderer.draw(SIZE)
+        renderer.draw(SIZE)  # Nothing changed: nothing written
+        os.write = real_write
+        assert len(writes) == 2 and len(writes[1]) < first / 3
+        assert os.read(read_fd, 1 << 20) == b''.join(writes)
+    finally:
+        os.write = real_write
+        os.close(read_fd)
+        os.close(write_fd)
+        pager.close()
+    print("✅ One write per frame, holding only changed rows")
+
+
+def test_option():
+    assert parse_args(['x.log', '--renderer=fast']).renderer == 'fast'
+    assert parse_args(['x.log']).renderer == 'rich'
+    print("✅ --renderer picks the renderer")
+
+
+if __name__ == '__main__':
+    test_same_frames()
+    test_borders()
+    test_one_write_per_frame()
+    test_option()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Test JSON field filters and their value indexes."""
+
+import json
+import os
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager import field_index
+from smart_pager.commands import KeyDispatcher
+from smart_pager.field_index import FieldIndex, parse_condition
+from smart_pager.line_index import LineIndex
+from smart_pager.pager import SmartPager
+
+from testlib import temp_log
+
+LEVELS = ["info", "info", "warn", "info", "error"]
+
+
+def _log_lines(count=2000):
+    for i in range(count):
+        if i % 10 == 9:
+            yield f'plain text line {i}'
+            continue
+        level = LEVELS[i % len(LEVELS)]
+        yield f'{{"n": {i}, "level": "{level}", "ctx": {{"req": "r{i % 7}"}}}}'
+
+
+def _expected(level, count=2000):
+    return [i for i in range(count) if i % 10 != 9 and LEVELS[i % len(LEVELS)] == level]
+
+
+def test_parse_condition():
+    assert parse_condition('level=error') == ('level', 'error')
+    assert parse_condition(' msg = "a b" ') == ('msg', 'a b')
+    try:
+        parse_condition('level')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✅ Filter conditions parse")
+
+
+def test_field_index():
+    """One scan files every line under its value, dotted paths included."""
+    path = temp_log(_log_lines())
+    try:
+        index = LineIndex(path)
+        index.build()
+        levels = FieldIndex(index, 'level')
+        errors = levels.want('error')
+        levels.start()
+        levels.wait(5)
+        assert levels.done and list(errors) == _expected('error')
+        assert sorted(levels.postings) == ['error', 'info', 'warn']
+
+        nested = FieldIndex(index, 'ctx.req')
+        nested.start()
+        nested.wait(5)
+        assert len(nested.postings) == 7
+        assert list(nested.postings['r3'])[:2] == [3, 10]
+        index.close()
+        print("✅ Field index files lines by value, including nested fields")
+    finally:
+        os.unlink(path)
+
+
+def test_nested_field():
+    """Dotted paths continue into JSON held in string values."""
+    path = temp_log(json.dumps({"n": i, "msg": json.dumps({"user": {"id": i % 4}})})
+                    for i in range(100))
+    try:
+        index = LineIndex(path)
+        index.build()
+        ids = FieldIndex(index, 'msg.user.id', depth=1)
+        ids.start()
+        ids.wait(5)
+        assert list(ids.postings['2'])[:3] == [2, 6, 10] and len(ids.postings) == 4
+        flat = FieldIndex(index, 'msg.user.id')
+        flat.start()
+        flat.wait(5)
+        assert not flat.postings  # Without decoding the path stops at the string
+        index.close()
+        print("✅ Filter fields reach into JSON inside strings")
+    finally:
+        os.unlink(path)
+
+
+def test_non_ascii_field():
+    """Non-ASCII field names match whether written as UTF-8 or as \\u escapes."""
+    path = temp_log(json.dumps({"n": i, "nível": "alto" if i % 5 == 0 else "baixo"},
+                               ensure_ascii=i % 2 == 0) for i in range(100))
+    try:
+        pager = SmartPager(path)
+        dispatcher = KeyDispatcher(pager)
+        dispatcher.feed(list(':filter nível=alto\r'))
+        pager.filter.source.wait(5)
+        pager.update()
+        assert list(pager.filter.lines) == list(range(0, 100, 5))
+        pager.close()
+        print("✅ Non-ASCII field names filter in both encodings")
+    finally:
+        os.unlink(path)
+
+
+def test_high_cardinality_field():
+    """Past MAX_FIELD_VALUES only wanted values are kept."""
+    saved = field_index.MAX_FIELD_VALUES
+    field_index.MAX_FIELD_VALUES = 50
+    path = temp_log(_log_lines())
+    try:
+        index = LineIndex(path)
+        index.build()
+        numbers = FieldIndex(index, 'n')
+        wanted = numbers.want('1500')
+        numbers.start()
+        numbers.wait(5)
+        assert numbers.overflowed and list(numbers.postings) == ['1500']
+        assert list(wanted) == [1500]
+        assert numbers.want('7') is None  # Needs its own scan
+        index.close()
+        print("✅ High-cardinality fields keep only wanted values")
+    finally:
+        field_index.MAX_FIELD_VALUES = saved
+        os.unlink(path)
+
+
+def test_pager_filter():
+    """:filter remaps navigation onto the matching lines."""
+    saved = field_index.MAX_FIELD_VALUES
+    field_index.MAX_FIELD_VALUES = 50
+    path = temp_log(_log_lines())
+    try:
+        pager = SmartPager(path)
+        dispatcher = KeyDispatcher(pager)
+        dispatcher.feed(list(':filter level=error\r'))
+        pager.filter.source.wait(5)
+        pager.update()
+        errors = _expected('error')
+        assert pager.current_line == errors[0]
+        assert [n for n, _ in pager._get_visible_lines()] == errors[:pager.terminal_height]
+        assert "FILTER level=error" in pager._render_status().plain
+
+        dispatcher.feed(['j', 'j'])
+        assert pager.current_line == errors[2]
+        dispatcher.feed(['\x04'])  # Ctrl+D moves half a page of matches
+        assert pager.current_line == errors[2 + pager.terminal_height // 2]
+        dispatcher.feed(['G'])
+        assert pager.current_line == errors[-1]
+        dispatcher.feed(['g', 'g'])
+        assert pager.current_line == errors[0]
+
+        # Same field again: the index is reused
+        source = pager.filter.source
+        dispatcher.feed(list(':filter level=warn\r'))
+        assert pager.filter.source is source and pager.filter.done
+        assert pager.current_line == 7  # First warning after the cursor
+
+        # Search only lands on lines in the view
+        dispatcher.feed(list('/"n": 1\r'))
+        pager.search_state.wait(5)
+        pager.update()
+        assert pager.current_line == 12
+
+        # A high-cardinality field falls back to a scan for the one value
+        dispatcher.feed(list(':filter n=1234\r'))
+        pager.filter.source.wait(5)
+        dispatcher.feed(list(':filter n=1500\r'))
+        pager.filter.source.wait(5)
+        pager.update()
+        assert list(pager.filter.lines) == [1500] and pager.current_line == 1500
+
+        dispatcher.feed(list(':filter\r'))
+        assert pager.filter is None and pager.current_line == 1500
+        dispatcher.feed(list(':bogus\r'))
+        assert "Unknown command" in pager._render_status().plain
+        pager.close()
+        print("✅ Pager filters by field and navigates the filtered view")
+    finally:
+        field_index.MAX_FIELD_VALUES = saved
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_parse_condition()
+    test_field_index()
+    test_nested_field()
+    test_non_ascii_field()
+    test_high_cardinality_field()
+    test_pager_filter()
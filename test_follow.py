@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Test follow mode on growing, truncated and rotated files."""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from smart_pager.follow import FileWatcher
+from smart_pager.pager import SmartPager
+
+
+def _append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def test_follow_growth():
+    """Appended lines are indexed incrementally and autoscroll at the bottom."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        _append(path, b'{"n": 0}\n{"n": 1}\n')
+        pager = SmartPager(path)
+        pager.toggle_follow()
+        assert pager.following and pager.current_line == 1
+        assert not pager.check_file()
+
+        _append(path, b'{"n": 2}\n{"n": 3')  # last line still being written
+        assert pager.check_file()
+        assert len(pager.lines) == 4 and pager.current_line == 3
+        assert pager.line_info(3).looks_like_json
+
+        _append(path, b'}\n')
+        assert pager.check_file()
+        assert pager.line_info(3).is_json
+        print("✅ Growth: new lines indexed, partial line re-classified")
+
+        pager.move_to_top()
+        _append(path, b'{"n": 4}\n')
+        pager.check_file()
+        assert pager.current_line == 0
+        print("✅ No autoscroll when the cursor is not at the bottom")
+        pager.close()
+
+
+def test_truncation_and_rotation():
+    """Truncation and rotation restart the index from the new content."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        _append(path, b'one\ntwo\nthree\n')
+        pager = SmartPager(path)
+        pager.toggle_follow()
+
+        with open(path, 'wb') as f:
+            f.write(b'fresh\n')
+        assert pager.check_file()
+        assert list(pager.lines) == ['fresh']
+        print("✅ Truncation resets the index")
+
+        os.rename(path, path + '.1')
+        _append(path, b'rotated 1\nrotated 2\n')
+        assert pager.check_file()
+        assert list(pager.lines) == ['rotated 1', 'rotated 2']
+        assert pager.current_line == 1
+        print("✅ Rotation reopens the new file")
+        pager.close()
+
+
+def test_partial_line_refiltered():
+    """A line caught mid-write by the field index is scanned again once it is finished."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        _append(path, b'{"level": "error", "n": 0}\n')
+        pager = SmartPager(path)
+        pager.toggle_follow()
+        pager.set_filter('level=error')
+        pager.filter.source.wait(5)
+
+        _append(path, b'{"level": "error", "n": 1}\n{"level": "error", "n"')
+        assert pager.check_file()
+        pager.filter.source.wait(5)
+        assert list(pager.filter.lines) == [0, 1]  # The partial line isn't valid JSON yet
+
+        _append(path, b': 2}\n')
+        assert pager.check_file()
+        pager.filter.source.wait(5)
+        assert list(pager.filter.lines) == [0, 1, 2]
+        pager.close()
+    print("✅ Field index rescans a line finished after a follow check")
+
+
+def test_partial_line_resampled():
+    """The minimap samples a line caught mid-write again once it is finished."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        _append(path, b'{"level": "error", "n": 0}\n')
+        pager = SmartPager(path, minimap=True)
+        pager.toggle_follow()
+        pager.minimap.wait(5)
+
+        _append(path, b'{"level": "err')
+        assert pager.check_file()
+        pager.minimap.wait(5)
+        assert pager.minimap.errors[-1] == 1  # Not an error yet
+
+        _append(path, b'or", "n": 1}\n')
+        assert pager.check_file()
+        pager.minimap.wait(5)
+        assert list(pager.minimap.lines) == [0, 1] and pager.minimap.errors[-1] == 2
+        pager.close()
+    print("✅ Minimap resamples a line finished after a follow check")
+
+
+def test_search_covers_appended_lines():
+    """A finished search goes on to search lines appended while following."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        _append(path, b'match 0\nother\nother\n')
+        pager = SmartPager(path)
+        pager.toggle_follow()
+        pager.search('match')
+        pager.search_state.wait(5)
+        assert pager.search_state.done
+
+        _append(path, b'match 3\nmat')
+        assert pager.check_file()
+        _append(path, b'ch 4\n')
+        assert pager.check_file()
+        pager.search_state.wait(5)
+        assert pager.search_state.done
+        assert pager.search_state.next_after(2) == 3
+        assert pager.search_state.next_after(3) == 4
+        assert pager.search_state.next_after(4) == 0
+        pager.close()
+    print("✅ Search resumes over appended lines")
+
+
+def test_watcher():
+    """The watcher reports writes to the watched file only."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'app.log')
+        _append(path, b'start\n')
+        watcher = FileWatcher(path)
+        assert watcher.fileno() is None  # Not watching before start()
+        watcher.start()
+        if watcher.fileno() is None:
+            print("⚠ inotify unavailable, polling fallback in use")
+            assert watcher.changed()
+            return
+        assert not watcher.changed()
+        _append(os.path.join(directory, 'other.log'), b'noise\n')
+        assert not watcher.changed()
+        _append(path, b'more\n')
+        assert watcher.changed()
+        watcher.close()
+        assert watcher.fileno() is None
+        print("✅ inotify watcher reports changes to the followed file")
+
+
+if __name__ == '__main__':
+    test_follow_growth()
+    test_truncation_and_rotation()
+    test_partial_line_refiltered()
+    test_partial_line_resampled()
+    test_search_covers_appended_lines()
+    test_watcher()
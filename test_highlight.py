@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Test JSON token highlighting and its per-line token cache."""
+
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from smart_pager.json_cache import classify_line
+from smart_pager.json_scan import KEY, LITERAL, NUMBER, STRING, tokenize
+from smart_pager.pager import JSON_STYLE, TOKEN_STYLES, SmartPager
+
+
+def test_tokenize():
+    """Keys, strings, numbers and literals are told apart in one pass."""
+    text = '{"a": [1, -2.5e3, true, null, "s\\"q"], "b" : false, "c": "x:y"}'
+    starts, ends, kinds = tokenize(text)
+    tokens = [(text[start:end], kind) for start, end, kind in zip(starts, ends, kinds)]
+    assert tokens == [('"a"', KEY), ('1', NUMBER), ('-2.5e3', NUMBER), ('true', LITERAL),
+                      ('null', LITERAL), ('"s\\"q"', STRING), ('"b"', KEY),
+                      ('false', LITERAL), ('"c"', KEY), ('"x:y"', STRING)]
+    print("✅ JSON tokens are classified")
+
+
+def test_tokens_cached_per_line():
+    """Tokens cover only the JSON spans and are worked out once per line."""
+    info = classify_line('level=info {"n": 1} and {"ok": true} true')
+    starts, ends, kinds = info.tokens
+    assert [info.text[s:e] for s, e in zip(starts, ends)] == ['"n"', '1', '"ok"', 'true']
+    assert info.tokens is info.tokens
+    assert not len(classify_line('plain 123 true').tokens[0])
+    print("✅ Tokens are cached on the line")
+
+
+def _styles(text):
+    """(characters, style) of each styled span of a Text."""
+    return [(text.plain[span.start:span.end], str(span.style)) for span in text.spans]
+
+
+def test_line_styles():
+    """Each token gets its kind's style; punctuation keeps the JSON base style."""
+    fd, path = tempfile.mkstemp(suffix='.log')
+    with os.fdopen(fd, 'w') as f:
+        f.write('INFO {"a": 1, "b": "x"}\n')
+        f.write(json.dumps({"items": list(range(20000))}) + '\n')
+    try:
+        pager = SmartPager(path)
+        text = pager._colorize_json(pager.line_info(0))
+        assert _styles(text) == [
+            ('{"a": 1, "b": "x"}', JSON_STYLE), ('"a"', TOKEN_STYLES[KEY]),
+            ('1', TOKEN_STYLES[NUMBER]), ('"b"', TOKEN_STYLES[KEY]),
+            ('"x"', TOKEN_STYLES[STRING])]
+        assert text.style == "dim white"
+
+        # A long line only has the tokens in the visible slice styled
+        info = pager.line_info(1)
+        start = len(info.text) // 2
+        text = pager._colorize_json(info, start, start + 80)
+        assert len(text.plain) == 80 and 10 < len(text.spans) < 20
+        # Tokens cut by the edges are styled up to the edge
+        first = text.spans[1]
+        assert first.start == 0 or text.plain[first.start - 1] in ' ,['
+        pager.close()
+        print("✅ Lines are highlighted token by token, visible slice only")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_tokenize()
+    test_tokens_cached_per_line()
+    test_line_styles()
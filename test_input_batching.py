@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Test batched key parsing and dispatch."""
+
+import os
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager.commands import KeyDispatcher
+from smart_pager.input_handler import InputHandler, parse_keys
+from smart_pager.pager import SmartPager
+
+
+def test_parse_keys():
+    """Raw input splits into single keys, escape sequences and mouse reports."""
+    keys, rest = parse_keys('jj\x1b[B\x1b[<0;5;7Mk')
+    assert keys == ['j', 'j', '\x1b[B', '\x1b[<0;5;7M', 'k']
+    assert rest == ''
+
+    keys, rest = parse_keys('j\x1b[')
+    assert keys == ['j'] and rest == '\x1b['
+    print("✅ Key parsing handles sequences split across reads")
+
+
+def test_read_keys_drains_everything():
+    """One read returns every queued key."""
+    read_fd, write_fd = os.pipe()
+    try:
+        handler = InputHandler()
+        handler.fileno = lambda: read_fd
+        os.write(write_fd, b'j' * 200 + b'\x1b[A')
+        keys = handler.read_keys(timeout=1)
+        assert keys == ['j'] * 200 + ['\x1b[A']
+        assert handler.read_keys(timeout=0) == []
+
+        os.write(write_fd, b'\x1b')  # lone ESC, nothing follows
+        assert handler.read_keys(timeout=1) == ['\x1b']
+        print(f"✅ Drained {len(keys)} keys in one batch")
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+def test_dispatch_batch():
+    """Counts, 'gg' and clicks are applied from a single batch."""
+    pager = SmartPager('examples/complex_logs.txt')
+    dispatcher = KeyDispatcher(pager)
+
+    assert dispatcher.feed(list('3j'))
+    assert pager.current_line == 3
+    assert dispatcher.feed(list('jjjk'))
+    assert pager.current_line == 5
+    dispatcher.feed(['G'])
+    assert pager.current_line == len(pager.lines) - 1
+    dispatcher.feed(list('gg'))
+    assert pager.current_line == 0
+    dispatcher.feed(['\x1b[<0;10;3M'])
+    assert pager.current_line == 1
+    assert not dispatcher.feed(['x'])
+    dispatcher.feed(['j', 'q', 'j'])
+    assert dispatcher.quit and pager.current_line == 2
+    print("✅ Batched dispatch applies counts, gg, clicks and quit")
+
+
+if __name__ == '__main__':
+    test_parse_keys()
+    test_read_keys_drains_everything()
+    test_dispatch_batch()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Test the shared per-line JSON classification cache."""
+
+import json
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager import json_cache
+from smart_pager.json_cache import JsonCache, INVALID, JSON, PLAIN
+from smart_pager.pager import SmartPager
+from smart_pager.simple_renderer import SimpleRenderer
+
+
+def test_classification():
+    """Lines in the complex example are classified into the three kinds."""
+    pager = SmartPager('examples/complex_logs.txt')
+    kinds = [pager.line_info(i).kind for i in range(len(pager.lines))]
+    print(f"✅ Kinds: {kinds.count(JSON)} JSON, {kinds.count(INVALID)} invalid, {kinds.count(PLAIN)} plain")
+    assert kinds[1] == JSON
+    assert kinds[0] == PLAIN
+
+    info = pager.line_info(1)
+    assert info.parsed["service"] == "auth"
+    assert info.json_text == pager.lines[1]
+
+
+def test_lines_classified_once():
+    """Rendering, status and expansion reuse one classification per line."""
+    calls = []
+    original = json_cache.classify_line
+
+    def counting_classify(line):
+        calls.append(line)
+        return original(line)
+
+    json_cache.classify_line = counting_classify
+    try:
+        pager = SmartPager('examples/complex_logs.txt')
+        renderer = SimpleRenderer(pager)
+        pager.current_line = 1
+        pager.toggle_expansion()
+        pager._render_content()
+        pager._render_status()
+        renderer.render_simple()
+        pager._render_content()
+        visible = len(pager._get_visible_lines())
+        assert len(calls) == visible, (len(calls), visible)
+        print(f"✅ {visible} visible lines classified exactly once across renderers")
+    finally:
+        json_cache.classify_line = original
+
+
+def test_lru_eviction():
+    """The cache never grows beyond its capacity."""
+    cache = JsonCache(capacity=3)
+    for i in range(10):
+        cache.get(i, lambda n: '{"n": %d}' % n)
+    assert len(cache) == 3
+    assert cache.get(9, lambda n: 'unused').parsed == {"n": 9}
+    print("✅ LRU eviction keeps the cache bounded")
+
+
+def test_byte_budget():
+    """Huge lines are evicted by the bytes they hold, not just by count."""
+    huge = '{"blob": "%s"}' % ('x' * 100000)
+    cache = JsonCache(capacity=100, max_bytes=250000)
+    for i in range(10):
+        cache.get(i, lambda n: huge)
+    assert len(cache) == 2 and cache.nbytes <= cache.max_bytes
+    # Short lines still fit beside them, up to the line count
+    for i in range(10, 60):
+        cache.get(i, lambda n: '{"n": %d}' % n)
+    assert len(cache) == 52 and cache.nbytes <= cache.max_bytes
+
+    # A line bigger than the whole budget is still kept while it is in use
+    cache.get(99, lambda n: 'y' * 300000)
+    assert len(cache) == 1 and cache.get(99, lambda n: 'unused').text == 'y' * 300000
+    cache.discard(99)
+    assert len(cache) == 0 and cache.nbytes == 0
+    print("✅ Byte budget bounds the cache for huge lines")
+
+
+def test_tokens_count_against_budget():
+    """Memoized tokens are charged to the same budget as the text."""
+    line = json.dumps({"items": list(range(20000))})
+    cache = JsonCache(capacity=100, max_bytes=4 * len(line))
+    info = cache.get(0, lambda n: line)
+    text_only = cache.nbytes
+    info.tokens  # Drawing the line tokenizes it
+    cache.get(0, lambda n: line)
+    assert cache.nbytes == info.nbytes > 2 * text_only
+    # Lines whose tokens would overflow the budget push out older ones
+    for i in range(1, 5):
+        cache.get(i, lambda n: line).tokens
+    cache.get(5, lambda n: '{}')
+    assert cache.nbytes <= cache.max_bytes and len(cache) < 6
+    print("✅ Memoized tokens count against the byte budget")
+
+
+def test_long_values_not_kept():
+    """Values of long JSON lines are decoded on demand rather than held in the cache."""
+    line = json.dumps({"items": [{"doc": json.dumps({"i": i})} for i in range(2000)]})
+    assert len(line) > json_cache.KEEP_PARSED_CHARS
+    info = JsonCache().get(0, lambda n: line)
+    assert info.values == [json.loads(line)] and info.values is not info.values
+    assert info.nested_values(1)[0]["items"][5]["doc"] == {"i": 5}
+    assert info._values is json_cache._UNPARSED and info._nested is None
+
+    short = JsonCache().get(0, lambda n: '{"doc": "{\\"i\\": 1}"}')
+    assert short.values is short.values
+    assert short.nested_values(1) is short.nested_values(1)
+    print("✅ Values of long lines aren't memoized")
+
+
+if __name__ == '__main__':
+    test_classification()
+    test_lines_classified_once()
+    test_lru_eviction()
+    test_byte_budget()
+    test_tokens_count_against_budget()
+    test_long_values_not_kept()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test single-pass JSON span detection."""
+
+import json
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager.json_cache import classify_line, INVALID, JSON, PLAIN
+from smart_pager.json_scan import EmbeddedDict, decode_nested, decode_spans, find_json_spans
+
+
+def test_find_spans():
+    """Spans respect strings and report several objects per line."""
+    line = '[INFO] {"a": "}]"} and {"b": [1, 2]} done'
+    assert find_json_spans(line) == [(0, 6, True), (7, 18, True), (23, 36, True)]
+
+    assert find_json_spans('no json here') == []
+    assert find_json_spans('open {"a": [1}') == [(5, 14, False)]
+    assert find_json_spans('cut {"a": "unterminated') == [(4, 23, False)]
+    print("✅ Span detection handles strings, nesting and broken spans")
+
+
+def test_decode_spans():
+    """Each candidate is decoded in place; bad fragments don't hide good ones."""
+    valid, broken = decode_spans('[main] user={"id": 7} tags=[1, 2]')
+    assert [value for _, _, value in valid] == [{"id": 7}, [1, 2]]
+    assert broken == [(0, 6)]
+    print("✅ Multiple JSON values per line decoded")
+
+
+def test_classify():
+    """Classification keeps the valid / invalid / plain distinction."""
+    assert classify_line('{"level": "INFO"}').kind == JSON
+    assert classify_line('prefix [x] {"ok": true} [y]').kind == JSON
+    assert classify_line('bad: {"incomplete": true, "missing_quote: "oops"}').kind == INVALID
+    assert classify_line('2024-05-26 [worker-1] started').kind == PLAIN
+
+    info = classify_line('a {"x": 1} b {"y": 2}')
+    assert info.spans == [(2, 10), (13, 21)]
+    assert info.values == [{"x": 1}, {"y": 2}]
+    print("✅ Classification over scanned spans")
+
+
+def test_nested_json():
+    """JSON held in string values is decoded to the requested depth."""
+    inner = {"inner": {"deep": "[1, 2]"}, "note": "{not json"}
+    value = {"msg": json.dumps(inner), "n": 1}
+    decoded = decode_nested(value, 2)
+    assert decoded == {"msg": {"inner": {"deep": [1, 2]}, "note": "{not json"}, "n": 1}
+    assert isinstance(decoded["msg"], EmbeddedDict)
+    assert decode_nested(value, 1)["msg"]["inner"]["deep"] == "[1, 2]"
+    assert decode_nested(value, 0) is value
+    plain = {"a": [1, "b"]}
+    assert decode_nested(plain) is plain  # Nothing to decode, nothing copied
+
+    info = classify_line(json.dumps(value))
+    assert info.nested_values(2) is info.nested_values(2)  # Memoized per line
+    assert info.values == [value]
+    print("✅ Nested JSON in strings decoded and memoized")
+
+
+if __name__ == '__main__':
+    test_find_spans()
+    test_decode_spans()
+    test_classify()
+    test_nested_json()
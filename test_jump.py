@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Test jumping to a line, a percentage or a time."""
+
+import json
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, '.')
+
+from smart_pager.commands import KeyDispatcher
+from smart_pager.pager import SmartPager
+from smart_pager.timestamps import find_time, parse_target, parse_timestamp
+
+from testlib import temp_log
+
+START = datetime(2024, 5, 26, 12, 0, tzinfo=timezone.utc)
+
+
+def _log_lines(count=100000, epoch_ms=False):
+    """One JSON line per second from START, with a plain line every tenth line."""
+    for i in range(count):
+        if i % 10 == 9:
+            yield f'plain continuation {i}'
+            continue
+        moment = START + timedelta(seconds=i)
+        ts = int(moment.timestamp() * 1000) if epoch_ms else \
+            moment.isoformat().replace('+00:00', 'Z')
+        level = "error" if i % 3 == 0 else "info"
+        yield json.dumps({"ts": ts, "level": level, "n": i})
+
+
+def test_parse_times():
+    assert parse_timestamp("2024-05-26T12:00:00Z") == START
+    assert parse_timestamp(START.timestamp() * 1000) == START
+    assert parse_timestamp("not a time") is None and parse_timestamp(True) is None
+    assert parse_target("14:03", START) == START.replace(hour=14, minute=3)
+    assert parse_target("2024-05-26 13:00", START) == START.replace(hour=13)
+    assert parse_target("14:03", None) is None
+    print("✅ Timestamps and jump targets parse")
+
+
+def test_line_and_percent_jumps():
+    """:N, NG and N% go straight to the line."""
+    path = temp_log(_log_lines(1000))
+    try:
+        pager = SmartPager(path)
+        dispatcher = KeyDispatcher(pager)
+        dispatcher.feed(list(':500\r'))
+        assert pager.current_line == 499
+        dispatcher.feed(list('25G'))
+        assert pager.current_line == 24
+        dispatcher.feed(list('50%'))
+        assert pager.current_line == 499
+        dispatcher.feed(list('100%'))
+        assert pager.current_line == 999
+        dispatcher.feed(list(':99999\r'))
+        assert pager.current_line == 999
+
+        # In a filtered view the jump lands on the next line shown
+        pager.set_filter('level=error')
+        pager.filter.source.wait(5)
+        dispatcher.feed(list(':2\r'))
+        assert pager.current_line == 3
+        dispatcher.feed(list('50%'))
+        assert pager.current_line == pager.filter[(len(pager.filter) - 1) // 2]
+        pager.close()
+        print("✅ Line and percentage jumps")
+    finally:
+        os.unlink(path)
+
+
+def test_time_jump_reads_few_lines():
+    """A time jump binary-searches the timestamps, reading O(log n) lines."""
+    for epoch_ms in (False, True):
+        path = temp_log(_log_lines(epoch_ms=epoch_ms))
+        try:
+            pager = SmartPager(path)
+            dispatcher = KeyDispatcher(pager)
+            classified = pager.json_cache.classified
+            dispatcher.feed(list(':14:03:00\r'))
+            target = 2 * 3600 + 3 * 60  # Seconds after START
+            expected = target if target % 10 != 9 else target + 1
+            assert pager.current_line == expected, pager.current_line
+            assert pager.json_cache.classified - classified < 100
+
+            dispatcher.feed(list(':2024-05-26T12:00:05\r'))
+            assert pager.current_line == 5
+            dispatcher.feed(list(':2030-01-01\r'))
+            assert pager.current_line == len(pager.lines) - 1
+            dispatcher.feed(list(':99:99\r'))
+            assert "time" in pager.message
+            pager.close()
+        finally:
+            os.unlink(path)
+    print("✅ Time jumps land by binary search over ISO and epoch timestamps")
+
+
+def test_find_time_gaps():
+    """Positions without timestamps are skipped over."""
+    times = [None, START, None, None, START + timedelta(seconds=5), None,
+             START + timedelta(seconds=9)]
+    at = times.__getitem__
+    assert find_time(len(times), at, START) == 1
+    assert find_time(len(times), at, START + timedelta(seconds=1)) == 4
+    assert find_time(len(times), at, START + timedelta(seconds=6)) == 6
+    assert find_time(len(times), at, START + timedelta(seconds=60)) == 6
+    assert find_time(3, lambda n: None, START) is None
+    print("✅ Binary search copes with undated lines")
+
+
+if __name__ == '__main__':
+    test_parse_times()
+    test_line_and_percent_jumps()
+    test_time_jump_reads_few_lines()
+    test_find_time_gaps()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test the memory-mapped line index."""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from smart_pager.line_index import LineIndex
+from smart_pager.pager import SmartPager
+
+
+def _write_temp(data: bytes) -> str:
+    fd, path = tempfile.mkstemp(suffix='.log')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_matches_readlines():
+    """Indexed lines match a plain readlines() of the file."""
+    for filename in ['examples/sample_logs.txt', 'examples/complex_logs.txt']:
+        with open(filename, 'r', encoding='utf-8') as f:
+            expected = [line.rstrip('\n\r') for line in f.readlines()]
+        index = LineIndex(filename)
+        index.build(chunk_size=64)  # force many small chunks
+        assert list(index) == expected
+        assert index[-1] == expected[-1]
+        index.close()
+        print(f"✅ {filename}: {len(expected)} lines match")
+
+
+def test_edge_cases():
+    """Empty files, missing trailing newline and CRLF endings."""
+    cases = {
+        b'': [],
+        b'\n': [''],
+        b'one': ['one'],
+        b'one\ntwo': ['one', 'two'],
+        b'one\r\ntwo\r\n': ['one', 'two'],
+        b'\n\nlast\n': ['', '', 'last'],
+    }
+    for data, expected in cases.items():
+        path = _write_temp(data)
+        try:
+            index = LineIndex(path)
+            index.build(chunk_size=3)
+            assert list(index) == expected, (data, list(index))
+            index.close()
+        finally:
+            os.unlink(path)
+    print(f"✅ Edge cases: {len(cases)} passed")
+
+
+def test_large_file_navigation():
+    """Navigation only decodes visible lines on a large file."""
+    path = _write_temp(b''.join(b'line %d {"n": %d}\n' % (i, i) for i in range(200000)))
+    try:
+        pager = SmartPager(path)
+        assert len(pager.lines) == 200000
+        assert pager.lines.starts.itemsize == 8
+
+        pager.move_to_bottom()
+        pager._update_scroll_offset()
+        visible = pager._get_visible_lines()
+        assert visible[-1] == (199999, 'line 199999 {"n": 199999}')
+
+        pager.move_to_top()
+        pager.page_down()
+        assert pager.current_line == pager.terminal_height // 2
+
+        pager.click_to_line(3)
+        assert pager.current_line == pager.scroll_offset + 2
+        pager.close()
+        print("✅ Large file: bottom, page down and click work")
+    finally:
+        os.unlink(path)
+
+
+def test_background_indexing():
+    """Background indexing paints early and 'G' tracks the growing end."""
+    path = _write_temp(b''.join(b'entry %d\n' % i for i in range(500000)))
+    try:
+        pager = SmartPager(path, background=True)
+        assert len(pager.lines) >= min(pager.terminal_height, 500000)
+        print(f"✅ First paint: {len(pager.lines)} lines known, indexing={pager.indexing}")
+
+        pager.move_to_bottom()
+        pager.lines.wait_for_lines(len(pager.lines) + 10**9, timeout=10)  # until complete
+        pager.update()
+        assert not pager.indexing
+        assert pager.current_line == 499999
+        assert "indexing" not in pager._render_status().plain
+        pager.close()
+        print("✅ 'G' followed indexing to the real end")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_matches_readlines()
+    test_edge_cases()
+    test_large_file_navigation()
+    test_background_indexing()
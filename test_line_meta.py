@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Test the columnar per-line metadata store."""
+
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager.json_cache import INVALID, JSON, PLAIN
+from smart_pager.line_meta import UNKNOWN, LineMeta
+from smart_pager.pager import SmartPager
+
+
+def test_columns():
+    """The column grows to the highest line recorded; unrecorded lines stay unknown."""
+    meta = LineMeta()
+    meta.record(5, JSON)
+    meta.record(2, PLAIN)
+    assert len(meta) == 6
+    assert meta.kind(5) == JSON and meta.kind(2) == PLAIN
+    assert meta.kind(0) == UNKNOWN and meta.kind(100) == UNKNOWN
+    meta.forget(5)
+    assert meta.kind(5) == UNKNOWN
+
+    meta.set_kinds([INVALID] * 8)
+    assert len(meta) == 8 and meta.kind(7) == INVALID
+
+    copy = LineMeta()
+    copy.restore(meta.columns())
+    assert copy.kinds == meta.kinds
+    print("✅ Metadata column grows and round-trips")
+
+
+def test_memory_budget():
+    """Per-line state costs a byte per line, not an object per line."""
+    meta = LineMeta()
+    for n in range(100000):
+        meta.record(n, JSON)
+    per_line = meta.nbytes() / len(meta)
+    assert per_line < 1.5, per_line
+    print(f"✅ Metadata costs {per_line:.1f} bytes per line")
+
+
+def test_pager_stats():
+    """The pager classifies every line into the columns and reports their size."""
+    pager = SmartPager('examples/complex_logs.txt')
+    pager.classify_all()
+    stats = pager.memory_stats()
+    assert stats['lines'] == len(pager.json_cache.meta) == len(pager.lines)
+    assert stats['offsets'] > 0 and stats['metadata'] > 0
+    assert pager.line_kind(1) == JSON and pager.line_kind(0) == PLAIN
+    pager.close()
+    print("✅ Pager reports offset and metadata memory")
+
+
+if __name__ == '__main__':
+    test_columns()
+    test_memory_budget()
+    test_pager_stats()
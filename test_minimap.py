@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Test the minimap of line density and errors over time."""
+
+import json
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+sys.path.insert(0, '.')
+
+from smart_pager import minimap as minimap_module
+from smart_pager.commands import KeyDispatcher
+from smart_pager.json_cache import classify_line
+from smart_pager.line_index import LineIndex
+from smart_pager.minimap import Minimap, is_error
+from smart_pager.pager import MINIMAP_WIDTH, SmartPager
+
+from testlib import small_pager, temp_log
+
+START = datetime(2024, 5, 26, 12, 0, tzinfo=timezone.utc)
+
+
+def _log_lines():
+    """Ten minutes of logs: one line a second, then a burst of errors in minute 7."""
+    yield 'starting up'
+    for second in range(600):
+        moment = (START + timedelta(seconds=second)).isoformat()
+        burst = 420 <= second < 480
+        for _ in range(20 if burst else 1):
+            level = "error" if burst else "info"
+            yield json.dumps({"ts": moment, "level": level, "msg": "hi"})
+
+
+def test_is_error():
+    assert is_error(classify_line('{"level": "ERROR"}'))
+    assert is_error(classify_line('{"severity": 50}'))
+    assert not is_error(classify_line('{"level": "info", "msg": "error"}'))
+    assert is_error(classify_line('2024-05-26 ERROR disk full'))
+    assert not is_error(classify_line('no errors here'))
+    print("✅ Error lines are recognised by level or ERROR word")
+
+
+def test_buckets():
+    """Buckets are equal slices of time; the burst shows as dense and all errors."""
+    path = temp_log(_log_lines())
+    try:
+        index = LineIndex(path)
+        index.build()
+        minimap = Minimap(index)
+        minimap.start()
+        minimap.wait(10)
+        assert minimap.done and minimap.dated and minimap.stride == 1
+        buckets = minimap.buckets(10)  # One a minute
+        assert len(buckets) == 10
+        assert [lines for _, lines, _ in buckets] == [61] + [60] * 6 + [1200, 60, 60]
+        assert [errors for _, _, errors in buckets] == [0] * 7 + [1200, 0, 0]
+        assert buckets[0][0] == 0 and buckets[7][0] == 1 + 420
+        assert buckets[8][0] == 1 + 420 + 1200
+        index.close()
+        print("✅ Buckets count lines and errors per slice of time")
+    finally:
+        os.unlink(path)
+
+
+def test_sampling_bounds_memory():
+    """Past MAX_SAMPLES, samples are thinned and counts become estimates."""
+    path = temp_log(_log_lines())
+    saved = minimap_module.MAX_SAMPLES
+    minimap_module.MAX_SAMPLES = 500
+    try:
+        index = LineIndex(path)
+        index.build()
+        minimap = Minimap(index)
+        minimap.start()
+        minimap.wait(10)
+        assert minimap.stride == 4 and len(minimap) <= 500
+        assert all(line % 4 == 0 for line in minimap.lines)
+        buckets = minimap.buckets(10)
+        # Edges move a little with the sampled times; the burst still stands out
+        assert max(buckets, key=lambda bucket: bucket[1]) == buckets[7]
+        assert buckets[7][2] > 0.9 * buckets[7][1] > 1000
+        assert abs(sum(lines for _, lines, _ in buckets) - len(index)) <= 4
+        index.close()
+        print("✅ Sampling keeps the minimap within MAX_SAMPLES")
+    finally:
+        minimap_module.MAX_SAMPLES = saved
+        os.unlink(path)
+
+
+def test_sidebar_and_click():
+    """M shows the sidebar; clicking a bucket jumps to its region."""
+    path = temp_log(_log_lines())
+    try:
+        pager = small_pager(path)
+        dispatcher = KeyDispatcher(pager)
+        dispatcher.feed(['M'])
+        assert pager.show_minimap and pager.content_width == 100 - 4 - MINIMAP_WIDTH
+        pager.minimap.wait(10)
+        pager.update()
+
+        rows = pager._render_minimap().plain.split('\n')
+        assert len(rows) == pager.terminal_height == 10
+        assert rows[0].startswith('►') and rows[7] == ' ' + '█' * (MINIMAP_WIDTH - 5)
+
+        # Rows 1.. of the screen are the buckets; the sidebar is on the right
+        dispatcher.feed(['\x1b[<0;95;9M'])
+        assert pager.current_line == 1 + 420
+        assert pager._render_minimap().plain.split('\n')[7].startswith('►')
+        dispatcher.feed(['\x1b[<0;10;3M'])  # Clicks on the content still pick a row
+        assert pager.current_line != 1 + 420
+
+        with pager.console.capture() as capture:
+            pager.console.print(pager.render())
+        assert 'Map' in capture.get()
+        dispatcher.feed(['M'])
+        assert not pager.show_minimap
+        pager.close()
+        print("✅ Sidebar shows the buckets and clicks jump to them")
+    finally:
+        os.unlink(path)
+
+
+def test_cached_with_index():
+    """The samples are saved with the other indexes and reused."""
+    saved_home = os.environ.get('XDG_CACHE_HOME')
+    path = temp_log(_log_lines())
+    with tempfile.TemporaryDirectory() as cache_home:
+        os.environ['XDG_CACHE_HOME'] = cache_home
+        try:
+            pager = SmartPager(path, use_cache=True, minimap=True)
+            pager.minimap.wait(10)
+            expected = pager.minimap.buckets(10)
+            pager.close()
+
+            pager = SmartPager(path, use_cache=True)
+            assert pager.minimap is not None and pager.minimap.scanned == len(pager.lines)
+            assert pager.minimap.buckets(10) == expected
+            pager.toggle_minimap()
+            assert pager.minimap.done  # Nothing left to sample
+            pager.close()
+            print("✅ Minimap samples are cached with the index")
+        finally:
+            if saved_home is None:
+                del os.environ['XDG_CACHE_HOME']
+            else:
+                os.environ['XDG_CACHE_HOME'] = saved_home
+            os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_is_error()
+    test_buckets()
+    test_sampling_bounds_memory()
+    test_sidebar_and_click()
+    test_cached_with_index()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Test the multi-process search and classification engine."""
+
+import os
+import sys
+import threading
+import time
+sys.path.insert(0, '.')
+
+from smart_pager.json_cache import INVALID, JSON, PLAIN, classify_line
+from smart_pager.line_index import LineIndex
+from smart_pager.parallel import ParallelEngine, split_file
+from smart_pager.search import Search
+
+from testlib import temp_log
+
+
+def _mixed_file(count=3000):
+    """Lines cycling through JSON, plain text and broken JSON."""
+    path = temp_log(_mixed_lines(count))
+    with open(path, 'a') as f:
+        f.write('no trailing newline')
+    return path
+
+
+def _mixed_lines(count):
+    for i in range(count):
+        if i % 3 == 0:
+            yield f'{{"n": {i}, "level": "info"}}'
+        elif i % 3 == 1:
+            yield f'plain line {i} with [brackets'
+        else:
+            yield f'INFO payload={{"n": {i}, "broken": }}'
+
+
+def test_split_file():
+    """Chunks end on newlines and cover the file exactly."""
+    path = _mixed_file()
+    try:
+        ranges = split_file(path, 1000)
+        with open(path, 'rb') as f:
+            data = f.read()
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start and data[end - 1:end] == b'\n'
+        print(f"✅ File split into {len(ranges)} newline-aligned chunks")
+    finally:
+        os.unlink(path)
+
+
+def test_parallel_classify():
+    """Per-chunk kinds merge into the same result as classifying line by line."""
+    path = _mixed_file()
+    engine = ParallelEngine(2)
+    engine.task_size = 4096
+    try:
+        kinds = engine.classify(path)
+        index = LineIndex(path)
+        index.build()
+        assert len(kinds) == len(index) == 3001
+        assert list(kinds) == [classify_line(line).kind for line in index]
+        assert kinds.count(JSON) == 1000 and kinds.count(INVALID) == 1000
+        assert kinds.count(PLAIN) == 1001
+        index.close()
+        print("✅ Parallel classification matches the serial result")
+    finally:
+        engine.close()
+        os.unlink(path)
+
+
+def test_parallel_search():
+    """Searching with the engine gives the same matches as the threaded scan."""
+    path = _mixed_file()
+    engine = ParallelEngine(2)
+    engine.task_size = 4096
+    try:
+        index = LineIndex(path)
+        index.build()
+        for pattern in ['broken', r'"n": 1\d\d,', 'trailing']:
+            serial = Search(index, pattern, origin=1500)
+            serial.start()
+            serial.wait(5)
+            parallel = Search(index, pattern, origin=1500, engine=engine)
+            parallel.start()
+            parallel.wait(10)
+            assert parallel.done
+            assert [parallel._get(k) for k in range(len(parallel))] == \
+                [serial._get(k) for k in range(len(serial))], pattern
+        assert len(parallel) == 1 and parallel.next_after(0) == 3000
+        index.close()
+        print("✅ Parallel search merges chunk results into global line numbers")
+    finally:
+        engine.close()
+        os.unlink(path)
+
+
+def test_close_cancels_queued_tasks():
+    """Closing mid-map cancels tasks still queued (without cancel_futures, which needs 3.9)."""
+    engine = ParallelEngine(3)
+    results = engine.map(time.sleep, [(1,)] * 20)
+    # The first result blocks, so fetch it on a thread while the queue is full
+    fetch = threading.Thread(target=next, args=(results,))
+    fetch.start()
+    try:
+        deadline = time.monotonic() + 10
+        # All but the one being waited on
+        while len(engine._pending) < 2 * engine.workers - 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        queued = set(engine._pending)
+        engine.close()
+        assert not engine._pending
+        # Tasks already handed to the workers run on; the rest never start
+        cancelled = sum(future.cancelled() for future in queued)
+        assert cancelled >= len(queued) - (engine.workers + 1) > 0
+        print(f"✅ close() cancelled {cancelled} of {len(queued)} queued tasks")
+    finally:
+        fetch.join()
+        results.close()
+
+
+if __name__ == '__main__':
+    test_split_file()
+    test_parallel_classify()
+    test_parallel_search()
+    test_close_cancels_queued_tasks()
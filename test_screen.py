@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Test differential screen output."""
+
+import io
+import os
+import re
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from rich.console import Console
+
+from smart_pager.pager import SmartPager
+from smart_pager.screen import Screen, render_rows
+
+ROW_MOVE = re.compile(r'\x1b\[(\d+);1H')
+
+
+def _console():
+    return Console(file=io.StringIO(), force_terminal=True, width=100, height=30)
+
+
+def test_rows_match_rich_output():
+    """render_rows produces one row per terminal line."""
+    console = _console()
+    pager = SmartPager('examples/sample_logs.txt')
+    pager.console = console
+    rows = render_rows(console, pager.render())
+    assert len(rows) == 30
+    assert "Smart Pager - sample_logs.txt" in rows[0]
+    print(f"✅ Rendered {len(rows)} rows")
+
+
+def test_cursor_move_rewrites_few_rows():
+    """Moving the cursor one line rewrites two rows plus the status line."""
+    console = _console()
+    pager = SmartPager('examples/sample_logs.txt')
+    pager.console = console
+    screen = Screen(io.StringIO())
+
+    first = screen.diff(render_rows(console, pager.render()), (100, 30))
+    assert len(ROW_MOVE.findall(first)) == 30
+
+    pager.move_down()
+    second = screen.diff(render_rows(console, pager.render()), (100, 30))
+    changed = [int(row) for row in ROW_MOVE.findall(second)]
+    assert changed == [2, 3, 30], changed
+    print(f"✅ Cursor move rewrote rows {changed}")
+
+    assert screen.diff(render_rows(console, pager.render()), (100, 30)) == ""
+    print("✅ Unchanged frame sends nothing")
+
+
+def test_resize_repaints():
+    """A size change forces a full repaint."""
+    screen = Screen(io.StringIO())
+    screen.diff(["a", "b"], (80, 24))
+    output = screen.diff(["a", "b"], (100, 24))
+    assert output.startswith("\x1b[2J")
+    assert len(ROW_MOVE.findall(output)) == 2
+
+    output = screen.diff(["a"], (100, 24))
+    assert output == "\x1b[2;1H\x1b[2K"
+    print("✅ Resize repaints and stale rows are cleared")
+
+
+def test_single_line_scroll_uses_region():
+    """Scrolling the viewport by one line scrolls the panel region in place."""
+    fd, path = tempfile.mkstemp(suffix='.log')
+    with os.fdopen(fd, 'w') as f:
+        f.writelines(f"line {i}\n" for i in range(100))
+    try:
+        console = _console()
+        pager = SmartPager(path)
+        pager.console = console
+        pager._update_terminal_size()
+        screen = Screen(io.StringIO())
+        size = (100, 30)
+
+        pager.current_line = pager.terminal_height - 1
+        screen.diff(render_rows(console, pager.render()), size, pager.content_region())
+
+        pager.move_down()
+        output = screen.diff(render_rows(console, pager.render()), size, pager.content_region())
+        assert "\x1b[2;28r\x1b[1S\x1b[r" in output
+        changed = [int(row) for row in ROW_MOVE.findall(output)]
+        # Old cursor row, new bottom line, blank row exposed at the region's end, status
+        assert changed == [24, 25, 28, 30], changed
+        print(f"✅ Scroll region used, rewrote rows {changed}")
+
+        pager.current_line = pager.scroll_offset - 1
+        output = screen.diff(render_rows(console, pager.render()), size, pager.content_region())
+        assert "\x1b[1T" in output
+        print("✅ Reverse scroll uses the region too")
+        pager.close()
+    finally:
+        os.unlink(path)
+
+
+def test_find_scroll():
+    """Shift detection picks the best delta and ignores unrelated frames."""
+    from smart_pager.screen import find_scroll
+    previous = ["top", "a", "b", "c", "d", "status"]
+    assert find_scroll(previous, ["top", "b", "c", "d", "e", "status"], 1, 4) == 1
+    assert find_scroll(previous, ["top", "z", "a", "b", "c", "status"], 1, 4) == -1
+    assert find_scroll(previous, ["top", "w", "x", "y", "z", "status"], 1, 4) == 0
+    print("✅ Scroll detection")
+
+
+def test_control_sequences_written_raw():
+    """Terminal setup reaches the terminal byte for byte, unlike Console.print."""
+    from smart_pager.screen import enter_terminal, leave_terminal
+    out = io.StringIO()
+    enter_terminal(out)
+    assert out.getvalue() == "\x1b[?1049h\x1b[?25l\x1b[?1000h\x1b[?1006h"
+    out = io.StringIO()
+    leave_terminal(out)
+    assert out.getvalue() == "\x1b[?1006l\x1b[?1000l\x1b[?25h\x1b[?1049l"
+
+    # What printing them through Rich would have sent instead
+    console = Console(file=io.StringIO(), force_terminal=True)
+    console.print("\x1b[?1000h", end="")
+    assert console.file.getvalue() != "\x1b[?1000h"
+    print("✅ Mouse reporting and screen switching are written raw")
+
+
+def test_cursor_hidden_and_restored():
+    """The cursor is hidden on entry and shown again on exit, with the exact sequences."""
+    from smart_pager.screen import HIDE_CURSOR, SHOW_CURSOR, enter_terminal, leave_terminal
+    assert HIDE_CURSOR == "\x1b[?25l" and SHOW_CURSOR == "\x1b[?25h"
+    out = io.StringIO()
+    enter_terminal(out)
+    assert HIDE_CURSOR in out.getvalue() and SHOW_CURSOR not in out.getvalue()
+    out = io.StringIO()
+    leave_terminal(out)
+    assert SHOW_CURSOR in out.getvalue() and HIDE_CURSOR not in out.getvalue()
+    # Shown before leaving the alternate screen so the main screen gets it back
+    assert out.getvalue().endswith(SHOW_CURSOR + "\x1b[?1049l")
+    print("✅ Cursor hide/show written raw")
+
+
+if __name__ == '__main__':
+    test_rows_match_rich_output()
+    test_cursor_move_rewrites_few_rows()
+    test_resize_repaints()
+    test_single_line_scroll_uses_region()
+    test_find_scroll()
+    test_control_sequences_written_raw()
+    test_cursor_hidden_and_restored()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Test background search and n/N navigation."""
+
+import os
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager import search as search_module
+from smart_pager.commands import KeyDispatcher
+from smart_pager.line_index import LineIndex
+from smart_pager.pager import SmartPager
+from smart_pager.search import Search
+
+from testlib import temp_log
+
+
+def _log_lines(count=5000):
+    for i in range(count):
+        level = "error" if i % 1000 == 7 else "info"
+        yield f'{{"n": {i}, "level": "{level}"}}'
+
+
+def test_search_scan():
+    """Matches are found from the origin, wrapping to the top."""
+    saved = search_module.SEARCH_CHUNK
+    search_module.SEARCH_CHUNK = 4096  # Many chunks, as in a large file
+    path = temp_log(_log_lines())
+    try:
+        index = LineIndex(path)
+        index.build()
+        result = Search(index, '"error"', origin=2500)
+        result.start()
+        result.wait(5)
+        assert result.done and len(result) == 5
+        assert [result._get(k) for k in range(5)] == [7, 1007, 2007, 3007, 4007]
+        assert result.next_after(2007) == 3007
+        assert result.next_after(4007) == 7  # Wraps
+        assert result.prev_before(7) == 4007
+        assert result.rank(3007) == 4 and result.is_match(3007)
+
+        regex = Search(index, r'"n": 12\d\d,', origin=0)
+        regex.start()
+        regex.wait(5)
+        assert len(regex) == 100
+        index.close()
+        print(f"✅ Search found {len(result)} literal and {len(regex)} regex matches")
+    finally:
+        search_module.SEARCH_CHUNK = saved
+        os.unlink(path)
+
+
+def test_partial_results():
+    """Before the scan finishes, lookups only answer when the answer is certain."""
+    path = temp_log(_log_lines())
+    try:
+        index = LineIndex(path)
+        index.build()
+        result = Search(index, 'error', origin=2500)
+        # Pretend only [2500, 3500) has been scanned
+        result._tail.append(3007)
+        result._tail_end = 3500
+        assert result.next_after(2600) == 3007
+        assert result.next_after(3007) is None  # 3500 onwards is unknown
+        assert result.prev_before(3007) is None  # Lines before 2500 are unknown
+        result.cancel()
+        assert result.next_after(3007) == 3007  # Cancelled: what was found is final
+        index.close()
+        print("✅ Partial search results are only used when certain")
+    finally:
+        os.unlink(path)
+
+
+def test_pager_search_keys():
+    """'/', '?', n and N drive the pager; results arrive through update()."""
+    path = temp_log(_log_lines())
+    try:
+        pager = SmartPager(path)
+        dispatcher = KeyDispatcher(pager)
+        dispatcher.feed(list('/error'))
+        assert pager.prompt == '/error'
+        assert "/error" in pager._render_status().plain
+        dispatcher.feed(['\r'])
+        assert pager.prompt is None
+        pager.search_state.wait(5)
+        pager.update()
+        assert pager.current_line == 7
+        assert "[1/5]" in pager._render_status().plain
+
+        dispatcher.feed(['n', 'n'])
+        assert pager.current_line == 2007
+        dispatcher.feed(['N'])
+        assert pager.current_line == 1007
+
+        dispatcher.feed(list('?info\r'))
+        pager.search_state.wait(5)
+        pager.update()
+        assert pager.current_line == 1006
+        dispatcher.feed(['n'])
+        assert pager.current_line == 1005  # n keeps the backward direction
+
+        dispatcher.feed(list('/nowhere\r'))
+        pager.search_state.wait(5)
+        pager.update()
+        assert pager.current_line == 1005
+        assert "Pattern not found" in pager._render_status().plain
+
+        dispatcher.feed(list('/x\x7f\x7f'))  # Backspace over everything closes the prompt
+        assert pager.prompt is None
+        dispatcher.feed(list('/q\x1b'))  # 'q' is text at the prompt; Escape abandons it
+        assert pager.prompt is None and not dispatcher.quit
+        pager.close()
+        print("✅ Search keys jump between matches in both directions")
+    finally:
+        os.unlink(path)
+
+
+def test_search_while_indexing():
+    """A search started during indexing waits for lines as they are indexed."""
+    path = temp_log(_log_lines(20000))
+    try:
+        index = LineIndex(path)
+        result = Search(index, '"n": 19007,')
+        result.start()
+        index.start()
+        result.wait(5)
+        assert result.done and result.next_after(0) == 19007
+        index.close()
+        print("✅ Search keeps up with background indexing")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_search_scan()
+    test_partial_results()
+    test_pager_search_keys()
+    test_search_while_indexing()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Test reading piped input incrementally."""
+
+import os
+import sys
+sys.path.insert(0, '.')
+
+from smart_pager.line_index import StreamIndex
+from smart_pager.pager import SmartPager
+
+
+def test_stream_index_incremental():
+    """Lines appear as soon as their newline has been read."""
+    read_fd, write_fd = os.pipe()
+    index = StreamIndex(read_fd)
+    index.start()
+    try:
+        os.write(write_fd, b'first\nsec')
+        assert index.wait_for_lines(1, timeout=2)
+        assert list(index) == ['first'] and not index.complete
+
+        os.write(write_fd, b'ond\n{"a": 1}')
+        assert index.wait_for_lines(2, timeout=2)
+        assert index[1] == 'second'
+
+        os.close(write_fd)
+        write_fd = None
+        assert index.wait_for_lines(10, timeout=2) and index.complete
+        assert list(index) == ['first', 'second', '{"a": 1}']
+        print("✅ Stream lines become visible incrementally")
+    finally:
+        index.close()
+        os.close(read_fd)
+        if write_fd is not None:
+            os.close(write_fd)
+
+
+def test_pager_reads_stdin():
+    """SmartPager('-') reads stdin in the background and shows <stdin>."""
+    read_fd, write_fd = os.pipe()
+    saved_stdin = sys.stdin
+    sys.stdin = os.fdopen(read_fd, 'r')
+    try:
+        os.write(write_fd, b''.join(b'{"n": %d}\n' % i for i in range(100)))
+        pager = SmartPager('-', background=True)
+        assert pager.display_name == "<stdin>"
+        assert pager.indexing
+        assert "reading…" in pager._render_status().plain
+
+        pager.move_to_bottom()
+        os.write(write_fd, b'{"n": 100}\n')
+        os.close(write_fd)
+        write_fd = None
+        pager.lines.wait_for_lines(10 ** 9, timeout=2)
+        pager.update()
+        assert len(pager.lines) == 101 and pager.current_line == 100
+        assert pager.line_info(100).parsed == {"n": 100}
+        pager.close()
+        print("✅ Pager reads piped stdin and 'G' tracks incoming lines")
+    finally:
+        sys.stdin.close()
+        sys.stdin = saved_stdin
+        if write_fd is not None:
+            os.close(write_fd)
+
+
+if __name__ == '__main__':
+    test_stream_index_incremental()
+    test_pager_reads_stdin()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Test horizontal scrolling and clipping of wide lines."""
+
+import io
+import json
+import os
+import sys
+import tempfile
+sys.path.insert(0, '.')
+
+from rich.console import Console
+
+from smart_pager.cells import cell_slice
+from smart_pager.commands import HSCROLL_STEP, KeyDispatcher
+from smart_pager.pager import SmartPager
+
+
+def test_cell_slice():
+    """Slices are measured in cells; wide characters cut by an edge are padded."""
+    assert cell_slice('abcdef', 2, 3) == (2, 5, 0)
+    assert cell_slice('abc', 5, 3) == (3, 3, 0)
+    text = 'a中文b'  # Cells: a=1, 中=2, 文=2, b=1
+    assert cell_slice(text, 0, 3) == (0, 2, 0)
+    assert cell_slice(text, 2, 3) == (2, 3, 1)  # Right half of 中 becomes a blank
+    assert cell_slice(text, 0, 4) == (0, 2, 0)  # 文 doesn't fit in the last cell
+    assert cell_slice(text, 3, 10) == (2, 4, 0)
+    print("✅ Cell-aware slicing")
+
+
+def test_wide_line_rendering():
+    """A 200KB line renders only the columns in view."""
+    fd, path = tempfile.mkstemp(suffix='.log')
+    record = {"id": 1, "payload": "x" * 200000, "tail": "end"}
+    with os.fdopen(fd, 'w') as f:
+        f.write('short line\n')
+        f.write(json.dumps(record) + '\n')
+    try:
+        pager = SmartPager(path)
+        pager.console = Console(file=io.StringIO(), force_terminal=True, width=84, height=20)
+        dispatcher = KeyDispatcher(pager)
+        rows = pager._render_content().plain.split('\n')
+        assert len(rows) == 2 and len(rows[1]) == pager.content_width == 80
+        assert rows[1] == '  {"id": 1, "payload": "' + 'x' * 56
+
+        dispatcher.feed(['l', '2', 'l'])
+        assert pager.column == 3 * HSCROLL_STEP
+        rows = pager._render_content().plain.split('\n')
+        assert rows[0] == '► '  # The short line has scrolled out of view
+        assert rows[1] == '  ' + json.dumps(record)[24:24 + 78]
+        assert "Col 25" in pager._render_status().plain
+
+        dispatcher.feed(['z', 'l'])
+        assert pager.column == 3 * HSCROLL_STEP + 40
+        dispatcher.feed(['z', 'h', 'h', 'h', 'h'])
+        assert pager.column == 0
+
+        # Scrolling stops with the end of the widest line still in view
+        pager.scroll_right(10 ** 6)
+        assert pager.column == len(json.dumps(record)) - 1
+
+        # Search matches inside the slice are highlighted
+        pager.column = 0
+        pager.search('payload')
+        pager.search_state.wait(5)
+        line = pager._format_line(1, pager.lines[1])
+        highlighted = [line.plain[span.start:span.end] for span in line.spans
+                       if str(span.style) == 'black on yellow']
+        assert highlighted == ['payload']
+        pager.close()
+        print("✅ Wide lines are clipped to the viewport and scroll sideways")
+    finally:
+        os.unlink(path)
+
+
+def test_tab_indented_lines():
+    """Tabs are expanded before slicing, so Rich has none left to widen past the edge."""
+    fd, path = tempfile.mkstemp(suffix='.log')
+    with os.fdopen(fd, 'w') as f:
+        f.write('java.lang.IllegalStateException: boom\n')
+        for i in range(5):
+            f.write(f'\tat com.example.service.Handler{i}.handle(Handler{i}.java:{i}) ' + 'x' * 80 + '\n')
+        f.write('{"a":\t1,\t"b": "two"}\n')
+        f.write('INFO\tplain\n')
+        f.write('INFO\t{"n": 1}\n')
+    try:
+        pager = SmartPager(path)
+        pager.console = Console(file=io.StringIO(), force_terminal=True, width=84, height=20)
+        content = pager._render_content()
+        rows = content.plain.split('\n')
+        assert '\t' not in content.plain
+        assert rows[1] == '  ' + ' ' * 8 + 'at com.example.service.Handler0.handle(Handler0.java:0) xxxx' + 'x' * 10
+        assert rows[6] == '  {"a":   1,      "b": "two"}'
+        # Tabs line up the same in JSON and plain lines, and tokens keep their styles
+        assert rows[7] == '  INFO    plain' and rows[8] == '  INFO    {"n": 1}'
+        row = pager._format_line(8, pager.lines[8])
+        styled = {row.plain[span.start:span.end]: str(span.style) for span in row.spans}
+        assert styled['"n"'] == 'bright_blue' and styled['1'] == 'bright_cyan'
+        row = pager._format_line(6, pager.lines[6])
+        styled = {row.plain[span.start:span.end]: str(span.style) for span in row.spans}
+        assert styled['"two"'] == 'bright_green' and styled['1'] == 'bright_cyan'
+        # Drawn at the content width, no row wraps onto another
+        console = Console(file=io.StringIO(), width=pager.content_width)
+        assert len(console.render_lines(content, console.options, pad=False)) == len(rows)
+
+        pager.column = 4
+        rows = pager._render_content().plain.split('\n')
+        assert rows[1].startswith('      at com.example')
+        assert rows[6] == '  :   1,      "b": "two"}'
+        row = pager._format_line(6, pager.lines[6])
+        styled = {row.plain[span.start:span.end]: str(span.style) for span in row.spans}
+        assert styled['"two"'] == 'bright_green' and styled['1'] == 'bright_cyan'
+        line = pager._format_expansion_row(0, 1, '\tx')
+        assert line.plain == '        x'
+        pager.close()
+        print("✅ Tab-indented lines stay within the viewport")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    test_cell_slice()
+    test_wide_line_rendering()
+    test_tab_indented_lines()
@@ -0,0 +1,30 @@
+"""Helpers shared by the test scripts: temporary log files and small pagers."""
+
+import io
+import os
+import tempfile
+from typing import Iterable
+
+from rich.console import Console
+
+from smart_pager.pager import SmartPager
+
+
+def temp_log(lines: Iterable[str], suffix: str = '.log') -> str:
+    """Path of a new temporary file holding lines, each ended with a newline.
+
+    The caller removes it.
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        for line in lines:
+            f.write(line + '\n')
+    return path
+
+
+def small_pager(path: str, **options) -> SmartPager:
+    """Pager on a console with room for ten content rows."""
+    pager = SmartPager(path, **options)
+    pager.console = Console(file=io.StringIO(), force_terminal=True, width=100, height=16)
+    pager._update_terminal_size()
+    return pager